@@ -0,0 +1,75 @@
+"""Measure G-code analyzer throughput in lines per second.
+
+Generates a synthetic job (a mix of rapids, linear cuts and I/J and R
+arcs, with comments) in a temporary file, then times three passes over
+it: reading lines only, full analysis, and a cached re-analysis (which
+costs one hashing pass). Peak memory is reported to show that it does
+not grow with the file size.
+
+Usage:
+    PYTHONPATH=src python benchmarks/gcode_throughput.py [--lines N]
+"""
+
+import argparse
+import os
+import random
+import resource
+import tempfile
+import time
+
+from fluidnc_ledscreen.gcode import AnalysisCache, analyze_file, iter_lines
+
+
+def _generate(path: str, lines: int) -> None:
+    """Write a synthetic job file."""
+    rng = random.Random(1)
+    x = y = 0.0
+    with open(path, "w", encoding="ascii") as f:
+        f.write("G21 G90 G17 (synthetic job)\nG0 Z5\n")
+        for n in range(lines - 2):
+            kind = n % 10
+            nx, ny = rng.uniform(0, 300), rng.uniform(0, 200)
+            if kind == 0:
+                f.write(f"G0 X{nx:.3f} Y{ny:.3f}\n")
+            elif kind < 7:
+                f.write(f"G1 X{nx:.3f} Y{ny:.3f} F{rng.randint(300, 3000)}\n")
+            elif kind < 9:
+                i, j = (nx - x) / 2, (ny - y) / 2
+                f.write(f"G2 X{nx:.3f} Y{ny:.3f} I{i:.3f} J{j:.3f} ; arc\n")
+            else:
+                r = ((nx - x) ** 2 + (ny - y) ** 2) ** 0.5
+                f.write(f"G3 X{nx:.3f} Y{ny:.3f} R{r:.3f}\n")
+            x, y = nx, ny
+
+
+def _time(label: str, lines: int, run) -> None:
+    """Time one pass and print its throughput."""
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<16} {elapsed:7.3f} s  {lines / elapsed:12,.0f} lines/s")
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "job.nc")
+        _generate(path, args.lines)
+        size = os.path.getsize(path) / 1e6
+        print(f"{args.lines:,} lines, {size:.1f} MB")
+        cache = AnalysisCache(os.path.join(tmp, "cache.json"))
+        _time("read lines", args.lines, lambda: sum(1 for _ in iter_lines(path)))
+        _time("analyze", args.lines, lambda: analyze_file(path))
+        analyze_file(path, cache)
+        _time("analyze cached", args.lines, lambda: analyze_file(path, cache))
+        print(analyze_file(path, cache))
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"peak RSS {peak:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""Golden-image render regression and render-time gate.
+
+Drives :class:`LEDScreen` on a virtual frame buffer through a fixed
+corpus of status updates (every machine state, negative and large
+coordinates, messages, a long alarm, stale and lost links) for every
+built-in layout and checks three things per frame:
+
+* the incrementally rendered frame equals a full repaint of the same
+  state on a fresh screen, so dirty-region tracking never leaves stale
+  pixels behind;
+* the frame equals the stored golden image pixel for pixel;
+* the render time of the corpus per layout (the sum of the fastest
+  time of each frame) has not regressed by more than
+  ``--max-regression`` against the recorded baseline.
+
+Golden images depend on the glyphs in use (the BDF fonts in the image,
+or Pillow's fallback font off-device), so each glyph set gets its own
+directory under ``benchmarks/golden``, named by a fingerprint of the
+rasterised fonts. Render-time baselines are kept per CPU architecture in
+``timings.json`` in that directory; record them on the target hardware.
+On a mismatch the actual frame and a diff image are written to ``--out``.
+
+Exit status: 0 when everything passes, 1 on a pixel mismatch or a timing
+regression, 2 when goldens or baselines are missing (record them with
+``--update``).
+
+Usage:
+    PYTHONPATH=src python benchmarks/render_regression.py [--update]
+        [--repeat N] [--max-regression 0.5] [--font-dir DIR] [--out DIR]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from fluidnc_ledscreen.fonts import DEFAULT_FONT_DIR, load_font
+from fluidnc_ledscreen.layout import LAYOUTS
+from fluidnc_ledscreen.led_screen import LEDScreen
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+ARCH = platform.machine() or "unknown"
+
+LONG_ALARM = (
+    "ALARM:1 Hard limit triggered. Machine position is likely lost due to "
+    "sudden and immediate halt. Re-homing is highly recommended."
+)
+
+# (case name, status update, seconds since the previous frame). Updates
+# accumulate like a live session; the times put the blinking dot and the
+# ticker at known phases.
+CORPUS: List[Tuple[str, Dict[str, Any], float]] = [
+    ("boot", {}, 0.0),
+    ("disconnected", {"connected": False, "ip": "192.168.1.50"}, 0.1),
+    ("connected", {"connected": True, "link": "live", "clock": "08:15"}, 0.1),
+    ("idle", {"state": "Idle", "x": 0.0, "y": 0.0, "z": 0.0}, 0.1),
+    ("blink_off", {}, 0.5),
+    ("blink_on", {}, 0.5),
+    ("run", {"state": "Run", "x": 12.5, "y": 7.25, "z": -1.0}, 0.1),
+    ("jog", {"state": "Jog", "x": 13.0}, 0.1),
+    ("hold", {"state": "Hold"}, 0.1),
+    ("door", {"state": "Door"}, 0.1),
+    ("home", {"state": "Home", "x": 0.0, "y": 0.0, "z": 0.0}, 0.1),
+    ("check", {"state": "Check"}, 0.1),
+    ("sleep", {"state": "Sleep"}, 0.1),
+    ("negative", {"state": "Idle", "x": -123.456, "y": -0.04, "z": -99.9}, 0.1),
+    ("large", {"x": 12345.678, "y": 99999.9, "z": -12345.6}, 0.1),
+    ("missing_z", {"z": None}, 0.1),
+    ("message", {"message": "Probe complete"}, 0.1),
+    ("message_scroll", {}, 1.0),
+    ("alarm", {"state": "Alarm", "alarm": LONG_ALARM}, 0.1),
+    ("alarm_scroll", {}, 2.5),
+    ("alarm_cleared", {"state": "Idle", "alarm": None}, 0.1),
+    ("stale", {"link": "stale"}, 0.1),
+    ("lost", {"link": "lost", "connected": False}, 0.1),
+    ("reconnected", {"link": "live", "connected": True, "x": 1.0}, 0.1),
+    (
+        "utilization",
+        {
+            "util_shift": "LATE",
+            "util_shift_run": 63.4,
+            "util_day_run": 8.0,
+            "util_day_run_time": "3:12",
+        },
+        0.1,
+    ),
+]
+
+FONTS = ("4x6", "5x8", "6x10")
+
+
+def font_fingerprint(font_dir: Optional[str]) -> str:
+    """Identify the rasterised glyphs the layouts will use.
+
+    Args:
+        font_dir: Directory containing BDF fonts
+
+    Returns:
+        Short hex digest
+    """
+    digest = hashlib.sha256()
+    for name in FONTS:
+        font = load_font(name, font_dir)
+        digest.update(f"{name}:{font.width}x{font.height}:{font.ascent}".encode())
+        for codepoint in range(32, 127):
+            digest.update(np.packbits(font.glyph(chr(codepoint))).tobytes())
+    return digest.hexdigest()[:12]
+
+
+def run_layout(
+    layout: str,
+    font_dir: Optional[str],
+) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    """Render the corpus on one layout.
+
+    Args:
+        layout: Layout name
+        font_dir: Directory containing BDF fonts
+
+    Returns:
+        Frames by case, and cases whose incremental frame differs from a
+        full repaint
+    """
+    screen = LEDScreen(layout=layout, font_dir=font_dir, use_driver=False)
+    # Sees the same updates but repaints every field on every frame
+    reference = LEDScreen(layout=layout, font_dir=font_dir, use_driver=False)
+    frames: Dict[str, np.ndarray] = {}
+    inconsistent: List[str] = []
+    now = 1000.0
+    for case, update, step in CORPUS:
+        now += step
+        screen.update(update)
+        screen.render(now)
+        frames[case] = screen.frame.copy()
+        reference.update(update)
+        reference.repaint()
+        reference.render(now)
+        if not np.array_equal(reference.frame, screen.frame):
+            inconsistent.append(case)
+    return frames, inconsistent
+
+
+def time_layout(
+    layout: str,
+    font_dir: Optional[str],
+    repeat: int,
+) -> Tuple[float, float, float]:
+    """Time incremental renders of the corpus.
+
+    The gate uses the fastest time of every corpus frame, summed over the
+    corpus: scheduler noise only ever adds time, so minimums are far more
+    stable between runs than means or medians.
+
+    Args:
+        layout: Layout name
+        font_dir: Directory containing BDF fonts
+        repeat: Number of passes over the corpus
+
+    Returns:
+        Sum of per-frame minimums, median and 95th percentile render time,
+        all in seconds
+    """
+    fastest = [float("inf")] * len(CORPUS)
+    times: List[float] = []
+    # The first pass only warms caches up
+    for index in range(repeat + 1):
+        screen = LEDScreen(layout=layout, font_dir=font_dir, use_driver=False)
+        now = 1000.0
+        for case, (_, update, step) in enumerate(CORPUS):
+            now += step
+            screen.update(update)
+            started = time.perf_counter()
+            screen.render(now)
+            elapsed = time.perf_counter() - started
+            if index:
+                times.append(elapsed)
+                fastest[case] = min(fastest[case], elapsed)
+    p95 = statistics.quantiles(times, n=20)[-1]
+    return sum(fastest), statistics.median(times), p95
+
+
+def _save(path: str, frame: np.ndarray) -> None:
+    """Write a frame as PNG."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.fromarray(frame, "RGB").save(path, optimize=True)
+
+
+def load_golden(path: str) -> Optional[np.ndarray]:
+    """Read a golden PNG, or None if missing."""
+    if not os.path.exists(path):
+        return None
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def load_baselines(golden_dir: str) -> Dict[str, Dict[str, float]]:
+    """Read the render-time baselines of a glyph set.
+
+    Args:
+        golden_dir: Golden directory of the glyph set
+
+    Returns:
+        Corpus render times in microseconds by architecture and layout
+    """
+    path = os.path.join(golden_dir, "timings.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _diff(golden: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    """Highlight differing pixels in red over a dimmed golden frame."""
+    image = golden // 4
+    image[np.any(golden != actual, axis=2)] = (255, 0, 0)
+    return image
+
+
+def main() -> None:
+    """Run the regression checks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--update", action="store_true", help="record goldens")
+    parser.add_argument("--repeat", type=int, default=200, help="timing passes")
+    parser.add_argument("--max-regression", type=float, default=0.5)
+    parser.add_argument("--font-dir", default=DEFAULT_FONT_DIR)
+    parser.add_argument("--golden-dir", default=GOLDEN_DIR)
+    parser.add_argument("--out", default="render-regression", help="failure images")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    fingerprint = font_fingerprint(args.font_dir)
+    golden_dir = os.path.join(args.golden_dir, fingerprint)
+    timings_path = os.path.join(golden_dir, "timings.json")
+    timings = load_baselines(golden_dir)
+    arch = ARCH
+    baselines = timings.get(arch, {})
+    print(f"glyph set {fingerprint}, {arch}, {len(CORPUS)} frames per layout")
+
+    failed = missing = False
+    for layout in LAYOUTS:
+        frames, inconsistent = run_layout(layout, args.font_dir)
+        mismatched = []
+        for case, frame in frames.items():
+            path = os.path.join(golden_dir, layout, f"{case}.png")
+            if args.update:
+                _save(path, frame)
+                continue
+            golden = load_golden(path)
+            if golden is None:
+                missing = True
+            elif not np.array_equal(golden, frame):
+                mismatched.append(case)
+                _save(os.path.join(args.out, layout, f"{case}.png"), frame)
+                diff_path = os.path.join(args.out, layout, f"{case}.diff.png")
+                _save(diff_path, _diff(golden, frame))
+
+        total, median, p95 = time_layout(layout, args.font_dir, args.repeat)
+        total *= 1e6
+        baseline = baselines.get(layout)
+        if args.update:
+            baselines[layout] = round(total, 2)
+            verdict = "recorded"
+        elif baseline is None:
+            missing = True
+            verdict = "no baseline"
+        elif total > baseline * (1 + args.max_regression):
+            failed = True
+            verdict = f"REGRESSED from {baseline:.1f} us"
+        else:
+            verdict = f"ok (baseline {baseline:.1f} us)"
+        print(
+            f"{layout:11} corpus {total:7.1f} us  frame median {median * 1e6:5.1f} us"
+            f"  p95 {p95 * 1e6:6.1f} us  {verdict}"
+        )
+        for label, cases in (
+            ("incremental != repaint", inconsistent),
+            ("golden mismatch", mismatched),
+        ):
+            if cases:
+                failed = True
+                print(f"{layout:11} {label}: {', '.join(cases)}")
+
+    if args.update:
+        timings[arch] = baselines
+        os.makedirs(golden_dir, exist_ok=True)
+        with open(timings_path, "w") as f:
+            json.dump(timings, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"goldens written to {golden_dir}")
+    elif failed:
+        print(f"FAILED; actual and diff images in {args.out}")
+    elif missing:
+        print("goldens or baselines missing; record them with --update")
+    sys.exit(1 if failed else 2 if missing and not args.update else 0)
+
+
+if __name__ == "__main__":
+    main()
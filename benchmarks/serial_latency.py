@@ -0,0 +1,92 @@
+"""Measure per-report latency of the serial transport.
+
+Opens a pseudo-terminal pair, runs a stand-in FluidNC on the master side
+in a thread and polls it with ``?`` through :class:`SerialTransport` on
+the slave device. A pty has no line speed, so this measures the event
+loop and parsing overhead of the transport rather than the UART itself;
+at 115200 baud a 70 byte status report adds roughly 6 ms on the wire.
+
+Usage:
+    PYTHONPATH=src python benchmarks/serial_latency.py [--reports N]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import threading
+import time
+from typing import List
+
+from fluidnc_ledscreen.status import StatusParser
+from fluidnc_ledscreen.transport import LineSplitter, SerialTransport
+
+REPORT = "<Run|MPos:{n:.3f},25.400,-1.000|FS:1200,18000|WCO:0.000,0.000,0.000>\r\n"
+
+
+def _serve(master: int) -> None:
+    """Answer ``?`` on the pty master until the slave side closes."""
+    n = 0
+    while True:
+        try:
+            data = os.read(master, 64)
+        except OSError:
+            return
+        if not data:
+            return
+        for _ in range(data.count(b"?")):
+            n += 1
+            os.write(master, REPORT.format(n=n / 1000).encode())
+
+
+async def _measure(device: str, reports: int) -> List[float]:
+    """Poll the stand-in and time each status report in microseconds."""
+    transport = SerialTransport(device)
+    splitter = LineSplitter()
+    parser = StatusParser()
+    await transport.open()
+    latencies: List[float] = []
+    try:
+        for _ in range(reports):
+            started = time.perf_counter()
+            await transport.write("?")
+            done = False
+            while not done:
+                for line in splitter.feed(await transport.recv()):
+                    parsed = parser.parse(line)
+                    if parsed and parsed["type"] == "status":
+                        done = True
+            latencies.append((time.perf_counter() - started) * 1e6)
+    finally:
+        await transport.close()
+    return sorted(latencies)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reports", type=int, default=2000)
+    args = parser.parse_args()
+
+    master, slave = os.openpty()
+    device = os.ttyname(slave)
+    threading.Thread(target=_serve, args=(master,), daemon=True).start()
+    try:
+        cpu_start = time.process_time()
+        latencies = asyncio.run(_measure(device, args.reports))
+        cpu = time.process_time() - cpu_start
+    finally:
+        os.close(slave)
+        os.close(master)
+
+    print(f"{'mean us':>9} {'p50 us':>9} {'p95 us':>9} {'cpu us':>9}")
+    print(
+        f"{statistics.fmean(latencies):9.1f} "
+        f"{latencies[len(latencies) // 2]:9.1f} "
+        f"{latencies[int(len(latencies) * 0.95)]:9.1f} "
+        f"{cpu / args.reports * 1e6:9.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Compare ingest and frame timing jitter in one- and two-process mode.
+
+Runs the same workload twice: an ingest task parsing bursts of status
+reports on a fixed tick, and a render task drawing a 128x64 chained
+display (2x2 serpentine) at a fixed frame rate. First both share one
+event loop, as in the default mode; then the render task runs in its own
+process fed through the shared-memory state slot, as with
+``[Runtime] processes = 2``. For each task the benchmark reports how
+late its ticks fire compared with the schedule.
+
+Pinning only helps with spare cores; on a single-core machine the two
+processes still compete for the CPU.
+
+Usage:
+    PYTHONPATH=src python benchmarks/split_jitter.py [--seconds S] [--burst N]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from fluidnc_ledscreen.led_screen import LEDScreen
+from fluidnc_ledscreen.panel_map import PanelMap
+from fluidnc_ledscreen.shared_state import (
+    StatePublisher,
+    StateSlot,
+    StateSubscriber,
+    set_affinity,
+)
+from fluidnc_ledscreen.status import StatusParser
+
+REPORT = "<Jog|MPos:{x:.3f},25.400,-1.000|FS:1200,18000|WCO:0.000,0.000,0.000>"
+
+
+def _screen() -> LEDScreen:
+    """Create the benchmark display without a panel driver."""
+    return LEDScreen(
+        panel_map=PanelMap(64, 32, cols=2, rows=2, order="serpentine"),
+        use_driver=False,
+    )
+
+
+async def _ticks(
+    period: float,
+    seconds: float,
+    work: Callable[[], None],
+) -> List[float]:
+    """Run ``work`` on a fixed schedule and record tick lateness in ms."""
+    lateness = []
+    start = time.perf_counter()
+    for tick in range(int(seconds / period)):
+        deadline = start + tick * period
+        delay = deadline - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        lateness.append((time.perf_counter() - deadline) * 1000)
+        work()
+    return lateness
+
+
+def _ingest_work(target: Any, burst: int) -> Callable[[], None]:
+    """Build an ingest tick parsing ``burst`` reports into ``target``."""
+    parser = StatusParser()
+    counter = [0]
+
+    def work() -> None:
+        for _ in range(burst):
+            counter[0] += 1
+            target.update(parser.parse(REPORT.format(x=counter[0] / 1000)))
+
+    return work
+
+
+def _render_worker(
+    slot_name: str,
+    fps: float,
+    seconds: float,
+    cpus: Optional[Sequence[int]],
+    results: Any,
+) -> None:
+    """Render process entry point for the split run."""
+    set_affinity(cpus, "render")
+    slot = StateSlot(slot_name)
+    screen = _screen()
+    subscriber = StateSubscriber(slot, screen)
+
+    def work() -> None:
+        subscriber.poll()
+        screen.render()
+
+    results.put(asyncio.run(_ticks(1.0 / fps, seconds, work)))
+    slot.close()
+
+
+def _summary(lateness: List[float]) -> str:
+    """Format lateness percentiles."""
+    values = sorted(lateness)
+    p50 = values[len(values) // 2]
+    p99 = values[int(len(values) * 0.99)]
+    return f"p50 {p50:6.2f} ms  p99 {p99:6.2f} ms  max {values[-1]:6.2f} ms"
+
+
+async def _single(args: argparse.Namespace) -> Dict[str, List[float]]:
+    """Run ingest and render in one event loop."""
+    screen = _screen()
+    render = _ticks(1.0 / args.fps, args.seconds, screen.render)
+    ingest = _ticks(args.tick, args.seconds, _ingest_work(screen, args.burst))
+    frames, ticks = await asyncio.gather(render, ingest)
+    return {"render": frames, "ingest": ticks}
+
+
+def _split(args: argparse.Namespace) -> Dict[str, List[float]]:
+    """Run ingest here and render in a second process."""
+    ctx = multiprocessing.get_context("spawn")
+    publisher = StatePublisher(StateSlot(create=True))
+    results = ctx.Queue()
+    render = ctx.Process(
+        target=_render_worker,
+        args=(publisher.slot.name, args.fps, args.seconds, args.render_cpus, results),
+    )
+    render.start()
+    set_affinity(args.ingest_cpus, "ingest")
+    try:
+        work = _ingest_work(publisher, args.burst)
+        ticks = asyncio.run(_ticks(args.tick, args.seconds, work))
+        frames = results.get()
+    finally:
+        render.join()
+        publisher.cleanup()
+    return {"render": frames, "ingest": ticks}
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--tick", type=float, default=0.01, help="ingest tick (s)")
+    parser.add_argument("--burst", type=int, default=20, help="reports per tick")
+    args = parser.parse_args()
+    cpus = sorted(os.sched_getaffinity(0))
+    args.ingest_cpus = cpus[:1] if len(cpus) > 1 else None
+    args.render_cpus = cpus[1:2] if len(cpus) > 1 else None
+
+    print(f"CPUs available: {len(cpus)}")
+    runs = (
+        ("one process", lambda: asyncio.run(_single(args))),
+        ("two processes", lambda: _split(args)),
+    )
+    for name, run in runs:
+        result = run()
+        print(name)
+        for task in ("ingest", "render"):
+            print(f"  {task:<7} {_summary(result[task])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Compare per-report latency and CPU cost of the controller transports.
+
+Starts a local stand-in FluidNC (WebSocket on one port, raw TCP on
+another) in a separate process, then polls it with ``?`` over each
+transport and reports round-trip latency and client CPU time per status
+report. The client path is the one the application uses: transport,
+line splitter and status parser.
+
+Usage:
+    PYTHONPATH=src python benchmarks/transport_benchmark.py [--reports N]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import time
+from typing import Dict, List
+
+import websockets
+
+from fluidnc_ledscreen.status import StatusParser
+from fluidnc_ledscreen.transport import LineSplitter, Transport, create_transport
+
+HOST = "127.0.0.1"
+WS_PORT = 18081
+TCP_PORT = 18023
+REPORT = "<Run|MPos:{n:.3f},25.400,-1.000|FS:1200,18000|WCO:0.000,0.000,0.000>\r\n"
+
+
+async def _serve() -> None:
+    """Run the stand-in controller until the process is terminated."""
+    counter = {"n": 0}
+
+    def report() -> str:
+        counter["n"] += 1
+        return REPORT.format(n=counter["n"] / 1000)
+
+    async def ws_handler(websocket) -> None:
+        async for message in websocket:
+            if message == "?":
+                await websocket.send(report().encode())
+
+    async def tcp_handler(reader, writer) -> None:
+        while True:
+            data = await reader.read(64)
+            if not data:
+                break
+            for _ in range(data.count(b"?")):
+                writer.write(report().encode())
+            await writer.drain()
+
+    async with websockets.serve(ws_handler, HOST, WS_PORT, compression=None):
+        server = await asyncio.start_server(tcp_handler, HOST, TCP_PORT)
+        async with server:
+            await server.serve_forever()
+
+
+def _server_main() -> None:
+    """Process entry point for the stand-in controller."""
+    asyncio.run(_serve())
+
+
+async def _measure(transport: Transport, reports: int) -> Dict[str, float]:
+    """Poll a transport and time each status report.
+
+    Args:
+        transport: Unopened transport
+        reports: Number of reports to collect
+
+    Returns:
+        Latency statistics in microseconds and CPU time per report
+    """
+    splitter = LineSplitter()
+    parser = StatusParser()
+    await transport.open()
+    latencies: List[float] = []
+    cpu_start = time.process_time()
+    try:
+        for _ in range(reports):
+            started = time.perf_counter()
+            await transport.write("?")
+            done = False
+            while not done:
+                for line in splitter.feed(await transport.recv()):
+                    parsed = parser.parse(line)
+                    if parsed and parsed["type"] == "status":
+                        done = True
+            latencies.append((time.perf_counter() - started) * 1e6)
+    finally:
+        cpu = time.process_time() - cpu_start
+        await transport.close()
+    latencies.sort()
+    return {
+        "mean_us": statistics.fmean(latencies),
+        "p50_us": latencies[len(latencies) // 2],
+        "p95_us": latencies[int(len(latencies) * 0.95)],
+        "cpu_us": cpu / reports * 1e6,
+    }
+
+
+async def _run(reports: int) -> None:
+    """Benchmark both transports and print a table."""
+    ports = {"websocket": WS_PORT, "tcp": TCP_PORT}
+    print(f"{'transport':<10} {'mean us':>9} {'p50 us':>9} {'p95 us':>9} {'cpu us':>9}")
+    for kind, port in ports.items():
+        # Warm up connection setup and code paths
+        await _measure(create_transport(kind, HOST, port), 50)
+        result = await _measure(create_transport(kind, HOST, port), reports)
+        print(
+            f"{kind:<10} {result['mean_us']:9.1f} {result['p50_us']:9.1f} "
+            f"{result['p95_us']:9.1f} {result['cpu_us']:9.1f}"
+        )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reports", type=int, default=2000)
+    args = parser.parse_args()
+
+    server = multiprocessing.Process(target=_server_main, daemon=True)
+    server.start()
+    time.sleep(1.0)
+    try:
+        asyncio.run(_run(args.reports))
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,42 +7,120 @@ network and manage their connections.
 import asyncio
 import json
 import logging
-from typing import Optional
+import signal
+import threading
+from typing import Dict, List, Optional, Tuple
 
 import websockets
 from zeroconf import ServiceBrowser, ServiceInfo, Zeroconf
 
+from fluidnc_ledscreen.runtime import spawn
+
 logger = logging.getLogger(__name__)
 
 
+ADDED = "added"
+REMOVED = "removed"
+
+
+class ControllerRecord:
+    """Compact record of a discovered controller.
+
+    Zeroconf ``ServiceInfo`` objects carry caches, locks and raw DNS
+    records; the monitor keeps only what it needs for as long as the
+    controller is on the network.
+
+    Attributes:
+        name: Service name
+        server: Host name of the controller
+        port: Service port
+        addresses: Addresses in presentation format
+    """
+
+    __slots__ = ("name", "server", "port", "addresses")
+
+    def __init__(
+        self,
+        name: str,
+        server: Optional[str],
+        port: Optional[int],
+        addresses: Tuple[str, ...],
+    ) -> None:
+        """Initialize the record.
+
+        Args:
+            name: Service name
+            server: Host name of the controller
+            port: Service port
+            addresses: Addresses in presentation format
+        """
+        self.name = name
+        self.server = server
+        self.port = port
+        self.addresses = addresses
+
+    @classmethod
+    def from_info(cls, info: ServiceInfo) -> "ControllerRecord":
+        """Copy the relevant fields of a service info.
+
+        Args:
+            info: Resolved service
+
+        Returns:
+            Controller record
+        """
+        return cls(info.name, info.server, info.port, tuple(info.parsed_addresses()))
+
+    def parsed_addresses(self) -> List[str]:
+        """Get the addresses, like ``ServiceInfo.parsed_addresses``."""
+        return list(self.addresses)
+
+
 class FluidNCMonitor:
     """Monitor for FluidNC controllers on the network.
 
     This class handles discovery and monitoring of FluidNC controllers
     using Zeroconf/mDNS.
+
+    Zeroconf reports services on its own thread. Events are handed to the
+    owning event loop with ``call_soon_threadsafe`` and settle there for
+    ``debounce`` seconds, so an add/remove flap collapses into its final
+    state and the callbacks run on the loop, once per real change.
     """
 
     def __init__(
         self,
         on_controller_found: Optional[callable] = None,
         on_controller_lost: Optional[callable] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        debounce: float = 1.0,
     ) -> None:
         """Initialize the FluidNC monitor.
 
         Args:
             on_controller_found: Callback when a controller is found
             on_controller_lost: Callback when a controller is lost
+            loop: Event loop the callbacks run on (default: the running
+                loop)
+            debounce: Seconds a service must stay added or removed before
+                the callbacks fire
+
+        Raises:
+            RuntimeError: If no loop is given and none is running
         """
-        self.zeroconf = Zeroconf()
-        service_type = "_fluidnc._tcp.local."
-        self.browser = ServiceBrowser(
-            zeroconf=self.zeroconf,
-            type_=service_type,
-            handler=self,
-        )
-        self.controllers = {}
+        self.loop = loop or asyncio.get_running_loop()
+        self.debounce = debounce
+        self.controllers: Dict[str, ControllerRecord] = {}
         self.on_controller_found = on_controller_found
         self.on_controller_lost = on_controller_lost
+        self._lock = threading.Lock()
+        # Latest unsettled event and its timer per service name (loop only)
+        self._pending: Dict[str, Tuple[str, Optional[ControllerRecord]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._closed = False
+        self.zeroconf = Zeroconf()
+        service_type = "_fluidnc._tcp.local."
+        self.browser = ServiceBrowser(self.zeroconf, service_type, listener=self)
 
     def remove_service(
         self,
@@ -50,17 +128,14 @@ class FluidNCMonitor:
         service_type: str,
         name: str,
     ) -> None:
-        """Handle service removal.
+        """Handle service removal (zeroconf thread).
 
         Args:
             zeroconf: Zeroconf instance
             service_type: Type of service
             name: Name of service
         """
-        if name in self.controllers:
-            controller = self.controllers.pop(name)
-            if self.on_controller_lost:
-                self.on_controller_lost(controller)
+        self._post(name, REMOVED, None)
 
     def add_service(
         self,
@@ -68,7 +143,7 @@ class FluidNCMonitor:
         service_type: str,
         name: str,
     ) -> None:
-        """Handle service addition.
+        """Handle service addition (zeroconf thread).
 
         Args:
             zeroconf: Zeroconf instance
@@ -77,21 +152,98 @@ class FluidNCMonitor:
         """
         info = zeroconf.get_service_info(service_type, name)
         if info:
-            self.controllers[name] = info
-            if self.on_controller_found:
-                self.on_controller_found(info)
+            self._post(name, ADDED, ControllerRecord.from_info(info))
+
+    def update_service(
+        self,
+        zeroconf: Zeroconf,
+        service_type: str,
+        name: str,
+    ) -> None:
+        """Handle a service update such as a new address (zeroconf thread).
+
+        Args:
+            zeroconf: Zeroconf instance
+            service_type: Type of service
+            name: Name of service
+        """
+        self.add_service(zeroconf, service_type, name)
+
+    def _post(self, name: str, event: str, info: Optional[ControllerRecord]) -> None:
+        """Hand a discovery event to the event loop.
+
+        Args:
+            name: Service name
+            event: ``added`` or ``removed``
+            info: Controller record for additions
+        """
+        try:
+            self.loop.call_soon_threadsafe(self._schedule, name, event, info)
+        except RuntimeError:
+            # Loop already closed during shutdown
+            pass
+
+    def _schedule(
+        self,
+        name: str,
+        event: str,
+        info: Optional[ControllerRecord],
+    ) -> None:
+        """Record the latest event for a service and restart its timer.
 
-    def get_controllers(self) -> list[ServiceInfo]:
+        Args:
+            name: Service name
+            event: ``added`` or ``removed``
+            info: Controller record for additions
+        """
+        if self._closed:
+            return
+        self._pending[name] = (event, info)
+        timer = self._timers.pop(name, None)
+        if timer:
+            timer.cancel()
+        self._timers[name] = self.loop.call_later(self.debounce, self._settle, name)
+
+    def _settle(self, name: str) -> None:
+        """Apply the final event of a service once it stopped flapping.
+
+        Args:
+            name: Service name
+        """
+        self._timers.pop(name, None)
+        event, info = self._pending.pop(name)
+        with self._lock:
+            known = self.controllers.get(name)
+            if event == ADDED:
+                if known and known.addresses == info.addresses:
+                    return
+                self.controllers[name] = info
+            elif known:
+                del self.controllers[name]
+            else:
+                return
+        if event == ADDED and self.on_controller_found:
+            self.on_controller_found(info)
+        elif event == REMOVED and self.on_controller_lost:
+            self.on_controller_lost(known)
+
+    def get_controllers(self) -> list[ControllerRecord]:
         """Get list of discovered controllers.
 
         Returns:
             List of discovered FluidNC controllers
         """
-        return list(self.controllers.values())
+        with self._lock:
+            return list(self.controllers.values())
 
     def close(self) -> None:
         """Close the monitor and cleanup resources."""
+        self._closed = True
         self.zeroconf.close()
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        self._pending.clear()
 
 
 class FluidNCClient:
@@ -118,6 +270,7 @@ class FluidNCClient:
         self.on_message = on_message
         self.websocket = None
         self.running = False
+        self._reader: Optional[asyncio.Task] = None
 
     async def connect(self) -> None:
         """Establish connection to the controller."""
@@ -125,7 +278,8 @@ class FluidNCClient:
             uri = f"ws://{self.host}:{self.port}/ws"
             self.websocket = await websockets.connect(uri)
             self.running = True
-            asyncio.create_task(self._handle_messages())
+            # Keep a reference: the loop only holds tasks weakly
+            self._reader = spawn(self._handle_messages())
         except Exception as e:
             logger.error("Failed to connect to FluidNC: %s", str(e))
             self.running = False
@@ -134,6 +288,9 @@ class FluidNCClient:
     async def disconnect(self) -> None:
         """Close connection to the controller."""
         self.running = False
+        reader, self._reader = self._reader, None
+        if reader and reader is not asyncio.current_task():
+            reader.cancel()
         if self.websocket:
             try:
                 await self.websocket.close()
@@ -171,7 +328,12 @@ class FluidNCClient:
 
 
 async def main() -> None:
-    """Run the monitor until interrupted."""
+    """Run the monitor until SIGINT or SIGTERM.
+
+    Standalone discovery only; the LED screen application
+    (``python -m fluidnc_ledscreen.main``) runs discovery, the connection
+    and the display as supervised services on one loop.
+    """
     # Set up logging
     logging.basicConfig(
         level=logging.INFO,
@@ -192,11 +354,12 @@ async def main() -> None:
         on_controller_lost=log_controller_lost,
     )
 
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopped.set)
     try:
-        # Keep running until interrupted
-        while True:
-            await asyncio.sleep(1)
-    except KeyboardInterrupt:
+        await stopped.wait()
         logger.info("Shutting down...")
     finally:
         monitor.close()
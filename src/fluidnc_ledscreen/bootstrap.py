@@ -0,0 +1,317 @@
+"""Controller address selection at startup and on reconnect.
+
+Trying the configured IP first and only then falling back to discovery
+costs a full connect timeout whenever the static address is stale. The
+bootstrapper instead races every candidate at once, happy-eyeballs
+style: the configured address, the last address that worked (persisted
+on disk) and whatever mDNS turns up while the attempts are running. The
+first transport to complete its handshake wins and the other attempts
+are cancelled.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fluidnc_ledscreen.config import state_path
+from fluidnc_ledscreen.connection_profile import ConnectionProfile
+from fluidnc_ledscreen.metrics import Metrics
+from fluidnc_ledscreen.transport import Transport, create_transport
+
+try:
+    from zeroconf import ServiceStateChange
+    from zeroconf.asyncio import AsyncServiceBrowser, AsyncServiceInfo, AsyncZeroconf
+except ImportError:  # pragma: no cover - discovery is optional
+    AsyncZeroconf = None
+
+logger = logging.getLogger(__name__)
+
+MDNS_SERVICE = "_fluidnc._tcp.local."
+
+SOURCE_STATIC = "static"
+SOURCE_CACHE = "cache"
+SOURCE_MDNS = "mdns"
+
+# Type aliases
+CandidateCallback = Callable[[str, str], None]
+
+
+class AddressCache:
+    """Last-known-good controller address, persisted as JSON.
+
+    Attributes:
+        path: Cache file path
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            path: Cache file (default: ``last_controller.json`` in the
+                state directory)
+        """
+        self.path = path or state_path("last_controller.json")
+
+    def load(self, transport: str) -> Optional[str]:
+        """Get the cached host for a transport kind.
+
+        Args:
+            transport: Transport kind the address was used with
+
+        Returns:
+            Cached host, or None
+        """
+        return self.entry(transport).get("host")
+
+    def entry(self, transport: str) -> Dict[str, Any]:
+        """Get the cached record for a transport kind.
+
+        Args:
+            transport: Transport kind the address was used with
+
+        Returns:
+            Record with ``host`` and, if known, the mDNS ``name``; empty
+            if nothing usable is cached
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring address cache %s: %s", self.path, str(e))
+            return {}
+        if not isinstance(data, dict) or data.get("transport") != transport:
+            return {}
+        return data
+
+    def save(self, transport: str, host: str, name: Optional[str] = None) -> None:
+        """Remember a host that accepted a connection.
+
+        Args:
+            transport: Transport kind
+            host: Controller host
+            name: Controller mDNS name, if known
+        """
+        data = {"transport": transport, "host": host, "saved": time.time()}
+        if name:
+            data["name"] = name
+        tmp = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Failed to save address cache %s: %s", self.path, str(e))
+
+
+class Bootstrapper:
+    """Opens a transport to whichever controller address answers first.
+
+    Attributes:
+        kind: Transport kind (``websocket`` or ``tcp``)
+        static_host: Configured address, or None
+        port: Port (default for the transport when None)
+        profile: Connection tuning
+        cache: Last-known-good address store
+        discovery: Whether to browse mDNS while connecting
+        discovery_timeout: Seconds to keep browsing for candidates
+        mdns_service: mDNS service type to browse
+        metrics: Metrics registry
+        host: Host of the last successful connection
+        source: Where that host came from (``static``, ``cache``, ``mdns``)
+        names: mDNS service names of the addresses seen while browsing
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        static_host: Optional[str],
+        port: Optional[int] = None,
+        profile: Optional[ConnectionProfile] = None,
+        cache: Optional[AddressCache] = None,
+        discovery: bool = True,
+        discovery_timeout: float = 10.0,
+        mdns_service: str = MDNS_SERVICE,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """Initialize the bootstrapper.
+
+        Args:
+            kind: Transport kind (``websocket`` or ``tcp``)
+            static_host: Configured address, or None
+            port: Port (default for the transport when None)
+            profile: Connection tuning
+            cache: Last-known-good address store (default: :class:`AddressCache`)
+            discovery: Whether to browse mDNS while connecting
+            discovery_timeout: Seconds to keep browsing for candidates
+            mdns_service: mDNS service type to browse
+            metrics: Metrics registry
+        """
+        self.kind = kind
+        self.static_host = static_host
+        self.port = port
+        self.profile = profile or ConnectionProfile()
+        self.cache = cache or AddressCache()
+        self.discovery = discovery and AsyncZeroconf is not None
+        self.discovery_timeout = discovery_timeout
+        self.mdns_service = mdns_service
+        self.metrics = metrics or Metrics()
+        self.host: Optional[str] = None
+        self.source: Optional[str] = None
+        self.names: Dict[str, str] = {}
+        if discovery and AsyncZeroconf is None:
+            logger.warning("zeroconf is not installed, mDNS discovery disabled")
+
+    @property
+    def controller(self) -> Optional[str]:
+        """Identity of the connected controller.
+
+        The mDNS service name when the address was seen while browsing,
+        otherwise the address itself.
+        """
+        if not self.host:
+            return None
+        return self.names.get(self.host, self.host)
+
+    def candidates(self) -> List[Tuple[str, str]]:
+        """Get the addresses known before discovery starts.
+
+        Returns:
+            ``(host, source)`` pairs, previous winner first
+        """
+        found = []
+        if self.host:
+            found.append((self.host, self.source))
+        cached = self.cache.entry(self.kind)
+        if cached.get("host"):
+            if cached.get("name"):
+                self.names.setdefault(cached["host"], cached["name"])
+            found.append((cached["host"], SOURCE_CACHE))
+        if self.static_host:
+            found.append((self.static_host, SOURCE_STATIC))
+        return found
+
+    async def open(self) -> Transport:
+        """Race all candidate addresses and return the first open transport.
+
+        Returns:
+            Open transport
+
+        Raises:
+            ConnectionRefusedError: If no candidate answered
+        """
+        started = time.perf_counter()
+        results: asyncio.Queue = asyncio.Queue()
+        attempts: List[asyncio.Task] = []
+        tried = set()
+
+        def attempt(host: str, source: str) -> None:
+            if host in tried:
+                return
+            tried.add(host)
+            logger.info("Trying controller at %s (%s)", host, source)
+            attempts.append(asyncio.create_task(self._attempt(host, source, results)))
+
+        for host, source in self.candidates():
+            attempt(host, source)
+        browser = None
+        if self.discovery:
+            browser = asyncio.create_task(self._browse(attempt, results))
+
+        winner = None
+        failures = 0
+        browsing = browser is not None
+        try:
+            while winner is None and (browsing or failures < len(tried)):
+                outcome = await results.get()
+                if outcome is None:
+                    browsing = False
+                elif outcome is False:
+                    failures += 1
+                else:
+                    winner = outcome
+        finally:
+            tasks = attempts + ([browser] if browser else [])
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Close late finishers that lost the race
+            while not results.empty():
+                late = results.get_nowait()
+                if late and late is not winner:
+                    await late[0].close()
+
+        if not winner:
+            addresses = ", ".join(tried) or "any address"
+            raise ConnectionRefusedError(f"No controller answered at {addresses}")
+        transport, host, source = winner
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.host, self.source = host, source
+        self.metrics.set("bootstrap_ms", elapsed_ms)
+        self.metrics.set("bootstrap_source", source)
+        logger.info("Using %s (%s) after %.1f ms", host, source, elapsed_ms)
+        if source != SOURCE_CACHE:
+            self.cache.save(self.kind, host, self.names.get(host))
+        return transport
+
+    async def _attempt(self, host: str, source: str, results: asyncio.Queue) -> None:
+        """Open a transport to one candidate and report success.
+
+        Args:
+            host: Candidate address
+            source: Where the candidate came from
+            results: Race queue; receives ``(transport, host, source)``
+                or False on failure
+        """
+        transport = create_transport(self.kind, host, self.port, self.profile)
+        try:
+            await transport.open()
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.info("Controller at %s (%s) failed: %s", host, source, str(e))
+            results.put_nowait(False)
+            return
+        except asyncio.CancelledError:
+            await transport.close()
+            raise
+        results.put_nowait((transport, host, source))
+
+    async def _browse(self, attempt: CandidateCallback, results: asyncio.Queue) -> None:
+        """Feed mDNS results into the race until the discovery timeout.
+
+        Args:
+            attempt: Callback starting an attempt for a discovered host
+            results: Race queue; receives None when browsing ends
+        """
+        aiozc = AsyncZeroconf()
+        names: asyncio.Queue = asyncio.Queue()
+
+        def on_change(zeroconf, service_type, name, state_change) -> None:
+            if state_change is ServiceStateChange.Added:
+                names.put_nowait(name)
+
+        zc = aiozc.zeroconf
+        browser = AsyncServiceBrowser(zc, [self.mdns_service], handlers=[on_change])
+        deadline = time.monotonic() + self.discovery_timeout
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    name = await asyncio.wait_for(names.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                info = AsyncServiceInfo(self.mdns_service, name)
+                if await info.async_request(zc, 3000):
+                    for address in info.parsed_addresses():
+                        self.names[address] = name
+                        attempt(address, SOURCE_MDNS)
+        finally:
+            await browser.async_cancel()
+            await aiozc.async_close()
+            results.put_nowait(None)
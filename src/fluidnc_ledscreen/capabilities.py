@@ -0,0 +1,208 @@
+"""Controller capabilities, cached across connections.
+
+The display wants to know the firmware (``$I``), the number of axes and
+the configured units (``$G``) of the controller it talks to. Asking on
+every connect would put a settings round trip in front of the first
+useful frame, so the answers are cached on disk per controller (its mDNS
+name, or its address when the name is unknown) and firmware build. A
+reconnect uses the cached entry straight away; the controller is asked
+again in the background once status reports flow, and the cache is
+updated if anything changed (e.g. after a firmware update).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fluidnc_ledscreen.config import state_path
+
+logger = logging.getLogger(__name__)
+
+# Type aliases
+SendCallback = Callable[[str], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class Capabilities:
+    """What a controller reported about itself.
+
+    Attributes:
+        build: Version string from ``[VER:...]``, identifying the build
+        firmware: Firmware name and version (e.g. ``FluidNC v3.7.8``)
+        options: Build options from ``[OPT:...]``
+        axes: Number of axes in the status reports
+        units: ``mm`` or ``inch`` (G21/G20 modal state)
+    """
+
+    build: str = ""
+    firmware: str = ""
+    options: str = ""
+    axes: int = 3
+    units: str = "mm"
+
+    def to_message(self) -> Dict[str, Any]:
+        """Get the capabilities as a protocol message for the display.
+
+        Returns:
+            Message with ``type`` ``capabilities``
+        """
+        return {"type": "capabilities", **asdict(self)}
+
+
+class CapabilityCache:
+    """Capabilities per controller and firmware build, persisted as JSON.
+
+    Attributes:
+        path: Cache file path
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            path: Cache file (default: ``capabilities.json`` in the state
+                directory)
+        """
+        self.path = path or state_path("capabilities.json")
+
+    def _load(self) -> Dict[str, Any]:
+        """Read the cache file."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring capability cache %s: %s", self.path, str(e))
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, name: str, build: Optional[str] = None) -> Optional[Capabilities]:
+        """Get the cached capabilities of a controller.
+
+        Args:
+            name: Controller mDNS name or address
+            build: Firmware build the entry must match (None: the build
+                seen last)
+
+        Returns:
+            Cached capabilities, or None
+        """
+        entry = self._load().get(name)
+        if not isinstance(entry, dict):
+            return None
+        entry = dict(entry)
+        entry.pop("saved", None)
+        try:
+            capabilities = Capabilities(**entry)
+        except TypeError:
+            return None
+        if build is not None and capabilities.build != build:
+            return None
+        return capabilities
+
+    def put(self, name: str, capabilities: Capabilities) -> None:
+        """Store the capabilities of a controller.
+
+        Args:
+            name: Controller mDNS name or address
+            capabilities: Capabilities reported by the controller
+        """
+        data = self._load()
+        data[name] = {**asdict(capabilities), "saved": time.time()}
+        tmp = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Failed to save capability cache %s: %s", self.path, str(e))
+
+
+class CapabilityProbe:
+    """Asks a controller for its capabilities and collects the answers.
+
+    Feed every parsed protocol message to :meth:`observe` while
+    :meth:`run` is waiting; the replies to the probe's own commands are
+    consumed rather than passed on, so a reconnect does not put the
+    firmware banner on the display.
+    """
+
+    def __init__(self, timeout: float = 3.0, axes: Optional[int] = None) -> None:
+        """Initialize the probe.
+
+        Args:
+            timeout: Seconds to wait for the answers
+            axes: Number of axes seen in the status reports so far
+        """
+        self.timeout = timeout
+        self._fields: Dict[str, Any] = {"axes": axes} if axes else {}
+        self._complete = asyncio.Event()
+        # Inside a $I or $G reply, which ends with ok or error
+        self._replying = False
+
+    def observe(self, message: Dict[str, Any]) -> bool:
+        """Collect capability information from a parsed message.
+
+        Args:
+            message: Output of :class:`~fluidnc_ledscreen.status.StatusParser`
+
+        Returns:
+            Whether the message belongs to a reply to the probe and should
+            not be passed on
+        """
+        kind = message.get("type")
+        if kind == "status":
+            if "mpos" in message:
+                self._fields["axes"] = len(message["mpos"])
+            return False
+        if kind in ("ok", "error"):
+            if not self._replying:
+                return False
+            self._replying = False
+            if "build" in self._fields and "units" in self._fields:
+                self._complete.set()
+            return True
+        if kind == "message":
+            # $I adds [MSG:...] lines (machine name, WiFi mode and address)
+            return self._replying
+        if kind != "info":
+            return False
+        line = message["line"]
+        if line.startswith("[VER:") and line.endswith("]"):
+            # e.g. [VER:3.7 FluidNC v3.7.8:] or [VER:1.1h.20190825:name]
+            build = line[5:-1].rstrip(":")
+            self._fields["build"] = build
+            self._fields["firmware"] = build.partition(" ")[2].split(":")[0] or build
+        elif line.startswith("[OPT:") and line.endswith("]"):
+            self._fields["options"] = line[5:-1]
+        elif line.startswith("[GC:") and line.endswith("]"):
+            modes = line[4:-1].split()
+            self._fields["units"] = "inch" if "G20" in modes else "mm"
+        else:
+            return False
+        self._replying = True
+        return True
+
+    async def run(self, send: SendCallback) -> Optional[Capabilities]:
+        """Query the controller.
+
+        Args:
+            send: Coroutine function sending one line to the controller
+
+        Returns:
+            Reported capabilities, or None if the controller did not
+            answer in time
+        """
+        await send("$I")
+        await send("$G")
+        try:
+            await asyncio.wait_for(self._complete.wait(), self.timeout)
+        except asyncio.TimeoutError:
+            return None
+        return Capabilities(**self._fields)
@@ -0,0 +1,72 @@
+"""Configuration loading for FluidNC LED Screen Monitor.
+
+This module reads the INI configuration file shared with the monitor
+container and makes sure every section the application consults exists,
+so callers can use ``getint``/``getfloat`` fallbacks without guarding.
+"""
+
+import configparser
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = os.environ.get(
+    "FLUIDNC_CONFIG",
+    os.path.join("config", "fluidnc_config.ini"),
+)
+
+# Runtime state that should survive restarts (the logs volume in Docker)
+DEFAULT_STATE_DIR = os.environ.get("FLUIDNC_STATE_DIR", "logs")
+
+# Diagnostic output such as profiles
+DEFAULT_LOG_DIR = os.environ.get("FLUIDNC_LOG_DIR", "logs")
+
+# Sections the application reads; created empty when absent
+SECTIONS = (
+    "FluidNC",
+    "Display",
+    "Panels",
+    "Reporting",
+    "Connection",
+    "Runtime",
+    "Watchdog",
+    "Dashboard",
+    "Governor",
+    "Diagnostics",
+    "Outbox",
+    "Utilization",
+)
+
+
+def load_config(path: Optional[str] = None) -> configparser.ConfigParser:
+    """Load the application configuration.
+
+    Args:
+        path: Path to the INI file (default: ``FLUIDNC_CONFIG`` or
+            ``config/fluidnc_config.ini``)
+
+    Returns:
+        Parsed configuration with all known sections present
+    """
+    path = path or DEFAULT_CONFIG_PATH
+    parser = configparser.ConfigParser()
+    if not parser.read(path):
+        logger.warning("Configuration file %s not found, using defaults", path)
+    for section in SECTIONS:
+        if not parser.has_section(section):
+            parser.add_section(section)
+    return parser
+
+
+def state_path(name: str) -> str:
+    """Get the path of a persistent state file.
+
+    Args:
+        name: File name inside the state directory
+
+    Returns:
+        Path under ``FLUIDNC_STATE_DIR`` (default: ``logs``)
+    """
+    return os.path.join(DEFAULT_STATE_DIR, name)
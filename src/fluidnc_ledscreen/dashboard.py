@@ -0,0 +1,347 @@
+"""Built-in web dashboard streaming machine status over Server-Sent Events.
+
+A small asyncio HTTP server runs inside the application, so browsers
+watch the state the application has already parsed instead of opening
+their own connections to the controller. Each client gets a stream of
+deltas (only the fields that changed since its last event) at no more
+than ``max_rate`` events per second; changes arriving faster are
+conflated into the next event. Serving a client costs one event per
+interval however busy the controller is, and a slow client only delays
+its own stream.
+
+Endpoints:
+    ``/``        the dashboard page
+    ``/events``  SSE stream; the first event holds the full state
+    ``/state``   JSON snapshot of the full state
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from asyncio import StreamReader, StreamWriter
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from fluidnc_ledscreen.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+# Keys of protocol messages that are not display state
+IGNORED_KEYS = ("type",)
+
+# Largest request head accepted
+MAX_REQUEST = 8192
+
+# Type aliases
+Handler = Callable[["Request", StreamWriter], Awaitable[None]]
+
+
+class StateHub:
+    """Latest machine state with a version number per field.
+
+    Every change bumps a global version and stamps the changed field
+    with it, so the delta since any earlier version is cheap to compute
+    and no per-client history has to be kept.
+
+    Attributes:
+        state: Latest value of every field
+        version: Version of the latest change
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty hub."""
+        self.state: Dict[str, Any] = {}
+        self.version = 0
+        self._versions: Dict[str, int] = {}
+        self._waiters: Set[asyncio.Event] = set()
+
+    def publish(self, update: Dict[str, Any]) -> None:
+        """Merge changed fields and wake the streams.
+
+        Args:
+            update: Field values; unchanged values are ignored
+        """
+        changed = False
+        for key, value in update.items():
+            if key in IGNORED_KEYS or self.state.get(key, self) == value:
+                continue
+            if not changed:
+                self.version += 1
+                changed = True
+            self.state[key] = value
+            self._versions[key] = self.version
+        if changed:
+            for event in self._waiters:
+                event.set()
+
+    def delta(self, since: int) -> Dict[str, Any]:
+        """Get the fields changed after a version.
+
+        Args:
+            since: Version the client has already seen
+
+        Returns:
+            Changed fields and their latest values
+        """
+        if since <= 0:
+            return dict(self.state)
+        return {key: self.state[key] for key, v in self._versions.items() if v > since}
+
+    def subscribe(self) -> asyncio.Event:
+        """Get an event that is set whenever the state changes."""
+        event = asyncio.Event()
+        self._waiters.add(event)
+        return event
+
+    def unsubscribe(self, event: asyncio.Event) -> None:
+        """Stop waking an event from :meth:`subscribe`."""
+        self._waiters.discard(event)
+
+
+class Request:
+    """Parsed HTTP request head.
+
+    Attributes:
+        method: Request method
+        path: Path without the query string
+        query: Query string
+        headers: Header values by lower-case name
+    """
+
+    def __init__(self, method: str, target: str, headers: Dict[str, str]) -> None:
+        """Initialize the request.
+
+        Args:
+            method: Request method
+            target: Request target (path and query)
+            headers: Header values by lower-case name
+        """
+        self.method = method
+        self.path, _, self.query = target.partition("?")
+        self.headers = headers
+
+
+class DashboardServer:
+    """HTTP server for the dashboard and its event streams.
+
+    Attributes:
+        hub: State shown to clients
+        host: Listen address
+        port: Listen port
+        max_rate: Maximum events per second per client
+        max_clients: Maximum concurrent streams
+        keepalive: Seconds between SSE comments on an idle stream
+        send_timeout: Seconds a client may take to accept an event
+        routes: Handlers by path
+        metrics: Metrics registry
+    """
+
+    def __init__(
+        self,
+        hub: Optional[StateHub] = None,
+        host: str = "0.0.0.0",  # nosec B104 - dashboard is meant for the LAN
+        port: int = 8080,
+        max_rate: float = 5.0,
+        max_clients: int = 16,
+        keepalive: float = 15.0,
+        send_timeout: float = 5.0,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """Initialize the server.
+
+        Args:
+            hub: State shown to clients (default: a new :class:`StateHub`)
+            host: Listen address
+            port: Listen port
+            max_rate: Maximum events per second per client
+            max_clients: Maximum concurrent streams
+            keepalive: Seconds between SSE comments on an idle stream
+            send_timeout: Seconds a client may take to accept an event
+                before it is disconnected
+            metrics: Metrics registry
+        """
+        self.hub = hub or StateHub()
+        self.host = host
+        self.port = port
+        self.max_rate = max_rate
+        self.max_clients = max_clients
+        self.keepalive = keepalive
+        self.send_timeout = send_timeout
+        self.metrics = metrics or Metrics()
+        self.routes: Dict[str, Handler] = {
+            "/": self._page,
+            "/events": self._events,
+            "/state": self._state,
+        }
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._page_body = b""
+        self._streams = 0
+        self._clients: Dict[asyncio.Event, Tuple[asyncio.Task, StreamWriter]] = {}
+
+    async def start(self) -> None:
+        """Start listening.
+
+        Raises:
+            OSError: If the port cannot be bound
+        """
+        with open(os.path.join(STATIC_DIR, "dashboard.html"), "rb") as f:
+            self._page_body = f.read()
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=MAX_REQUEST
+        )
+        logger.info("Dashboard listening on http://%s:%d/", self.host, self.port)
+
+    async def stop(self) -> None:
+        """Stop listening and close the open streams."""
+        if self._server:
+            self._server.close()
+            self._server = None
+        # Streams check for the closed server when woken
+        clients = list(self._clients.items())
+        for changed, (_, writer) in clients:
+            changed.set()
+            writer.close()
+        if clients:
+            await asyncio.wait([task for _, (task, _) in clients], timeout=2.0)
+
+    async def _handle(self, reader: StreamReader, writer: StreamWriter) -> None:
+        """Serve one connection (one request, no keep-alive)."""
+        try:
+            request = await asyncio.wait_for(_read_request(reader), 10.0)
+            if request is None:
+                await respond(writer, 400, "text/plain", b"Bad request\n")
+            elif request.method != "GET":
+                await respond(writer, 405, "text/plain", b"Method not allowed\n")
+            elif request.path not in self.routes:
+                await respond(writer, 404, "text/plain", b"Not found\n")
+            else:
+                await self.routes[request.path](request, writer)
+        except (ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.LimitOverrunError:
+            await respond(writer, 431, "text/plain", b"Request too large\n")
+        finally:
+            writer.close()
+
+    async def _page(self, request: Request, writer: StreamWriter) -> None:
+        """Serve the dashboard page."""
+        await respond(writer, 200, "text/html; charset=utf-8", self._page_body)
+
+    async def _state(self, request: Request, writer: StreamWriter) -> None:
+        """Serve the full state as JSON."""
+        body = json.dumps(self.hub.state).encode()
+        await respond(writer, 200, "application/json", body)
+
+    async def _events(self, request: Request, writer: StreamWriter) -> None:
+        """Stream state deltas until the client goes away."""
+        if self._streams >= self.max_clients:
+            await respond(writer, 503, "text/plain", b"Too many clients\n")
+            return
+        # A reconnecting EventSource resumes from the last version it saw
+        try:
+            seen = int(request.headers.get("last-event-id", "0"))
+        except ValueError:
+            seen = 0
+        if seen > self.hub.version:
+            seen = 0
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: close\r\n\r\n"
+            b"retry: 2000\n\n"
+        )
+        changed = self.hub.subscribe()
+        changed.set()
+        self._clients[changed] = (asyncio.current_task(), writer)
+        self._streams += 1
+        self.metrics.set("dashboard_clients", self._streams)
+        interval = 1.0 / self.max_rate if self.max_rate > 0 else 0.0
+        try:
+            while self._server is not None:
+                try:
+                    await asyncio.wait_for(changed.wait(), self.keepalive)
+                except asyncio.TimeoutError:
+                    writer.write(b": keepalive\n\n")
+                    await asyncio.wait_for(writer.drain(), self.send_timeout)
+                    continue
+                changed.clear()
+                version = self.hub.version
+                delta = self.hub.delta(seen)
+                if delta:
+                    seen = version
+                    data = json.dumps(delta, separators=(",", ":"))
+                    writer.write(f"id: {version}\ndata: {data}\n\n".encode())
+                    await asyncio.wait_for(writer.drain(), self.send_timeout)
+                    self.metrics.inc("dashboard_events")
+                # Changes during the pause are conflated into the next event
+                await asyncio.sleep(interval)
+        except asyncio.TimeoutError:
+            logger.info("Dropping slow dashboard client")
+            self.metrics.inc("dashboard_slow_clients")
+        finally:
+            self.hub.unsubscribe(changed)
+            del self._clients[changed]
+            self._streams -= 1
+            self.metrics.set("dashboard_clients", self._streams)
+
+
+async def _read_request(reader: StreamReader) -> Optional[Request]:
+    """Read a request head.
+
+    Args:
+        reader: Client stream
+
+    Returns:
+        Parsed request, or None if it is malformed
+    """
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+        return None
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return Request(parts[0], parts[1], headers)
+
+
+_REASONS: Dict[int, str] = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    431: "Request Header Fields Too Large",
+    503: "Service Unavailable",
+}
+
+
+async def respond(
+    writer: StreamWriter,
+    status: int,
+    content_type: str,
+    body: bytes,
+) -> None:
+    """Send a complete response.
+
+    Args:
+        writer: Client stream
+        status: HTTP status code
+        content_type: Body media type
+        body: Response body
+    """
+    lines = [
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        "Cache-Control: no-cache",
+        "Connection: close",
+        f"Date: {time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime())}",
+    ]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
@@ -0,0 +1,193 @@
+"""Memory budget and leak detection.
+
+The monitor runs for days next to long jobs, so slow growth matters more
+than peak usage. :class:`MemoryMonitor` checks the resident set size and
+the number of live asyncio tasks at a fixed interval and publishes both
+as metrics. When the RSS stays above the configured ceiling after a
+garbage collection it asks the application to restart; the application
+shuts down cleanly and exits with :data:`RESTART_EXIT_CODE`, and the
+container or service manager starts it again.
+
+In diagnostics mode ``tracemalloc`` is enabled as well, and every
+``snapshot_interval`` seconds the allocation sites that grew the most
+since the previous snapshot are logged, together with the coroutines
+whose task counts grew. Tracing costs memory and CPU, so it stays off
+unless enabled.
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, Optional
+
+from fluidnc_ledscreen.metrics import Metrics
+from fluidnc_ledscreen.runtime import spawn
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - falls back to /proc
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# Exit status asking the supervisor for a restart (EX_TEMPFAIL)
+RESTART_EXIT_CODE = 75
+
+# Allocations made by the tracing machinery itself
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>")
+
+
+def rss_bytes() -> int:
+    """Get the resident set size of this process.
+
+    Returns:
+        RSS in bytes, or 0 if it cannot be determined
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class MemoryMonitor:
+    """Periodic RSS, task count and allocation growth checks.
+
+    Attributes:
+        check_interval: Seconds between RSS and task checks
+        rss_limit: RSS ceiling in bytes (0 disables the ceiling)
+        trace: Whether diagnostics mode (``tracemalloc``) is enabled
+        snapshot_interval: Seconds between ``tracemalloc`` snapshots
+        top: Number of growth sites reported per snapshot
+        frames: Stack frames recorded per allocation
+        on_limit: Called with a reason when the RSS ceiling is exceeded
+        metrics: Metrics registry
+    """
+
+    def __init__(
+        self,
+        check_interval: float = 60.0,
+        rss_limit_mb: float = 0.0,
+        trace: bool = False,
+        snapshot_interval: float = 600.0,
+        top: int = 10,
+        frames: int = 1,
+        on_limit: Optional[Callable[[str], None]] = None,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """Initialize the monitor.
+
+        Args:
+            check_interval: Seconds between RSS and task checks
+            rss_limit_mb: RSS ceiling in MiB (0 disables the ceiling)
+            trace: Enable ``tracemalloc`` growth reports
+            snapshot_interval: Seconds between ``tracemalloc`` snapshots
+            top: Number of growth sites reported per snapshot
+            frames: Stack frames recorded per allocation
+            on_limit: Called with a reason when the RSS ceiling is
+                exceeded
+            metrics: Metrics registry
+        """
+        self.check_interval = check_interval
+        self.rss_limit = int(rss_limit_mb * 1024 * 1024)
+        self.trace = trace
+        self.snapshot_interval = snapshot_interval
+        self.top = top
+        self.frames = frames
+        self.on_limit = on_limit
+        self.metrics = metrics or Metrics()
+        self._task: Optional[asyncio.Task] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._next_snapshot = 0.0
+        self._tasks: Counter = Counter()
+
+    def start(self) -> None:
+        """Start the periodic checks."""
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            logger.info("Memory diagnostics enabled (tracemalloc)")
+        self._next_snapshot = time.monotonic() + self.snapshot_interval
+        self._task = spawn(self._run())
+
+    def stop(self) -> None:
+        """Stop the checks and tracing."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self.trace and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._snapshot = None
+
+    async def _run(self) -> None:
+        """Check at the check interval until stopped."""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            self.check()
+
+    def check(self) -> None:
+        """Measure RSS and tasks; report growth and enforce the ceiling."""
+        self._count_tasks()
+        if self.trace and time.monotonic() >= self._next_snapshot:
+            self._next_snapshot = time.monotonic() + self.snapshot_interval
+            self._report_growth()
+        rss = rss_bytes()
+        self.metrics.set("rss_mb", rss / 2**20)
+        if not self.rss_limit or rss <= self.rss_limit:
+            return
+        # Garbage that only awaits a full collection is not a leak
+        gc.collect()
+        rss = rss_bytes()
+        if rss <= self.rss_limit:
+            return
+        reason = f"RSS {rss / 2**20:.0f} MiB above {self.rss_limit / 2**20:.0f} MiB"
+        logger.error("Memory ceiling exceeded: %s", reason)
+        self.metrics.inc("rss_limit_exceeded")
+        if self.on_limit:
+            self.on_limit(reason)
+
+    def _count_tasks(self) -> None:
+        """Publish the live task count; log coroutines whose count grew."""
+        tasks = asyncio.all_tasks()
+        self.metrics.set("tasks_live", len(tasks))
+        if not self.trace:
+            return
+        counts = Counter(task.get_coro().__qualname__ for task in tasks)
+        if self._tasks:
+            for name, count in counts.most_common():
+                was = self._tasks.get(name, 0)
+                if count > was:
+                    logger.info("Tasks: %s %d (was %d)", name, count, was)
+        self._tasks = counts
+
+    def _report_growth(self) -> None:
+        """Log the allocation sites that grew since the last snapshot."""
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, name) for name in _IGNORED_FILES]
+        )
+        current, peak = tracemalloc.get_traced_memory()
+        self.metrics.set("traced_mb", current / 2**20)
+        self.metrics.set("traced_peak_mb", peak / 2**20)
+        previous, self._snapshot = self._snapshot, snapshot
+        if previous is None:
+            return
+        stats = snapshot.compare_to(previous, "lineno")
+        growth = [stat for stat in stats if stat.size_diff > 0][: self.top]
+        if not growth:
+            logger.info("Memory growth: none since the last snapshot")
+            return
+        for stat in growth:
+            frame = stat.traceback[0]
+            logger.info(
+                "Memory growth: %s:%d %+.1f KiB (%+d blocks), %.1f KiB total",
+                frame.filename,
+                frame.lineno,
+                stat.size_diff / 1024,
+                stat.count_diff,
+                stat.size / 1024,
+            )
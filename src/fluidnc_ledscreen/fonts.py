@@ -0,0 +1,182 @@
+"""Bitmap fonts for the LED matrix.
+
+This module loads the BDF fonts shipped in the container image and turns
+them into fixed-size NumPy glyph masks, so text rendering is reduced to
+slice assignments into the frame buffer.
+"""
+
+import logging
+import os
+from typing import Dict, Optional
+
+import numpy as np
+
+try:
+    from bdflib import reader as bdf_reader
+except ImportError:  # pragma: no cover - bdflib is optional off-device
+    bdf_reader = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FONT_DIR = os.environ.get("FLUIDNC_FONT_DIR", "/app/fonts")
+
+
+class GlyphFont:
+    """Monospaced bitmap font rasterised into per-character cell masks.
+
+    Every glyph is stored as a boolean array of exactly ``height`` x
+    ``width`` pixels with the baseline at ``ascent``, so glyphs can be
+    blitted cell by cell without per-glyph offset arithmetic.
+
+    Attributes:
+        name: Font name (e.g. ``5x8``)
+        width: Cell width in pixels (glyph advance)
+        height: Cell height in pixels
+        ascent: Pixels above the baseline
+    """
+
+    def __init__(
+        self,
+        name: str,
+        width: int,
+        height: int,
+        ascent: int,
+        glyphs: Dict[str, np.ndarray],
+    ) -> None:
+        """Initialize the font.
+
+        Args:
+            name: Font name
+            width: Cell width in pixels
+            height: Cell height in pixels
+            ascent: Pixels above the baseline
+            glyphs: Mapping of character to ``(height, width)`` bool mask
+        """
+        self.name = name
+        self.width = width
+        self.height = height
+        self.ascent = ascent
+        self._glyphs = glyphs
+        self._blank = np.zeros((height, width), dtype=bool)
+
+    def glyph(self, char: str) -> np.ndarray:
+        """Get the cell mask for a character.
+
+        Args:
+            char: Single character
+
+        Returns:
+            Boolean mask of shape ``(height, width)``; blank if unknown
+        """
+        mask = self._glyphs.get(char)
+        if mask is None:
+            mask = self._glyphs.get("?", self._blank)
+        return mask
+
+    @classmethod
+    def from_bdf(cls, path: str) -> "GlyphFont":
+        """Load a BDF font file.
+
+        Args:
+            path: Path to the ``.bdf`` file
+
+        Returns:
+            Rasterised font
+
+        Raises:
+            RuntimeError: If bdflib is not installed
+        """
+        if bdf_reader is None:
+            raise RuntimeError("bdflib is required to load BDF fonts")
+        with open(path, "rb") as handle:
+            font = bdf_reader.read_bdf(handle)
+
+        ascent = int(font[b"FONT_ASCENT"])
+        descent = int(font[b"FONT_DESCENT"])
+        height = ascent + descent
+        width = max(
+            (font[cp].advance for cp in font.codepoints() if 32 <= cp < 127),
+            default=1,
+        )
+
+        glyphs = {}
+        for codepoint in range(32, 127):
+            if codepoint not in font.codepoints():
+                continue
+            glyph = font[codepoint]
+            cell = np.zeros((height, width), dtype=bool)
+            pixels = np.array(list(map(list, glyph.iter_pixels())), dtype=bool)
+            if pixels.size:
+                top = ascent - (glyph.bbY + glyph.bbH)
+                _paste(cell, pixels, top, glyph.bbX)
+            glyphs[chr(codepoint)] = cell
+
+        name = os.path.splitext(os.path.basename(path))[0]
+        return cls(name, width, height, ascent, glyphs)
+
+    @classmethod
+    def fallback(cls) -> "GlyphFont":
+        """Rasterise Pillow's built-in font.
+
+        Used when the BDF fonts are not available (e.g. off-device).
+
+        Returns:
+            Rasterised font
+        """
+        from PIL import Image, ImageDraw, ImageFont
+
+        pil_font = ImageFont.load_default()
+        boxes = [pil_font.getbbox(chr(cp)) for cp in range(32, 127)]
+        width = max(box[2] for box in boxes) + 1
+        height = max(box[3] for box in boxes)
+
+        glyphs = {}
+        for codepoint in range(32, 127):
+            image = Image.new("1", (width, height))
+            ImageDraw.Draw(image).text((0, 0), chr(codepoint), font=pil_font, fill=1)
+            glyphs[chr(codepoint)] = np.array(image, dtype=bool)
+        return cls("default", width, height, height, glyphs)
+
+
+def _paste(cell: np.ndarray, pixels: np.ndarray, top: int, left: int) -> None:
+    """Copy a glyph bitmap into a cell, clipping at the cell edges.
+
+    Args:
+        cell: Destination cell mask
+        pixels: Glyph bitmap
+        top: Destination row of the bitmap's first row
+        left: Destination column of the bitmap's first column
+    """
+    rows, cols = pixels.shape
+    y0, x0 = max(top, 0), max(left, 0)
+    y1 = min(top + rows, cell.shape[0])
+    x1 = min(left + cols, cell.shape[1])
+    if y1 > y0 and x1 > x0:
+        src_y = slice(y0 - top, y1 - top)
+        src_x = slice(x0 - left, x1 - left)
+        cell[y0:y1, x0:x1] = pixels[src_y, src_x]
+
+
+_FONT_CACHE: Dict[str, GlyphFont] = {}
+
+
+def load_font(name: str, font_dir: Optional[str] = None) -> GlyphFont:
+    """Load a named font, caching the rasterised result.
+
+    Args:
+        name: Font name without extension (e.g. ``5x8``)
+        font_dir: Directory containing BDF files
+
+    Returns:
+        Rasterised font, or the fallback font if the file is unavailable
+    """
+    path = os.path.join(font_dir or DEFAULT_FONT_DIR, f"{name}.bdf")
+    font = _FONT_CACHE.get(path)
+    if font is None:
+        try:
+            font = GlyphFont.from_bdf(path)
+        except (OSError, RuntimeError, KeyError) as e:
+            logger.warning("Using fallback font for %s: %s", name, str(e))
+            font = GlyphFont.fallback()
+        _FONT_CACHE[path] = font
+    return font
@@ -0,0 +1,544 @@
+"""Streaming G-code analysis for job bounds and time estimates.
+
+Job files are read in fixed-size chunks and parsed line by line with the
+usual modal state (motion mode, absolute/relative, units, arc plane,
+feed), so memory stays constant however large the file is. Moves are
+collected into fixed-size batches and measured with NumPy: straight and
+helical arc lengths, arc bounding boxes including the quadrant extremes,
+and feed-based durations.
+
+Results are cached by the SHA-256 of the file contents, so re-opening a
+job that was analysed before costs one hashing pass.
+
+Usage:
+    python -m fluidnc_ledscreen.gcode JOB.nc [--rapid-rate MM_PER_MIN]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from fluidnc_ledscreen.config import state_path
+
+logger = logging.getLogger(__name__)
+
+MM_PER_INCH = 25.4
+
+# Motion kinds
+RAPID = 0
+LINEAR = 1
+ARC_CW = 2
+ARC_CCW = 3
+
+# Axis order (first, second, axial) for the G17, G18 and G19 arc planes
+PLANE_AXES = np.array([[0, 1, 2], [2, 0, 1], [1, 2, 0]])
+
+# G words understood by the analyzer; positions on homing, machine
+# coordinate and offset lines (G28, G30, G53, G10, G92) are skipped
+_ABSOLUTE, _RELATIVE, _INCH, _MM, _DWELL, _SKIP, _PLANE = range(10, 17)
+_G_WORDS = {
+    **{code: int(code) for code in ("0", "1", "2", "3")},
+    **{"0" + code: int(code) for code in ("0", "1", "2", "3")},
+    "90": _ABSOLUTE,
+    "91": _RELATIVE,
+    "20": _INCH,
+    "21": _MM,
+    "4": _DWELL,
+    "04": _DWELL,
+    **{code: _SKIP for code in ("28", "30", "53", "10", "92")},
+    **{code: _PLANE + int(code) - 17 for code in ("17", "18", "19")},
+}
+_VALUE_WORDS = frozenset("XYZIJKRP")
+
+_WORD = re.compile(r"([A-Z])([-+]?(?:\d+\.?\d*|\.\d+))")
+_COMMENT = re.compile(r"\([^)]*\)|;.*")
+
+# Columns of a buffered move
+_COLUMNS = 11  # kind, plane, feed, start xyz, end xyz, arc center (2)
+
+
+@dataclass(frozen=True)
+class JobAnalysis:
+    """Summary of a G-code job.
+
+    Distances are in millimetres, times in seconds.
+
+    Attributes:
+        lines: Number of lines read
+        moves: Number of motion commands
+        bbox_min: Minimum X, Y and Z reached (None without moves)
+        bbox_max: Maximum X, Y and Z reached (None without moves)
+        path_length: Total tool path length
+        rapid_distance: Distance travelled in rapid moves (G0)
+        cut_distance: Distance travelled at feed (G1, G2, G3)
+        estimated_seconds: Feed-based duration including dwells; ignores
+            acceleration, so real jobs with many short moves take longer
+    """
+
+    lines: int
+    moves: int
+    bbox_min: Optional[Tuple[float, float, float]]
+    bbox_max: Optional[Tuple[float, float, float]]
+    path_length: float
+    rapid_distance: float
+    cut_distance: float
+    estimated_seconds: float
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "JobAnalysis":
+        """Build an analysis from its dictionary form.
+
+        Args:
+            data: Output of :func:`dataclasses.asdict`
+
+        Returns:
+            Job analysis
+        """
+        for key in ("bbox_min", "bbox_max"):
+            if data.get(key) is not None:
+                data = {**data, key: tuple(data[key])}
+        return cls(**data)
+
+
+def iter_lines(path: str, chunk_size: int = 1 << 20) -> Iterator[str]:
+    """Read a file line by line in fixed-size chunks.
+
+    Args:
+        path: File path
+        chunk_size: Bytes per read
+
+    Yields:
+        Lines without terminators
+    """
+    tail = b""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            lines = (tail + chunk).split(b"\n")
+            tail = lines.pop()
+            for line in lines:
+                yield line.decode("ascii", "replace")
+    if tail:
+        yield tail.decode("ascii", "replace")
+
+
+class GcodeAnalyzer:
+    """Incremental G-code analyzer.
+
+    Feed it lines with :meth:`feed` (any number of times) and read the
+    summary with :meth:`result`.
+
+    Attributes:
+        rapid_rate: Rapid traverse rate in mm/min used for G0 moves
+        default_feed: Feed rate in mm/min assumed before the first ``F``
+        batch_size: Moves measured per NumPy batch
+    """
+
+    def __init__(
+        self,
+        rapid_rate: float = 5000.0,
+        default_feed: float = 1000.0,
+        batch_size: int = 65536,
+    ) -> None:
+        """Initialize the analyzer.
+
+        Args:
+            rapid_rate: Rapid traverse rate in mm/min
+            default_feed: Feed rate in mm/min before the first ``F`` word
+            batch_size: Moves measured per NumPy batch
+        """
+        self.rapid_rate = rapid_rate
+        self.default_feed = default_feed
+        self.batch_size = batch_size
+        # Modal state
+        self._position = (0.0, 0.0, 0.0)
+        self._motion = RAPID
+        self._relative = False
+        self._scale = 1.0
+        self._plane = 0
+        self._feed = default_feed
+        # Accumulated results
+        self._batch: List[Tuple[float, ...]] = []
+        self._lines = 0
+        self._moves = 0
+        self._rapid = 0.0
+        self._cut = 0.0
+        self._seconds = 0.0
+        self._min = np.full(3, np.inf)
+        self._max = np.full(3, -np.inf)
+
+    def feed(self, lines: Iterable[str]) -> None:
+        """Parse G-code lines.
+
+        Args:
+            lines: Lines of G-code
+        """
+        batch = self._batch
+        for line in lines:
+            self._lines += 1
+            if "(" in line or ";" in line:
+                line = _COMMENT.sub("", line)
+            words = _WORD.findall(line.upper().replace(" ", ""))
+            if not words:
+                continue
+            move = self._apply(words)
+            if move is not None:
+                batch.append(move)
+                if len(batch) >= self.batch_size:
+                    self._flush()
+
+    def result(self) -> JobAnalysis:
+        """Get the analysis of everything fed so far.
+
+        Returns:
+            Job analysis
+        """
+        self._flush()
+        has_moves = bool(np.isfinite(self._min).all())
+        return JobAnalysis(
+            lines=self._lines,
+            moves=self._moves,
+            bbox_min=tuple(self._min.tolist()) if has_moves else None,
+            bbox_max=tuple(self._max.tolist()) if has_moves else None,
+            path_length=self._rapid + self._cut,
+            rapid_distance=self._rapid,
+            cut_distance=self._cut,
+            estimated_seconds=self._seconds,
+        )
+
+    def _apply(self, words: List[Tuple[str, str]]) -> Optional[Tuple[float, ...]]:
+        """Update the modal state from one line.
+
+        Args:
+            words: ``(letter, number)`` pairs
+
+        Returns:
+            Buffered move, or None if the line does not move
+        """
+        axes: Dict[str, float] = {}
+        dwell = False
+        skip = False
+        for letter, number in words:
+            if letter in _VALUE_WORDS:
+                axes[letter] = float(number)
+            elif letter == "G":
+                code = _G_WORDS.get(number)
+                if code is None:
+                    # Unusual spellings such as G1.0
+                    code = _G_WORDS.get(f"{float(number):g}")
+                if code is None:
+                    continue
+                if code <= ARC_CCW:
+                    self._motion = code
+                elif code == _ABSOLUTE:
+                    self._relative = False
+                elif code == _RELATIVE:
+                    self._relative = True
+                elif code == _INCH:
+                    self._scale = MM_PER_INCH
+                elif code == _MM:
+                    self._scale = 1.0
+                elif code == _DWELL:
+                    dwell = True
+                elif code == _SKIP:
+                    skip = True
+                else:
+                    self._plane = code - _PLANE
+            elif letter == "F":
+                self._feed = float(number) * self._scale
+        if dwell:
+            self._seconds += axes.get("P", 0.0)
+            return None
+        x = axes.get("X")
+        y = axes.get("Y")
+        z = axes.get("Z")
+        if skip or (x is None and y is None and z is None):
+            return None
+
+        start = self._position
+        scale = self._scale
+        if self._relative:
+            end = (
+                start[0] if x is None else start[0] + x * scale,
+                start[1] if y is None else start[1] + y * scale,
+                start[2] if z is None else start[2] + z * scale,
+            )
+        else:
+            end = (
+                start[0] if x is None else x * scale,
+                start[1] if y is None else y * scale,
+                start[2] if z is None else z * scale,
+            )
+        self._position = end
+        self._moves += 1
+
+        kind = self._motion
+        ca = cb = 0.0
+        if kind >= ARC_CW:
+            ca, cb = self._arc_center(kind, start, end, axes)
+            if ca is None:
+                kind = LINEAR
+                ca = cb = 0.0
+        return (kind, self._plane, self._feed, *start, *end, ca, cb)
+
+    def _arc_center(
+        self,
+        kind: int,
+        start: Tuple[float, float, float],
+        end: Tuple[float, float, float],
+        axes: Dict[str, float],
+    ) -> Tuple[Optional[float], Optional[float]]:
+        """Get the arc center in plane coordinates.
+
+        Args:
+            kind: ``ARC_CW`` or ``ARC_CCW``
+            start: Start position
+            end: End position
+            axes: Axis and offset words of the line
+
+        Returns:
+            Center ``(first, second)``, or ``(None, None)`` if the arc is
+            degenerate and should be treated as a straight move
+        """
+        first, second, _ = PLANE_AXES[self._plane]
+        offsets = ("IJ", "KI", "JK")[self._plane]
+        sa, sb = start[first], start[second]
+        if "R" not in axes:
+            return (
+                sa + axes.get(offsets[0], 0.0) * self._scale,
+                sb + axes.get(offsets[1], 0.0) * self._scale,
+            )
+        # Radius format: center on the perpendicular bisector of the chord
+        radius = axes["R"] * self._scale
+        dx, dy = end[first] - sa, end[second] - sb
+        chord = math.hypot(dx, dy)
+        if chord == 0.0 or abs(radius) < chord / 2:
+            return None, None
+        height = math.sqrt(radius * radius - chord * chord / 4)
+        # Negative R selects the long way round
+        if (kind == ARC_CW) != (radius < 0):
+            height = -height
+        return (
+            sa + dx / 2 - height * dy / chord,
+            sb + dy / 2 + height * dx / chord,
+        )
+
+    def _flush(self) -> None:
+        """Measure the buffered moves."""
+        if not self._batch:
+            return
+        moves = np.array(self._batch, dtype=np.float64).reshape(-1, _COLUMNS)
+        self._batch.clear()
+        kind = moves[:, 0].astype(np.int8)
+        feed = moves[:, 2]
+        start = moves[:, 3:6]
+        end = moves[:, 6:9]
+
+        lengths = np.linalg.norm(end - start, axis=1)
+        self._min = np.minimum(self._min, end.min(axis=0))
+        self._max = np.maximum(self._max, end.max(axis=0))
+
+        arcs = kind >= ARC_CW
+        if arcs.any():
+            lengths[arcs] = self._measure_arcs(moves[arcs])
+
+        rapid = kind == RAPID
+        rapid_length = float(lengths[rapid].sum())
+        cut_lengths = lengths[~rapid]
+        self._rapid += rapid_length
+        self._cut += float(cut_lengths.sum())
+        feeds = np.where(feed[~rapid] > 0, feed[~rapid], self.default_feed)
+        self._seconds += rapid_length / self.rapid_rate * 60
+        self._seconds += float((cut_lengths / feeds).sum()) * 60
+
+    def _measure_arcs(self, arcs: np.ndarray) -> np.ndarray:
+        """Measure arcs and widen the bounding box by their extremes.
+
+        Args:
+            arcs: Buffered arc moves
+
+        Returns:
+            Helical arc lengths
+        """
+        axes = PLANE_AXES[arcs[:, 1].astype(np.intp)]
+        start = np.take_along_axis(arcs[:, 3:6], axes, axis=1)
+        end = np.take_along_axis(arcs[:, 6:9], axes, axis=1)
+        center = arcs[:, 9:11]
+        ccw = arcs[:, 0] == ARC_CCW
+
+        u = start[:, :2] - center
+        v = end[:, :2] - center
+        radius = np.hypot(u[:, 0], u[:, 1])
+        angle_start = np.arctan2(u[:, 1], u[:, 0])
+        angle_end = np.arctan2(v[:, 1], v[:, 0])
+        sweep = np.where(ccw, angle_end - angle_start, angle_start - angle_end)
+        sweep = np.mod(sweep, 2 * np.pi)
+        # Same start and end point: a full circle
+        sweep[sweep < 1e-9] = 2 * np.pi
+        lengths = np.hypot(radius * sweep, end[:, 2] - start[:, 2])
+
+        # Quadrant extremes (0, 90, 180 and 270 degrees) within the sweep
+        for quadrant in range(4):
+            theta = quadrant * np.pi / 2
+            offset = np.where(ccw, theta - angle_start, angle_start - theta)
+            inside = np.mod(offset, 2 * np.pi) <= sweep
+            if not inside.any():
+                continue
+            point = np.empty((int(inside.sum()), 3))
+            point[:, 0] = center[inside, 0] + radius[inside] * np.cos(theta)
+            point[:, 1] = center[inside, 1] + radius[inside] * np.sin(theta)
+            point[:, 2] = start[inside, 2]
+            # Back from plane order to X, Y, Z
+            xyz = np.empty_like(point)
+            np.put_along_axis(xyz, axes[inside], point, axis=1)
+            self._min = np.minimum(self._min, xyz.min(axis=0))
+            self._max = np.maximum(self._max, xyz.max(axis=0))
+        return lengths
+
+
+class AnalysisCache:
+    """Job analyses keyed by file hash, persisted as JSON.
+
+    Attributes:
+        path: Cache file path
+        max_entries: Number of analyses kept (oldest dropped first)
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 64) -> None:
+        """Initialize the cache.
+
+        Args:
+            path: Cache file (default: ``gcode_cache.json`` in the state
+                directory)
+            max_entries: Number of analyses kept
+        """
+        self.path = path or state_path("gcode_cache.json")
+        self.max_entries = max_entries
+
+    def _load(self) -> Dict[str, Any]:
+        """Read the cache file."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring G-code cache %s: %s", self.path, str(e))
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, digest: str) -> Optional[JobAnalysis]:
+        """Get a cached analysis.
+
+        Args:
+            digest: File hash
+
+        Returns:
+            Cached analysis, or None
+        """
+        entry = self._load().get(digest)
+        if entry is None:
+            return None
+        try:
+            return JobAnalysis.from_dict(entry)
+        except TypeError:
+            return None
+
+    def put(self, digest: str, analysis: JobAnalysis) -> None:
+        """Store an analysis.
+
+        Args:
+            digest: File hash
+            analysis: Job analysis
+        """
+        data = self._load()
+        data.pop(digest, None)
+        data[digest] = asdict(analysis)
+        while len(data) > self.max_entries:
+            data.pop(next(iter(data)))
+        tmp = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Failed to save G-code cache %s: %s", self.path, str(e))
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Hash a file's contents.
+
+    Args:
+        path: File path
+        chunk_size: Bytes per read
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def analyze_file(
+    path: str,
+    cache: Optional[AnalysisCache] = None,
+    rapid_rate: float = 5000.0,
+    default_feed: float = 1000.0,
+) -> JobAnalysis:
+    """Analyse a G-code file, using the cache when possible.
+
+    Args:
+        path: Job file
+        cache: Analysis cache (None disables caching)
+        rapid_rate: Rapid traverse rate in mm/min
+        default_feed: Feed rate in mm/min before the first ``F`` word
+
+    Returns:
+        Job analysis
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    digest = None
+    if cache is not None:
+        # Rates are part of the key: they change the time estimate
+        digest = f"{file_digest(path)}:{rapid_rate:g}:{default_feed:g}"
+        cached = cache.get(digest)
+        if cached is not None:
+            return cached
+    analyzer = GcodeAnalyzer(rapid_rate=rapid_rate, default_feed=default_feed)
+    analyzer.feed(iter_lines(path))
+    analysis = analyzer.result()
+    if cache is not None:
+        cache.put(digest, analysis)
+    return analysis
+
+
+def main() -> None:
+    """Print the analysis of a job file as JSON."""
+    parser = argparse.ArgumentParser(description="Analyse a G-code job file")
+    parser.add_argument("path")
+    parser.add_argument("--rapid-rate", type=float, default=5000.0)
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+    cache = None if args.no_cache else AnalysisCache()
+    analysis = analyze_file(args.path, cache, rapid_rate=args.rapid_rate)
+    print(json.dumps(asdict(analysis), indent=2))
+
+
+if __name__ == "__main__":
+    main()
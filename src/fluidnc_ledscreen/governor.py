@@ -0,0 +1,165 @@
+"""CPU-aware render rate governor.
+
+The Pi driving the panel also runs discovery, logging and sometimes other
+containers. The governor samples system and process CPU load (through
+``psutil`` where installed, the load average otherwise) together with the
+time the render stage takes per frame, and adjusts the target frame rate
+between configured bounds: it halves the rate when the box is busy and
+raises it step by step when it is idle again. At the lowest rate visual
+effects (blinking) are switched off as well.
+
+Separate high and low thresholds and a number of consecutive samples
+required before each change provide hysteresis, so the rate does not
+oscillate around a threshold. Status updates still wake the render loop
+immediately, and the lower bound keeps coordinates current while the
+socket reader gets the CPU it needs.
+"""
+
+import logging
+import os
+from typing import Optional, Tuple
+
+from fluidnc_ledscreen.metrics import Metrics
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - falls back to the load average
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+class FrameGovernor:
+    """Adaptive target frame rate with hysteresis.
+
+    Call :meth:`record_render` with the duration of every rendered frame
+    and :meth:`sample` every ``interval`` seconds.
+
+    Attributes:
+        min_fps: Lowest frame rate
+        max_fps: Highest frame rate
+        cpu_high: System CPU percentage at which to back off
+        cpu_low: System CPU percentage below which to ramp up
+        duty_high: Share of the frame interval spent rendering at which
+            to back off
+        duty_low: Render share below which ramping up is allowed
+        interval: Seconds between samples
+        backoff_samples: Consecutive busy samples before backing off
+        ramp_samples: Consecutive idle samples before ramping up
+        fps: Current target frame rate
+        effects: Whether visual effects are enabled
+        metrics: Metrics registry
+    """
+
+    def __init__(
+        self,
+        min_fps: float = 5.0,
+        max_fps: float = 20.0,
+        cpu_high: float = 80.0,
+        cpu_low: float = 50.0,
+        duty_high: float = 0.5,
+        duty_low: float = 0.2,
+        interval: float = 2.0,
+        backoff_samples: int = 2,
+        ramp_samples: int = 5,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """Initialize the governor.
+
+        Args:
+            min_fps: Lowest frame rate
+            max_fps: Highest frame rate
+            cpu_high: System CPU percentage at which to back off
+            cpu_low: System CPU percentage below which to ramp up
+            duty_high: Render share of the frame interval at which to back
+                off
+            duty_low: Render share below which ramping up is allowed
+            interval: Seconds between samples
+            backoff_samples: Consecutive busy samples before backing off
+            ramp_samples: Consecutive idle samples before ramping up
+            metrics: Metrics registry
+        """
+        self.min_fps = min(min_fps, max_fps)
+        self.max_fps = max_fps
+        self.cpu_high = cpu_high
+        self.cpu_low = min(cpu_low, cpu_high)
+        self.duty_high = duty_high
+        self.duty_low = min(duty_low, duty_high)
+        self.interval = interval
+        self.backoff_samples = backoff_samples
+        self.ramp_samples = ramp_samples
+        self.metrics = metrics or Metrics()
+        self.fps = max_fps
+        self.effects = True
+        self._render_time = 0.0
+        self._busy = 0
+        self._idle = 0
+        self._cpus = os.cpu_count() or 1
+        self._process = None
+        if psutil is not None:
+            self._process = psutil.Process()
+            # The first readings only set the reference point
+            psutil.cpu_percent(None)
+            self._process.cpu_percent(None)
+
+    def record_render(self, seconds: float) -> None:
+        """Record the duration of one rendered frame.
+
+        Args:
+            seconds: Time spent in the render stage
+        """
+        self._render_time += 0.2 * (seconds - self._render_time)
+
+    def sample(self) -> bool:
+        """Check the load and adjust the frame rate.
+
+        Returns:
+            True if the frame rate or the effects changed
+        """
+        system, process = self._cpu()
+        duty = self._render_time * self.fps
+        self.metrics.set("cpu_system", system)
+        self.metrics.set("cpu_process", process)
+        self.metrics.set("render_duty", duty)
+        if system >= self.cpu_high or duty >= self.duty_high:
+            self._busy += 1
+            self._idle = 0
+        elif system <= self.cpu_low and duty <= self.duty_low:
+            self._idle += 1
+            self._busy = 0
+        else:
+            self._busy = self._idle = 0
+
+        fps, effects = self.fps, self.effects
+        if self._busy >= self.backoff_samples:
+            self._busy = 0
+            self.fps = max(self.min_fps, self.fps / 2)
+        elif self._idle >= self.ramp_samples:
+            self._idle = 0
+            self.fps = min(self.max_fps, max(self.fps * 1.5, self.fps + 1))
+        self.effects = self.fps > self.min_fps or self.min_fps == self.max_fps
+        if (fps, effects) == (self.fps, self.effects):
+            return False
+        logger.info(
+            "Render rate %.1f fps, effects %s (CPU %.0f%%, render %.0f%%)",
+            self.fps,
+            "on" if self.effects else "off",
+            system,
+            duty * 100,
+        )
+        self.metrics.set("governor_fps", self.fps)
+        self.metrics.set("governor_effects", self.effects)
+        return True
+
+    def _cpu(self) -> Tuple[float, float]:
+        """Get system and process CPU usage since the last sample.
+
+        Returns:
+            System and process CPU percentages (of all CPUs)
+        """
+        if psutil is None:
+            load = os.getloadavg()[0] / self._cpus * 100
+            return load, 0.0
+        system = psutil.cpu_percent(None)
+        process = self._process.cpu_percent(None) / self._cpus
+        return system, process
@@ -0,0 +1,997 @@
+"""Declarative layout engine for the LED matrix.
+
+A layout is described as plain data (fields, fonts, colors, positions) and
+compiled once into a :class:`RenderPlan`. Compilation resolves fonts and
+colors into ready-to-blit RGB glyph tiles and precomputes every character
+slot and clip rectangle, so per-frame work is limited to finding which
+fields changed and copying the affected tiles into the frame buffer.
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from fluidnc_ledscreen.fonts import GlyphFont, load_font
+from fluidnc_ledscreen.ticker import PRIORITY_ALARM, Ticker
+
+logger = logging.getLogger(__name__)
+
+# Type aliases
+Color = Tuple[int, int, int]
+Rect = Tuple[int, int, int, int]  # x, y, width, height
+
+COLOR_SCHEMES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "text": (255, 255, 255),
+        "ip": (255, 255, 255),
+        "x": (255, 0, 0),
+        "y": (0, 255, 0),
+        "z": (0, 0, 255),
+        "state": (255, 255, 255),
+        "link": (0, 255, 0),
+        "message": (255, 255, 0),
+        "alarm": (255, 0, 0),
+        "stale": (72, 72, 72),
+        "states": {
+            "Alarm": (255, 0, 0),
+            "Door": (255, 0, 0),
+            "Hold": (255, 160, 0),
+            "Run": (0, 255, 0),
+            "Jog": (0, 255, 255),
+            "Home": (0, 255, 255),
+        },
+    },
+    "amber": {
+        "text": (255, 140, 0),
+        "ip": (160, 90, 0),
+        "x": (255, 140, 0),
+        "y": (255, 140, 0),
+        "z": (255, 140, 0),
+        "state": (255, 200, 0),
+        "link": (255, 140, 0),
+        "message": (255, 200, 0),
+        "alarm": (255, 0, 0),
+        "stale": (64, 36, 0),
+        "states": {"Alarm": (255, 0, 0)},
+    },
+    "night": {
+        "text": (96, 0, 0),
+        "ip": (48, 0, 0),
+        "x": (128, 0, 0),
+        "y": (128, 0, 0),
+        "z": (128, 0, 0),
+        "state": (96, 0, 0),
+        "link": (64, 0, 0),
+        "message": (96, 0, 0),
+        "alarm": (255, 0, 0),
+        "stale": (24, 0, 0),
+        "states": {"Alarm": (255, 0, 0)},
+    },
+}
+
+LAYOUTS: Dict[str, Dict[str, Any]] = {
+    # IP top right, X/Y/Z stacked on the left, state on the Z line and a
+    # blinking connection dot in the top left corner.
+    "default": {
+        "fields": [
+            {
+                "name": "link",
+                "kind": "dot",
+                "source": "connected",
+                "x": 0,
+                "y": 1,
+                "width": 2,
+                "height": 2,
+                "color": "link",
+                "blink": 1.0,
+            },
+            {
+                "name": "ip",
+                "source": "ip",
+                "font": "4x6",
+                "x": 4,
+                "y": 0,
+                "chars": 15,
+                "align": "right",
+                "color": "ip",
+            },
+            {
+                "name": "x",
+                "source": "x",
+                "format": "X:{:.1f}",
+                "font": "5x8",
+                "x": 0,
+                "y": 7,
+                "chars": 9,
+                "color": "x",
+                "stale_color": "stale",
+            },
+            {
+                "name": "y",
+                "source": "y",
+                "format": "Y:{:.1f}",
+                "font": "5x8",
+                "x": 0,
+                "y": 15,
+                "chars": 9,
+                "color": "y",
+                "stale_color": "stale",
+            },
+            {
+                "name": "z",
+                "source": "z",
+                "format": "Z:{:.1f}",
+                "font": "5x8",
+                "x": 0,
+                "y": 23,
+                "chars": 8,
+                "color": "z",
+                "stale_color": "stale",
+            },
+            {
+                "name": "state",
+                "source": "state",
+                "font": "4x6",
+                "x": 44,
+                "y": 25,
+                "chars": 5,
+                "align": "right",
+                "color": "state",
+            },
+            # Messages and alarms scroll over the IP row while active
+            {
+                "name": "ticker",
+                "kind": "ticker",
+                "source": "message",
+                "font": "4x6",
+                "x": 4,
+                "y": 0,
+                "width": 60,
+                "color": "message",
+                "speed": 20.0,
+            },
+        ],
+    },
+    # Larger X/Y readout for machines where Z is rarely of interest.
+    "xy": {
+        "fields": [
+            {
+                "name": "link",
+                "kind": "dot",
+                "source": "connected",
+                "x": 0,
+                "y": 1,
+                "width": 2,
+                "height": 2,
+                "color": "link",
+                "blink": 1.0,
+            },
+            {
+                "name": "state",
+                "source": "state",
+                "font": "4x6",
+                "x": 4,
+                "y": 0,
+                "chars": 8,
+                "color": "state",
+            },
+            {
+                "name": "ticker",
+                "kind": "ticker",
+                "source": "message",
+                "font": "4x6",
+                "x": 4,
+                "y": 0,
+                "width": 60,
+                "color": "message",
+                "speed": 20.0,
+            },
+            {
+                "name": "x",
+                "source": "x",
+                "format": "X{:8.1f}",
+                "font": "6x10",
+                "x": 0,
+                "y": 9,
+                "chars": 9,
+                "align": "right",
+                "color": "x",
+                "stale_color": "stale",
+            },
+            {
+                "name": "y",
+                "source": "y",
+                "format": "Y{:8.1f}",
+                "font": "6x10",
+                "x": 0,
+                "y": 21,
+                "chars": 9,
+                "align": "right",
+                "color": "y",
+                "stale_color": "stale",
+            },
+        ],
+    },
+    # Shown while the display sleeps: a clock, the machine state and a
+    # steady connection dot; the clock only changes once a minute.
+    "sleep": {
+        "fields": [
+            {
+                "name": "link",
+                "kind": "dot",
+                "source": "connected",
+                "x": 0,
+                "y": 1,
+                "width": 2,
+                "height": 2,
+                "color": "link",
+            },
+            {
+                "name": "clock",
+                "source": "clock",
+                "font": "6x10",
+                "x": 17,
+                "y": 8,
+                "chars": 5,
+                "color": "text",
+            },
+            {
+                "name": "state",
+                "source": "state",
+                "font": "4x6",
+                "x": 22,
+                "y": 21,
+                "chars": 5,
+                "color": "state",
+                "missing": "OFF",
+            },
+        ],
+    },
+    # Machine utilization: the current shift, the share of the shift and
+    # of the day spent running and today's run time. Shown as a page or
+    # selected as the layout of a display that only reports statistics.
+    "utilization": {
+        "fields": [
+            {
+                "name": "link",
+                "kind": "dot",
+                "source": "connected",
+                "x": 0,
+                "y": 1,
+                "width": 2,
+                "height": 2,
+                "color": "link",
+            },
+            {
+                "name": "shift",
+                "source": "util_shift",
+                "font": "4x6",
+                "x": 4,
+                "y": 0,
+                "chars": 15,
+                "color": "state",
+            },
+            {
+                "name": "shift_run",
+                "source": "util_shift_run",
+                "format": "SHF{:5.1f}%",
+                "font": "5x8",
+                "x": 0,
+                "y": 8,
+                "chars": 9,
+                "color": "x",
+            },
+            {
+                "name": "day_run",
+                "source": "util_day_run",
+                "format": "DAY{:5.1f}%",
+                "font": "5x8",
+                "x": 0,
+                "y": 16,
+                "chars": 9,
+                "color": "y",
+            },
+            {
+                "name": "day_run_time",
+                "source": "util_day_run_time",
+                "format": "RUN {}",
+                "font": "4x6",
+                "x": 0,
+                "y": 25,
+                "chars": 10,
+                "color": "text",
+            },
+        ],
+    },
+}
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """Declarative description of one layout field.
+
+    Attributes:
+        name: Unique field name
+        source: Status key the field displays
+        x: Left edge in pixels
+        y: Top edge in pixels
+        kind: ``text``, ``dot`` or ``ticker``
+        font: Font name for text and ticker fields
+        chars: Number of character cells for text fields
+        width: Width in pixels for dot and ticker fields
+        height: Height in pixels for dot fields (ticker: font height)
+        format: Format string applied to the value
+        align: ``left`` or ``right``
+        color: Color role from the color scheme
+        blink: Blink period in seconds (0 disables blinking)
+        missing: Text shown when the value is unavailable
+        speed: Scroll speed in pixels per second for ticker fields
+        stale_color: Color role for text fields while the status data is
+            stale or the link is lost (empty keeps the normal color)
+    """
+
+    name: str
+    source: str
+    x: int
+    y: int
+    kind: str = "text"
+    font: str = "5x8"
+    chars: int = 0
+    width: int = 0
+    height: int = 0
+    format: str = "{}"
+    align: str = "left"
+    color: str = "text"
+    blink: float = 0.0
+    missing: str = ""
+    speed: float = 20.0
+    stale_color: str = ""
+
+
+@dataclass(frozen=True)
+class LayoutSpec:
+    """Declarative description of a full layout.
+
+    Attributes:
+        name: Layout name
+        fields: Fields in drawing order
+    """
+
+    name: str
+    fields: Tuple[FieldSpec, ...] = field(default_factory=tuple)
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict[str, Any]) -> "LayoutSpec":
+        """Build a layout from its dictionary description.
+
+        Args:
+            name: Layout name
+            data: Description with a ``fields`` list
+
+        Returns:
+            Layout description
+
+        Raises:
+            ValueError: If the description is malformed
+        """
+        try:
+            fields = tuple(FieldSpec(**item) for item in data["fields"])
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid layout {name}: {e}") from e
+        names = [spec.name for spec in fields]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Invalid layout {name}: duplicate field names")
+        return cls(name=name, fields=fields)
+
+
+def load_layout(name: str) -> LayoutSpec:
+    """Resolve a built-in layout name or a JSON layout file.
+
+    Args:
+        name: Built-in layout name or path to a ``.json`` description
+
+    Returns:
+        Layout description
+
+    Raises:
+        ValueError: If the layout is unknown or malformed
+    """
+    if name in LAYOUTS:
+        return LayoutSpec.from_dict(name, LAYOUTS[name])
+    if name.endswith(".json") and os.path.isfile(name):
+        with open(name, encoding="utf-8") as handle:
+            return LayoutSpec.from_dict(name, json.load(handle))
+    raise ValueError(f"Unknown layout: {name}")
+
+
+def load_color_scheme(name: str) -> Dict[str, Any]:
+    """Resolve a built-in color scheme name or a JSON color scheme file.
+
+    Missing roles are filled in from the default scheme.
+
+    Args:
+        name: Built-in scheme name or path to a ``.json`` description
+
+    Returns:
+        Mapping of color role to RGB tuple, plus optional ``states`` map
+
+    Raises:
+        ValueError: If the scheme is unknown
+    """
+    if name in COLOR_SCHEMES:
+        scheme = COLOR_SCHEMES[name]
+    elif name.endswith(".json") and os.path.isfile(name):
+        with open(name, encoding="utf-8") as handle:
+            scheme = json.load(handle)
+    else:
+        raise ValueError(f"Unknown color scheme: {name}")
+    return {**COLOR_SCHEMES["default"], **scheme}
+
+
+def _scale(color: Iterable[int], brightness: float) -> Color:
+    """Apply brightness to an RGB color."""
+    r, g, b = (max(0, min(255, int(round(c * brightness)))) for c in color)
+    return r, g, b
+
+
+def _clip(rect: Rect, bounds: Rect) -> Optional[Rect]:
+    """Intersect two rectangles.
+
+    Returns:
+        The intersection, or None if it is empty
+    """
+    x0 = max(rect[0], bounds[0])
+    y0 = max(rect[1], bounds[1])
+    x1 = min(rect[0] + rect[2], bounds[0] + bounds[2])
+    y1 = min(rect[1] + rect[3], bounds[1] + bounds[3])
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return x0, y0, x1 - x0, y1 - y0
+
+
+class GlyphAtlas:
+    """Cache of pre-colored RGB glyph tiles.
+
+    Tiles are keyed by font and color, so each distinct text color costs
+    one rasterisation pass at compile time and nothing per frame.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty atlas."""
+        self._tiles: Dict[Tuple[str, Color], Dict[str, np.ndarray]] = {}
+
+    def tiles(self, font: GlyphFont, color: Color) -> Dict[str, np.ndarray]:
+        """Get the tile set for a font and color.
+
+        Args:
+            font: Rasterised font
+            color: RGB color
+
+        Returns:
+            Mapping of character to ``(height, width, 3)`` uint8 tile
+        """
+        key = (font.name, color)
+        tiles = self._tiles.get(key)
+        if tiles is None:
+            rgb = np.array(color, dtype=np.uint8)
+            tiles = {}
+            for codepoint in range(32, 127):
+                char = chr(codepoint)
+                tile = font.glyph(char)[..., None] * rgb
+                tile.setflags(write=False)
+                tiles[char] = tile
+            self._tiles[key] = tiles
+        return tiles
+
+
+class CompiledField:
+    """Base class for compiled fields.
+
+    Attributes:
+        spec: Field description
+        rect: Clip rectangle on the canvas
+        blink: Effective blink period in seconds (0 while effects are off)
+        dynamic: Whether the field must be evaluated every frame
+        active: Whether the field currently hides the fields it covers
+        covers: Fields beneath this one on the canvas
+    """
+
+    def __init__(self, spec: FieldSpec, rect: Rect) -> None:
+        """Initialize the compiled field.
+
+        Args:
+            spec: Field description
+            rect: Clip rectangle on the canvas
+        """
+        self.spec = spec
+        self.rect = rect
+        self.blink = spec.blink
+        self.dynamic = self.blink > 0
+        self.active = False
+        self.covers: List["CompiledField"] = []
+
+    def draw(self, frame: np.ndarray, state: Dict[str, Any], now: float) -> bool:
+        """Draw the field if its content changed.
+
+        Args:
+            frame: RGB frame buffer
+            state: Current status values
+            now: Monotonic time in seconds
+
+        Returns:
+            True if any pixel was written
+        """
+        raise NotImplementedError
+
+    def invalidate(self) -> None:
+        """Force the next draw to repaint the whole field."""
+        raise NotImplementedError
+
+
+class TextField(CompiledField):
+    """Compiled text field with precomputed character slots."""
+
+    def __init__(
+        self,
+        spec: FieldSpec,
+        rect: Rect,
+        font: GlyphFont,
+        slots: List[Tuple[slice, slice, slice, slice]],
+        tiles: Dict[str, np.ndarray],
+        state_tiles: Dict[str, Dict[str, np.ndarray]],
+        stale_tiles: Optional[Dict[str, np.ndarray]] = None,
+    ) -> None:
+        """Initialize the text field.
+
+        Args:
+            spec: Field description
+            rect: Clip rectangle on the canvas
+            font: Rasterised font
+            slots: Per character cell ``(dst_y, dst_x, src_y, src_x)``
+            tiles: Tile set for the field color
+            state_tiles: Tile sets overriding the color per machine state
+            stale_tiles: Tile set used while the link is not ``live``
+        """
+        super().__init__(spec, rect)
+        self.font = font
+        self.slots = slots
+        self.tiles = tiles
+        self.state_tiles = state_tiles
+        self.stale_tiles = stale_tiles
+        self._blank = " " * spec.chars
+        self._text: Optional[str] = None
+        self._active = tiles
+
+    def format(self, value: Any) -> str:
+        """Format a value into exactly ``chars`` characters.
+
+        Args:
+            value: Raw status value
+
+        Returns:
+            Padded and truncated text
+        """
+        if value is None:
+            text = self.spec.missing
+        else:
+            try:
+                text = self.spec.format.format(value)
+            except (ValueError, TypeError, IndexError):
+                text = str(value)
+        chars = self.spec.chars
+        if self.spec.align == "right":
+            return text[-chars:].rjust(chars)
+        return text[:chars].ljust(chars)
+
+    def draw(self, frame: np.ndarray, state: Dict[str, Any], now: float) -> bool:
+        """Draw only the character cells whose content changed."""
+        value = state.get(self.spec.source)
+        text = self.format(value)
+        if self.stale_tiles and state.get("link", "live") != "live":
+            tiles = self.stale_tiles
+        else:
+            tiles = self.state_tiles.get(state.get("state"), self.tiles)
+        if tiles is not self._active:
+            self._active = tiles
+            self._text = None
+        previous = self._text if self._text is not None else "\0" * len(text)
+        if text == previous:
+            return False
+        for char, old, (dy, dx, sy, sx) in zip(text, previous, self.slots):
+            if char != old:
+                tile = tiles.get(char)
+                if tile is None:
+                    tile = tiles["?"]
+                frame[dy, dx] = tile[sy, sx]
+        self._text = text
+        return True
+
+    def invalidate(self) -> None:
+        """Force the next draw to repaint every cell."""
+        self._text = None
+
+
+class DotField(CompiledField):
+    """Compiled indicator dot, optionally blinking while the source is true."""
+
+    def __init__(self, spec: FieldSpec, rect: Rect, color: Color) -> None:
+        """Initialize the dot field.
+
+        Args:
+            spec: Field description
+            rect: Clip rectangle on the canvas
+            color: RGB color when lit
+        """
+        super().__init__(spec, rect)
+        x, y, w, h = rect
+        self._region = (slice(y, y + h), slice(x, x + w))
+        self._color = np.array(color, dtype=np.uint8)
+        self._lit: Optional[bool] = None
+
+    def draw(self, frame: np.ndarray, state: Dict[str, Any], now: float) -> bool:
+        """Light or clear the dot when its on/off state flips."""
+        lit = bool(state.get(self.spec.source))
+        if lit and self.blink > 0:
+            lit = (now % self.blink) < self.blink / 2
+        if lit == self._lit:
+            return False
+        frame[self._region] = self._color if lit else 0
+        self._lit = lit
+        return True
+
+    def invalidate(self) -> None:
+        """Force the next draw to repaint the dot."""
+        self._lit = None
+
+
+class TickerField(CompiledField):
+    """Compiled scrolling ticker drawn over the fields beneath it."""
+
+    def __init__(
+        self,
+        spec: FieldSpec,
+        rect: Rect,
+        tiles: Dict[str, np.ndarray],
+        alarm_tiles: Dict[str, np.ndarray],
+    ) -> None:
+        """Initialize the ticker field.
+
+        Args:
+            spec: Field description
+            rect: Clip rectangle on the canvas
+            tiles: Tile set for regular messages
+            alarm_tiles: Tile set for alarm-priority messages
+        """
+        super().__init__(spec, rect)
+        x, y, w, h = rect
+        self.dynamic = True
+        self.ticker = Ticker(w, h, speed=spec.speed)
+        self.tiles = tiles
+        self.alarm_tiles = alarm_tiles
+        self._region = (slice(y, y + h), slice(x, x + w))
+
+    def show(self, text: str, priority: int, passes: Optional[int]) -> None:
+        """Queue a message on the ticker.
+
+        Args:
+            text: Message text
+            priority: Message priority
+            passes: Scroll passes before expiry (None to persist)
+        """
+        tiles = self.alarm_tiles if priority >= PRIORITY_ALARM else self.tiles
+        self.ticker.show(tiles, text, priority, passes)
+
+    def clear(self, priority: Optional[int] = None) -> None:
+        """Remove queued messages.
+
+        Args:
+            priority: Priority to remove (default: all messages)
+        """
+        self.ticker.clear(priority)
+
+    def draw(self, frame: np.ndarray, state: Dict[str, Any], now: float) -> bool:
+        """Copy the current scroll window, or clear it once released."""
+        window = self.ticker.window(now)
+        if window is not None:
+            frame[self._region] = window
+            self.active = True
+            return True
+        if self.active and not self.ticker.active:
+            frame[self._region] = 0
+            self.active = False
+            return True
+        return False
+
+    def invalidate(self) -> None:
+        """Force the next draw to copy the window again."""
+        self.ticker.invalidate()
+
+
+class RenderPlan:
+    """Compiled layout ready for per-frame rendering.
+
+    Attributes:
+        width: Canvas width in pixels
+        height: Canvas height in pixels
+        fields: Compiled fields in drawing order
+    """
+
+    def __init__(self, width: int, height: int, fields: List[CompiledField]) -> None:
+        """Initialize the render plan.
+
+        Args:
+            width: Canvas width in pixels
+            height: Canvas height in pixels
+            fields: Compiled fields in drawing order
+        """
+        self.width = width
+        self.height = height
+        self.fields = fields
+        self._by_source: Dict[str, List[CompiledField]] = {}
+        for compiled in fields:
+            self._by_source.setdefault(compiled.spec.source, []).append(compiled)
+        # Text colors follow the machine state, so a state change touches
+        # every field that has per-state tiles.
+        for compiled in fields:
+            if isinstance(compiled, TextField) and compiled.state_tiles:
+                if compiled not in self._by_source.setdefault("state", []):
+                    self._by_source["state"].append(compiled)
+            if isinstance(compiled, TextField) and compiled.stale_tiles:
+                self._by_source.setdefault("link", []).append(compiled)
+        self._dynamic = [compiled for compiled in fields if compiled.dynamic]
+        self._pending: List[CompiledField] = []
+        self.tickers = [f for f in fields if isinstance(f, TickerField)]
+        self._covered_by: Dict[int, List[CompiledField]] = {}
+        for overlay in self.tickers:
+            overlay.covers = [
+                compiled
+                for compiled in fields
+                if compiled is not overlay and _clip(compiled.rect, overlay.rect)
+            ]
+            for compiled in overlay.covers:
+                self._covered_by.setdefault(id(compiled), []).append(overlay)
+        # Fields later in drawing order paint over the fields they overlap
+        # (e.g. with a font taller than the layout assumed), so redrawing a
+        # field must repaint those as well to match a full repaint.
+        self._above: Dict[int, List[CompiledField]] = {}
+        plain = [f for f in fields if not isinstance(f, TickerField)]
+        for index, compiled in enumerate(plain):
+            for later in plain[index:]:
+                if later is not compiled and _clip(later.rect, compiled.rect):
+                    self._above.setdefault(id(compiled), []).append(later)
+
+    def set_effects(self, enabled: bool) -> None:
+        """Enable or disable visual effects (blinking).
+
+        Fields that stop blinking are no longer evaluated every frame; they
+        are repainted once on the next render and then follow their source.
+
+        Args:
+            enabled: Whether effects should run
+        """
+        for compiled in self.fields:
+            if compiled.spec.blink <= 0:
+                continue
+            compiled.blink = compiled.spec.blink if enabled else 0.0
+            compiled.dynamic = enabled
+            compiled.invalidate()
+            self._pending.append(compiled)
+        self._dynamic = [compiled for compiled in self.fields if compiled.dynamic]
+
+    def render(
+        self,
+        frame: np.ndarray,
+        state: Dict[str, Any],
+        changed: Optional[Iterable[str]],
+        now: float,
+    ) -> List[Rect]:
+        """Draw the fields affected by changed status keys.
+
+        Args:
+            frame: RGB frame buffer of shape ``(height, width, 3)``
+            state: Current status values
+            changed: Status keys that changed since the last call, or None
+                to repaint every field
+            now: Monotonic time in seconds
+
+        Returns:
+            Clip rectangles of the fields that were redrawn
+        """
+        if changed is None:
+            frame[:] = 0
+            for compiled in self.fields:
+                compiled.invalidate()
+            selected = {id(compiled) for compiled in self.fields}
+        else:
+            selected = {id(compiled) for compiled in self._dynamic}
+            selected.update(id(compiled) for compiled in self._pending)
+            for key in changed:
+                for compiled in self._by_source.get(key, ()):
+                    selected.add(id(compiled))
+        self._pending = []
+
+        redrawn: List[Rect] = []
+        for compiled in self.fields:
+            if id(compiled) in selected:
+                self._draw(compiled, frame, state, now, redrawn)
+        return redrawn
+
+    def _draw(
+        self,
+        compiled: CompiledField,
+        frame: np.ndarray,
+        state: Dict[str, Any],
+        now: float,
+        redrawn: List[Rect],
+    ) -> None:
+        """Draw one field and repaint whatever must stay on top of it.
+
+        Args:
+            compiled: Field to draw
+            frame: RGB frame buffer
+            state: Current status values
+            now: Monotonic time in seconds
+            redrawn: Receives the clip rectangles of redrawn fields
+        """
+        overlays = self._covered_by.get(id(compiled), ())
+        if any(overlay.active for overlay in overlays):
+            # Hidden for now; repaint in full once uncovered
+            compiled.invalidate()
+            return
+        was_active = compiled.active
+        if compiled.draw(frame, state, now):
+            redrawn.append(compiled.rect)
+            if compiled.active and not was_active:
+                self._hide_covered(compiled, frame, state, now, redrawn)
+            for above in self._above.get(id(compiled), ()):
+                above.invalidate()
+                self._draw(above, frame, state, now, redrawn)
+        if was_active and not compiled.active:
+            for beneath in compiled.covers:
+                beneath.invalidate()
+                self._draw(beneath, frame, state, now, redrawn)
+
+    def _hide_covered(
+        self,
+        overlay: CompiledField,
+        frame: np.ndarray,
+        state: Dict[str, Any],
+        now: float,
+        redrawn: List[Rect],
+    ) -> None:
+        """Remove the fields an overlay hides, as a full repaint would.
+
+        Covered fields may extend past the overlay, so their whole area is
+        cleared and the visible fields crossing it are drawn again in
+        drawing order (the overlay included).
+
+        Args:
+            overlay: Overlay that just became active
+            frame: RGB frame buffer
+            state: Current status values
+            now: Monotonic time in seconds
+            redrawn: Receives the clip rectangles of redrawn fields
+        """
+        cleared = [beneath.rect for beneath in overlay.covers]
+        for x, y, w, h in cleared:
+            frame[slice(y, y + h), slice(x, x + w)] = 0
+        for compiled in self.fields:
+            if any(_clip(compiled.rect, rect) for rect in cleared):
+                compiled.invalidate()
+                self._draw(compiled, frame, state, now, redrawn)
+
+
+def compile_layout(
+    spec: LayoutSpec,
+    width: int,
+    height: int,
+    scheme: Dict[str, Any],
+    brightness: float = 1.0,
+    font_dir: Optional[str] = None,
+    atlas: Optional[GlyphAtlas] = None,
+) -> RenderPlan:
+    """Compile a layout description into a render plan.
+
+    Args:
+        spec: Layout description
+        width: Canvas width in pixels
+        height: Canvas height in pixels
+        scheme: Color scheme from :func:`load_color_scheme`
+        brightness: Brightness factor (0.0-1.0) baked into the colors
+        font_dir: Directory containing BDF fonts
+        atlas: Shared glyph atlas
+
+    Returns:
+        Render plan for the layout
+
+    Raises:
+        ValueError: If a field uses an unknown kind or color role
+    """
+    atlas = atlas or GlyphAtlas()
+    canvas = (0, 0, width, height)
+    compiled: List[CompiledField] = []
+
+    for item in spec.fields:
+        for role in (item.color, item.stale_color):
+            if role and role not in scheme:
+                raise ValueError(f"Field {item.name}: unknown color role {role}")
+        color = _scale(scheme[item.color], brightness)
+
+        if item.kind == "dot":
+            rect = _clip((item.x, item.y, item.width, item.height), canvas)
+            if rect is None:
+                logger.warning("Field %s is outside the canvas", item.name)
+                continue
+            compiled.append(DotField(item, rect, color))
+            continue
+        if item.kind == "ticker":
+            font = load_font(item.font, font_dir)
+            ticker_height = item.height or font.height
+            rect = _clip((item.x, item.y, item.width, ticker_height), canvas)
+            if rect is None:
+                logger.warning("Field %s is outside the canvas", item.name)
+                continue
+            alarm = _scale(scheme.get("alarm", scheme[item.color]), brightness)
+            compiled.append(
+                TickerField(
+                    item,
+                    rect,
+                    atlas.tiles(font, color),
+                    atlas.tiles(font, alarm),
+                )
+            )
+            continue
+        if item.kind != "text":
+            raise ValueError(f"Field {item.name}: unknown kind {item.kind}")
+
+        font = load_font(item.font, font_dir)
+        rect = _clip((item.x, item.y, item.chars * font.width, font.height), canvas)
+        if rect is None:
+            logger.warning("Field %s is outside the canvas", item.name)
+            continue
+
+        slots = []
+        for index in range(item.chars):
+            cell = (item.x + index * font.width, item.y, font.width, font.height)
+            visible = _clip(cell, rect)
+            if visible is None:
+                # Keep slot positions aligned with characters
+                slots.append((slice(0, 0), slice(0, 0), slice(0, 0), slice(0, 0)))
+                continue
+            vx, vy, vw, vh = visible
+            sx, sy = vx - cell[0], vy - cell[1]
+            slots.append(
+                (
+                    slice(vy, vy + vh),
+                    slice(vx, vx + vw),
+                    slice(sy, sy + vh),
+                    slice(sx, sx + vw),
+                )
+            )
+
+        state_tiles = {}
+        if item.source == "state" or item.color == "state":
+            for state_name, state_color in scheme.get("states", {}).items():
+                state_color = _scale(state_color, brightness)
+                state_tiles[state_name] = atlas.tiles(font, state_color)
+        stale_tiles = None
+        if item.stale_color:
+            stale_color = _scale(scheme[item.stale_color], brightness)
+            stale_tiles = atlas.tiles(font, stale_color)
+        compiled.append(
+            TextField(
+                item,
+                rect,
+                font,
+                slots,
+                atlas.tiles(font, color),
+                state_tiles,
+                stale_tiles,
+            )
+        )
+
+    return RenderPlan(width, height, compiled)
@@ -0,0 +1,357 @@
+"""LED matrix display for FluidNC status.
+
+This module owns the RGB frame buffer and the PioMatter panel driver. It
+keeps the latest status values, renders them through a compiled layout
+and pushes the result to the panel.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional, Set
+
+import numpy as np
+
+from fluidnc_ledscreen.layout import (
+    GlyphAtlas,
+    RenderPlan,
+    compile_layout,
+    load_color_scheme,
+    load_layout,
+)
+from fluidnc_ledscreen.metrics import Metrics
+from fluidnc_ledscreen.panel_map import PanelMap
+from fluidnc_ledscreen.sleep import SleepPolicy, SleepTimer
+from fluidnc_ledscreen.ticker import PRIORITY_ALARM, PRIORITY_MESSAGE
+
+try:
+    import adafruit_blinka_raspberry_pi5_piomatter as piomatter
+except ImportError:  # pragma: no cover - only available on a Pi 5
+    piomatter = None
+
+logger = logging.getLogger(__name__)
+
+
+class LEDScreen:
+    """LED matrix display driven by a declarative layout.
+
+    Status updates only record which values changed; :meth:`render` then
+    redraws the affected fields and pushes the frame to the panel. When no
+    field was redrawn the frame is identical to the last one and the push
+    is skipped. Without the PioMatter driver the screen runs on a virtual
+    frame buffer.
+
+    Chained or tiled panels are described by a :class:`PanelMap`; the
+    layout then draws on the logical canvas and the output stage remaps
+    each frame into physical chain order.
+
+    With a :class:`SleepPolicy` the screen switches to a dim clock layout
+    after a quiet period while the machine is idle or disconnected, and
+    switches back on the first update showing activity.
+
+    Attributes:
+        width: Logical canvas width in pixels
+        height: Logical canvas height in pixels
+        frame: Logical RGB frame buffer of shape ``(height, width, 3)``
+        output: Physical frame buffer handed to the driver
+        state: Latest status values
+        effects: Whether visual effects (blinking) run
+        sleep_interval: Render interval while asleep, in seconds
+    """
+
+    def __init__(
+        self,
+        width: int = 64,
+        height: int = 32,
+        layout: str = "default",
+        color_scheme: str = "default",
+        brightness: float = 1.0,
+        font_dir: Optional[str] = None,
+        use_driver: bool = True,
+        panel_map: Optional[PanelMap] = None,
+        metrics: Optional[Metrics] = None,
+        sleep: Optional[SleepPolicy] = None,
+    ) -> None:
+        """Initialize the LED screen.
+
+        Args:
+            width: Panel width in pixels (ignored with ``panel_map``)
+            height: Panel height in pixels (ignored with ``panel_map``)
+            layout: Built-in layout name or JSON layout file
+            color_scheme: Built-in color scheme name or JSON scheme file
+            brightness: Brightness factor (0.0-1.0)
+            font_dir: Directory containing BDF fonts
+            use_driver: Whether to drive a physical panel if available
+            panel_map: Chain arrangement (default: a single panel)
+            metrics: Metrics registry receiving pushed/skipped frame counts
+            sleep: Sleep policy (default: never sleep)
+        """
+        self.panel_map = panel_map or PanelMap(width, height)
+        self.width = self.panel_map.width
+        self.height = self.panel_map.height
+        self.brightness = brightness
+        self.font_dir = font_dir
+        self.metrics = metrics or Metrics()
+        self.frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        if self.panel_map.identity:
+            self.output = self.frame
+        else:
+            self.output = np.zeros(self.panel_map.physical_shape, dtype=np.uint8)
+        self.state: Dict[str, Any] = {}
+        self._atlas = GlyphAtlas()
+        self._changed: Optional[Set[str]] = None
+        self.effects = True
+        self.plan = self._compile(layout, color_scheme)
+        self._awake_plan = self.plan
+        self._color_scheme = color_scheme
+        self._sleep_timer = SleepTimer(sleep) if sleep else None
+        self._sleep_plan: Optional[RenderPlan] = None
+        self._page_plans: Dict[str, RenderPlan] = {}
+        self._page_until = 0.0
+        self.sleep_interval = 1.0 / sleep.fps if sleep else 0.0
+        self._matrix = self._open_driver() if use_driver else None
+
+    def _compile(self, layout: str, color_scheme: str, dim: float = 1.0) -> RenderPlan:
+        """Compile a layout and color scheme for this panel.
+
+        Args:
+            layout: Layout name or file
+            color_scheme: Color scheme name or file
+            dim: Factor applied to the screen brightness
+
+        Returns:
+            Render plan
+        """
+        return compile_layout(
+            load_layout(layout),
+            self.width,
+            self.height,
+            load_color_scheme(color_scheme),
+            brightness=self.brightness * dim,
+            font_dir=self.font_dir,
+            atlas=self._atlas,
+        )
+
+    def _open_driver(self) -> Optional[Any]:
+        """Open the PioMatter panel driver.
+
+        Returns:
+            Driver instance, or None if no panel is available
+        """
+        if piomatter is None:
+            logger.warning("PioMatter not available, using virtual frame buffer")
+            return None
+        chain_width, chain_height = self.panel_map.chain_size
+        try:
+            geometry = piomatter.Geometry(
+                width=chain_width,
+                height=chain_height,
+                n_addr_lines=self.panel_map.addr_lines,
+                rotation=piomatter.Orientation.Normal,
+            )
+            return piomatter.PioMatter(
+                colorspace=piomatter.Colorspace.RGB888Packed,
+                pinout=piomatter.Pinout.AdafruitMatrixBonnet,
+                framebuffer=self.output,
+                geometry=geometry,
+            )
+        except (OSError, RuntimeError) as e:
+            logger.error("Failed to open LED matrix: %s", str(e))
+            return None
+
+    def set_layout(self, layout: str, color_scheme: str = "default") -> None:
+        """Switch to another layout and color scheme.
+
+        Args:
+            layout: Layout name or file
+            color_scheme: Color scheme name or file
+        """
+        self._awake_plan = self._compile(layout, color_scheme)
+        self._awake_plan.set_effects(self.effects)
+        if self._color_scheme != color_scheme:
+            self._color_scheme = color_scheme
+            self._sleep_plan = None
+            self._page_plans.clear()
+        self._page_until = 0.0
+        if not self.sleeping:
+            self.plan = self._awake_plan
+        self._changed = None
+
+    def repaint(self) -> None:
+        """Clear the frame and redraw every field on the next render."""
+        self._changed = None
+
+    def set_effects(self, enabled: bool) -> None:
+        """Enable or disable visual effects such as blinking.
+
+        Args:
+            enabled: Whether effects should run
+        """
+        if enabled != self.effects:
+            self.effects = enabled
+            self._awake_plan.set_effects(enabled)
+
+    @property
+    def sleeping(self) -> bool:
+        """Whether the screen shows the sleep layout."""
+        return self._sleep_timer is not None and self._sleep_timer.asleep
+
+    def sleep(self) -> None:
+        """Switch to the sleep layout."""
+        if self._sleep_timer is None or self.sleeping:
+            return
+        policy = self._sleep_timer.policy
+        if self._sleep_plan is None:
+            dim = policy.brightness
+            self._sleep_plan = self._compile(policy.layout, self._color_scheme, dim)
+        self._sleep_timer.asleep = True
+        self._page_until = 0.0
+        self.plan = self._sleep_plan
+        self._changed = None
+        self.metrics.inc("display_sleeps")
+        self.metrics.set("display_asleep", True)
+        logger.info("Display asleep")
+
+    def wake(self) -> None:
+        """Switch back to the normal layout."""
+        if self._sleep_timer is None:
+            return
+        self._sleep_timer.touch(time.monotonic())
+        if not self._sleep_timer.asleep:
+            return
+        self._sleep_timer.asleep = False
+        self.plan = self._awake_plan
+        self._changed = None
+        self.metrics.set("display_asleep", False)
+        logger.info("Display awake")
+
+    def show_page(self, layout: str, seconds: float) -> None:
+        """Show another layout for a while, e.g. a statistics page.
+
+        Ignored while the screen sleeps. Messages, sleep and layout changes
+        end the page early.
+
+        Args:
+            layout: Layout name or file
+            seconds: How long the page stays up
+        """
+        if self.sleeping:
+            return
+        plan = self._page_plans.get(layout)
+        if plan is None:
+            plan = self._page_plans[layout] = self._compile(layout, self._color_scheme)
+        self.plan = plan
+        self._page_until = time.monotonic() + seconds
+        self._changed = None
+
+    def end_page(self) -> None:
+        """Return from a page to the normal layout."""
+        if not self._page_until:
+            return
+        self._page_until = 0.0
+        if not self.sleeping:
+            self.plan = self._awake_plan
+            self._changed = None
+
+    def update(self, message: Dict[str, Any]) -> None:
+        """Record new status values.
+
+        ``message`` and ``alarm`` values are routed to the ticker; an alarm
+        stays on the ticker until the machine leaves the ``Alarm`` state.
+
+        Args:
+            message: Status values keyed by field source (e.g. ``x``,
+                ``state``, ``ip``, ``connected``, ``message``, ``alarm``)
+        """
+        if self._sleep_timer is not None:
+            if self._sleep_timer.observe(message, self.state, time.monotonic()):
+                self.wake()
+        for key, value in message.items():
+            if self.state.get(key) != value:
+                self.state[key] = value
+                if self._changed is not None:
+                    self._changed.add(key)
+        if message.get("message"):
+            self.show_message(str(message["message"]))
+        if message.get("alarm"):
+            self.show_message(str(message["alarm"]), PRIORITY_ALARM, passes=None)
+        if "state" in message and message["state"] != "Alarm":
+            self.clear_message(PRIORITY_ALARM)
+
+    def show_message(
+        self,
+        text: str,
+        priority: int = PRIORITY_MESSAGE,
+        passes: Optional[int] = 2,
+    ) -> None:
+        """Scroll a message on the layout's ticker.
+
+        A message preempts lower priority messages until it expires or is
+        cleared. Layouts without a ticker ignore messages.
+
+        Args:
+            text: Message text
+            priority: Message priority
+            passes: Scroll passes before expiry (None to persist)
+        """
+        self.wake()
+        self.end_page()
+        for ticker in self._awake_plan.tickers:
+            ticker.show(text, priority, passes)
+
+    def clear_message(self, priority: Optional[int] = None) -> None:
+        """Remove ticker messages.
+
+        Args:
+            priority: Priority to remove (default: all messages)
+        """
+        for ticker in self._awake_plan.tickers:
+            ticker.clear(priority)
+
+    def render(self, now: Optional[float] = None) -> bool:
+        """Redraw changed fields and push the frame to the panel.
+
+        Args:
+            now: Monotonic time in seconds (default: current time)
+
+        Returns:
+            True if the frame changed and was pushed
+        """
+        if now is None:
+            now = time.monotonic()
+        if self._page_until and now >= self._page_until:
+            self.end_page()
+        if self._sleep_timer is not None:
+            if self._sleep_timer.due(self.state, now):
+                self.sleep()
+            if self.sleeping:
+                self._tick_clock()
+        changed = self._changed
+        self._changed = set()
+        if not self.plan.render(self.frame, self.state, changed, now):
+            # Nothing visible changed; the panel keeps showing its buffer
+            self.metrics.inc("frames_skipped")
+            return False
+        self._push()
+        return True
+
+    def _tick_clock(self) -> None:
+        """Update the ``clock`` value shown by the sleep layout."""
+        clock = time.strftime(self._sleep_timer.policy.clock_format)
+        if self.state.get("clock") != clock:
+            self.state["clock"] = clock
+            if self._changed is not None:
+                self._changed.add("clock")
+
+    def _push(self) -> None:
+        """Push the frame buffer to the panel."""
+        if self.output is not self.frame:
+            self.panel_map.apply(self.frame, out=self.output)
+        if self._matrix is not None:
+            self._matrix.show()
+        self.metrics.inc("frames_pushed")
+
+    def cleanup(self) -> None:
+        """Blank the panel and release the driver."""
+        self.frame[:] = 0
+        self._push()
+        self._matrix = None
@@ -7,9 +7,35 @@ application, handling initialization and coordination of components.
 import asyncio
 import logging
 import signal
-from typing import Optional
+import sys
+import time
+from typing import Any, Dict, Optional
 
+from fluidnc_ledscreen.bootstrap import MDNS_SERVICE, Bootstrapper
+from fluidnc_ledscreen.config import load_config
+from fluidnc_ledscreen.connection_profile import ConnectionProfile
+from fluidnc_ledscreen.dashboard import DashboardServer
+from fluidnc_ledscreen.diagnostics import RESTART_EXIT_CODE, MemoryMonitor
+from fluidnc_ledscreen.governor import FrameGovernor
 from fluidnc_ledscreen.led_screen import LEDScreen
+from fluidnc_ledscreen.metrics import Metrics
+from fluidnc_ledscreen.mirror import FrameMirror, max_frame_size
+from fluidnc_ledscreen.outbox import Outbox
+from fluidnc_ledscreen.panel_map import PanelMap
+from fluidnc_ledscreen.profiler import SamplingProfiler
+from fluidnc_ledscreen.reporting import MODE_AUTO, StatusReporter
+from fluidnc_ledscreen.runtime import LOOP_AUTO, LoopLagMonitor, Supervisor, run
+from fluidnc_ledscreen.shared_state import (
+    RenderProcess,
+    StatePublisher,
+    StateSlot,
+    parse_cpus,
+    set_affinity,
+)
+from fluidnc_ledscreen.sleep import SleepPolicy
+from fluidnc_ledscreen.transport import Transport, create_transport
+from fluidnc_ledscreen.utilization import UtilizationAccountant
+from fluidnc_ledscreen.watchdog import LIVE, LOST, StatusWatchdog
 from fluidnc_ledscreen.websocket_client import WebSocketClient
 
 logger = logging.getLogger(__name__)
@@ -28,6 +54,33 @@ class FluidNCLEDScreen:
         led_count: int = 60,
         led_pin: int = 18,
         led_brightness: int = 255,
+        matrix_width: int = 64,
+        matrix_height: int = 32,
+        layout: str = "default",
+        color_scheme: str = "default",
+        render_fps: float = 20.0,
+        panel_map: Optional[PanelMap] = None,
+        report_mode: str = MODE_AUTO,
+        report_interval: float = 0.2,
+        poll_interval: float = 0.5,
+        metrics_interval: float = 60.0,
+        connection_profile: Optional[ConnectionProfile] = None,
+        transport: Optional[Transport] = None,
+        bootstrapper: Optional[Bootstrapper] = None,
+        display: Optional[Any] = None,
+        stale_after: float = 3.0,
+        lost_after: float = 10.0,
+        reconnect_after: float = 20.0,
+        dashboard: Optional[DashboardServer] = None,
+        mirror: Optional[FrameMirror] = None,
+        governor: Optional[FrameGovernor] = None,
+        sleep: Optional[SleepPolicy] = None,
+        memory: Optional[MemoryMonitor] = None,
+        supervisor: Optional[Supervisor] = None,
+        loop_lag: Optional[LoopLagMonitor] = None,
+        outbox: Optional[Outbox] = None,
+        utilization: Optional[UtilizationAccountant] = None,
+        render_process: Optional[RenderProcess] = None,
     ) -> None:
         """Initialize the FluidNC LED Screen Monitor.
 
@@ -36,31 +89,174 @@ class FluidNCLEDScreen:
             led_count: Number of LEDs in the strip
             led_pin: GPIO pin for LED control
             led_brightness: LED brightness (0-255)
+            matrix_width: LED matrix width in pixels
+            matrix_height: LED matrix height in pixels
+            layout: Display layout name or JSON layout file
+            color_scheme: Color scheme name or JSON scheme file
+            render_fps: Maximum display refresh rate (0 disables the
+                render loop, e.g. when another process renders)
+            panel_map: Arrangement of chained panels (default: one panel
+                of ``matrix_width`` x ``matrix_height``)
+            report_mode: Status reporting mode (``auto``, ``event`` or
+                ``poll``)
+            report_interval: Automatic status report interval in seconds
+            poll_interval: Status polling interval in seconds
+            metrics_interval: Seconds between metrics log lines (0 disables)
+            connection_profile: WebSocket connection tuning
+            transport: Controller transport (default: WebSocket to
+                ``websocket_url``)
+            bootstrapper: Races candidate controller addresses instead of
+                using a fixed transport
+            display: Object receiving status updates in place of an
+                :class:`LEDScreen` (e.g. a
+                :class:`~fluidnc_ledscreen.shared_state.StatePublisher`)
+            stale_after: Seconds without a status report before the
+                coordinates are dimmed
+            lost_after: Seconds without a status report before the link
+                counts as lost
+            reconnect_after: Seconds without a status report before the
+                connection is dropped and re-established (0 disables)
+            dashboard: Web dashboard mirroring the display state
+            mirror: Panel mirror, served by the dashboard at ``/mirror``
+            governor: Adapts the render rate and effects to the CPU load
+            sleep: Sleep policy of the LED screen (default: never sleep)
+            memory: RSS, task and allocation checks; exceeding its RSS
+                ceiling shuts the application down for a restart
+            supervisor: Runs and restarts the connection, status reporting,
+                render, governor, metrics and loop-lag services (default:
+                :class:`~fluidnc_ledscreen.runtime.Supervisor`)
+            loop_lag: Event loop lag probe
+            outbox: Delivers alarm and job events to notification sinks
+            utilization: Accounts time per machine state, shift and day
+                and shows it on the display
+            render_process: Render process of split mode, restarted by
+                the supervisor when it exits
         """
+        self._started = time.monotonic()
+        self._first_status = False
+        self.metrics = Metrics()
+        if bootstrapper:
+            bootstrapper.metrics = self.metrics
+        self.dashboard = dashboard
+        if dashboard:
+            dashboard.metrics = self.metrics
+        self.mirror = mirror if dashboard else None
+        if self.mirror:
+            self.mirror.metrics = self.metrics
+            dashboard.routes["/mirror"] = self.mirror.handle
         self.websocket_client = WebSocketClient(
             url=websocket_url,
             message_callback=self._handle_message,
+            on_connect=self._handle_connect,
+            on_disconnect=self._handle_disconnect,
+            profile=connection_profile,
+            metrics=self.metrics,
+            transport=transport,
+            bootstrapper=bootstrapper,
         )
-        self.led_screen = LEDScreen()
+        self.supervisor = supervisor or Supervisor()
+        self.supervisor.metrics = self.metrics
+        self.supervisor.on_fatal = self.request_restart
+        self.reporter = StatusReporter(
+            send=self.websocket_client.send,
+            mode=report_mode,
+            report_interval=report_interval,
+            poll_interval=poll_interval,
+            # Probe an idle stream often enough that it never looks stale
+            quiet_timeout=stale_after / 2,
+            metrics=self.metrics,
+            supervisor=self.supervisor,
+        )
+        self.watchdog = StatusWatchdog(
+            on_level=self._handle_link_level,
+            reconnect=self.websocket_client.force_reconnect,
+            stale_after=stale_after,
+            lost_after=lost_after,
+            reconnect_after=reconnect_after,
+            metrics=self.metrics,
+        )
+        self.led_screen = display or LEDScreen(
+            width=matrix_width,
+            height=matrix_height,
+            layout=layout,
+            color_scheme=color_scheme,
+            brightness=led_brightness / 255,
+            panel_map=panel_map,
+            metrics=self.metrics,
+            sleep=sleep,
+        )
+        self.render_interval = 1.0 / render_fps if render_fps > 0 else 0.0
+        self.governor = governor if self.render_interval else None
+        if self.governor:
+            self.governor.metrics = self.metrics
+        self.metrics_interval = metrics_interval
+        self.profiler = SamplingProfiler()
+        self.memory = memory
+        if memory:
+            memory.metrics = self.metrics
+            memory.on_limit = self.request_restart
+        self.loop_lag = loop_lag
+        if loop_lag:
+            loop_lag.metrics = self.metrics
+        self.outbox = outbox
+        if outbox:
+            outbox.metrics = self.metrics
+        self.utilization = utilization
+        if utilization:
+            utilization.metrics = self.metrics
+            utilization.on_update = self._show_utilization
+        self._paged = time.monotonic()
+        self.render_process = render_process
         self.running = False
+        self.restart_requested = False
         self._shutdown_event: Optional[asyncio.Event] = None
+        self._render_wakeup: Optional[asyncio.Event] = None
 
     async def start(self) -> None:
         """Start the application."""
         try:
             self.running = True
             self._shutdown_event = asyncio.Event()
+            self._render_wakeup = asyncio.Event()
 
             # Set up signal handlers
+            loop = asyncio.get_running_loop()
             for sig in (signal.SIGTERM, signal.SIGINT):
-                loop = asyncio.get_event_loop()
                 loop.add_signal_handler(
                     sig,
                     lambda s=sig: asyncio.create_task(self._handle_signal(s)),
                 )
+            # SIGUSR1 starts and SIGUSR2 stops the sampling profiler
+            loop.add_signal_handler(signal.SIGUSR1, self.profiler.start, loop)
+            loop.add_signal_handler(signal.SIGUSR2, self.profiler.stop)
 
-            # Start WebSocket client
-            await self.websocket_client.connect()
+            # Services stop in reverse order: the connection first
+            if self.render_process:
+                self.supervisor.add("render_process", self.render_process.run)
+            if self.render_interval:
+                self.supervisor.add("renderer", self._render_loop)
+            if self.governor:
+                self.supervisor.add("governor", self._governor_loop)
+            if self.metrics_interval > 0:
+                self.supervisor.add("metrics", self._metrics_loop)
+            if self.loop_lag:
+                self.supervisor.add("loop_lag", self.loop_lag.run)
+            if self.outbox:
+                self.supervisor.add("outbox", self.outbox.run)
+            if self.utilization:
+                self.supervisor.add("utilization", self.utilization.run)
+            if self.memory:
+                self.memory.start()
+            if self.dashboard:
+                try:
+                    await self.dashboard.start()
+                except OSError as e:
+                    logger.error("Failed to start dashboard: %s", str(e))
+            if self.mirror:
+                self.mirror.start()
+            # Retried with backoff until the controller answers
+            self.supervisor.add("connection", self.websocket_client.run)
+            self.watchdog.start()
 
             # Wait for shutdown
             await self._shutdown_event.wait()
@@ -74,9 +270,83 @@ class FluidNCLEDScreen:
     async def stop(self) -> None:
         """Stop the application."""
         self.running = False
+        if self.profiler.running:
+            self.profiler.stop()
+        await self.supervisor.stop()
+        if self.memory:
+            self.memory.stop()
+        self.reporter.stop()
+        self.watchdog.close()
+        if self.mirror:
+            await self.mirror.stop()
+        if self.dashboard:
+            await self.dashboard.stop()
         await self.websocket_client.disconnect()
         self.led_screen.cleanup()
 
+    async def _render_loop(self) -> None:
+        """Render the display on status updates and at the frame interval.
+
+        Updates wake the loop immediately; the interval keeps time-based
+        elements such as the blinking connection dot moving. While the
+        screen sleeps the interval is the (longer) sleep interval. Frames
+        are at least the render interval apart.
+        """
+        last = time.monotonic()
+        while self.running:
+            interval = self.render_interval
+            if self.led_screen.sleeping:
+                interval = self.led_screen.sleep_interval
+            timeout = max(0.0, last + interval - time.monotonic())
+            try:
+                await asyncio.wait_for(self._render_wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._render_wakeup.clear()
+            delay = last + self.render_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            last = time.monotonic()
+            started = time.perf_counter()
+            try:
+                pushed = self.led_screen.render()
+            except RuntimeError as e:
+                logger.error("LED screen error: %s", str(e))
+                pushed = False
+            if self.governor:
+                self.governor.record_render(time.perf_counter() - started)
+            if pushed and self.mirror:
+                self.mirror.on_frame(self.led_screen.frame)
+
+    async def _governor_loop(self) -> None:
+        """Apply the governor's frame rate and effects at its interval."""
+        while self.running:
+            await asyncio.sleep(self.governor.interval)
+            if self.governor.sample():
+                self.render_interval = 1.0 / self.governor.fps
+                self.led_screen.set_effects(self.governor.effects)
+
+    async def _metrics_loop(self) -> None:
+        """Log a metrics snapshot at the metrics interval."""
+        while self.running:
+            await asyncio.sleep(self.metrics_interval)
+            self.metrics.log()
+
+    def shutdown(self) -> None:
+        """Ask a running application to stop; :meth:`start` returns."""
+        if self._shutdown_event:
+            self._shutdown_event.set()
+
+    def request_restart(self, reason: str) -> None:
+        """Shut down cleanly and exit with :data:`RESTART_EXIT_CODE`.
+
+        Args:
+            reason: Why the restart is needed
+        """
+        logger.warning("Restarting: %s", reason)
+        self.restart_requested = True
+        self.shutdown()
+
     async def _handle_signal(self, sig: signal.Signals) -> None:
         """Handle shutdown signals.
 
@@ -84,8 +354,66 @@ class FluidNCLEDScreen:
             sig: Signal received
         """
         logger.info("Received signal %s, shutting down", sig.name)
-        if self._shutdown_event:
-            self._shutdown_event.set()
+        self.shutdown()
+
+    def _update_display(self, update: Dict[str, Any]) -> None:
+        """Apply a state update to the display and the dashboard.
+
+        Args:
+            update: Display state values
+        """
+        if self.utilization:
+            self.utilization.observe(update)
+        self.led_screen.update(update)
+        if self.dashboard:
+            self.dashboard.hub.publish(update)
+
+    def _show_utilization(self, values: Dict[str, Any]) -> None:
+        """Show utilization totals and rotate to their page when due.
+
+        Args:
+            values: Display values of the utilization accountant
+        """
+        self._update_display(values)
+        util = self.utilization
+        # A split-process display only shows the values in its layout
+        if not util.page_every or not isinstance(self.led_screen, LEDScreen):
+            return
+        now = time.monotonic()
+        if now - self._paged < util.page_every:
+            return
+        self._paged = now
+        if self.led_screen.state.get("state") != "Alarm":
+            self.led_screen.show_page(util.page_layout, util.page_seconds)
+            if self._render_wakeup:
+                self._render_wakeup.set()
+
+    def _handle_connect(self) -> None:
+        """Start status reporting on a new connection."""
+        if self.utilization:
+            self.utilization.set_machine(self.websocket_client.controller)
+        self._update_display({"connected": True})
+        self.reporter.start()
+
+    def _handle_disconnect(self) -> None:
+        """Stop status reporting when the connection is lost."""
+        self.reporter.stop()
+        self._update_display({"connected": False})
+
+    def _handle_link_level(self, level: str) -> None:
+        """Reflect the watchdog's link level on the display.
+
+        Args:
+            level: ``live``, ``stale`` or ``lost``
+        """
+        update: Dict[str, Any] = {"link": level}
+        if level == LOST:
+            update["connected"] = False
+        elif level == LIVE:
+            update["connected"] = self.websocket_client.transport.is_open
+        self._update_display(update)
+        if self._render_wakeup:
+            self._render_wakeup.set()
 
     def _handle_message(self, message: dict) -> None:
         """Handle messages from FluidNC.
@@ -93,8 +421,32 @@ class FluidNCLEDScreen:
         Args:
             message: Message data from FluidNC
         """
+        self.reporter.observe(message)
+        kind = message.get("type")
+        if kind in ("ok", "error", "info"):
+            return
+        if kind == "capabilities":
+            self._update_display(
+                {
+                    "axes": message["axes"],
+                    "units": message["units"],
+                    "firmware": message["firmware"],
+                }
+            )
+            return
+        if kind == "status":
+            self.watchdog.feed()
+        if self.outbox:
+            self.outbox.observe(message)
+        if kind == "status" and not self._first_status:
+            self._first_status = True
+            elapsed_ms = (time.monotonic() - self._started) * 1000
+            self.metrics.set("first_status_ms", elapsed_ms)
+            logger.info("First status report %.0f ms after startup", elapsed_ms)
         try:
-            self.led_screen.update(message)
+            self._update_display(message)
+            if self._render_wakeup:
+                self._render_wakeup.set()
         except (KeyError, ValueError) as e:
             logger.error("Invalid message format: %s", str(e))
         except RuntimeError as e:
@@ -112,9 +464,169 @@ def main() -> None:
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     )
 
+    config = load_config()
+    fluidnc = config["FluidNC"]
+    display = config["Display"]
+    panels = config["Panels"]
+    reporting = config["Reporting"]
+    runtime = config["Runtime"]
+    watchdog = config["Watchdog"]
+    web = config["Dashboard"]
+    diagnostics = config["Diagnostics"]
+    governing = config["Governor"]
+    host = fluidnc.get("ip_address", "").strip() or None
+    connection_profile = ConnectionProfile.from_config(config["Connection"])
+    transport_kind = fluidnc.get("transport", "websocket")
+    port = fluidnc.getint("port", fallback=None)
+    transport = None
+    bootstrapper = None
+    if transport_kind == "serial":
+        transport = create_transport(
+            transport_kind,
+            fluidnc.get("serial_port", "/dev/ttyUSB0"),
+            profile=connection_profile,
+            baudrate=fluidnc.getint("baudrate", 115200),
+        )
+    else:
+        bootstrapper = Bootstrapper(
+            transport_kind,
+            host,
+            port,
+            connection_profile,
+            discovery=fluidnc.getboolean("discovery", True),
+            discovery_timeout=fluidnc.getfloat("discovery_timeout", 10.0),
+            mdns_service=fluidnc.get("mdns_service", MDNS_SERVICE),
+        )
+    matrix_width = fluidnc.getint("matrix_width", 64)
+    matrix_height = fluidnc.getint("matrix_height", 32)
+    panel_map = PanelMap(
+        panel_width=panels.getint("panel_width", matrix_width),
+        panel_height=panels.getint("panel_height", matrix_height),
+        cols=panels.getint("cols", 1),
+        rows=panels.getint("rows", 1),
+        order=panels.get("order", "row-major"),
+        panel_rotation=panels.getint("panel_rotation", 0),
+        rotation=panels.getint("rotation", 0),
+    )
+
+    render_fps = display.getfloat("render_fps", 20.0)
+    sleep = SleepPolicy.from_config(display)
+    layout = display.get("layout", "default")
+    color_scheme = display.get("color_scheme", "default")
+    led_brightness = int(fluidnc.getfloat("brightness", 1.0) * 255)
+
+    governor_kwargs = None
+    if governing.getboolean("enabled", False):
+        governor_kwargs = {
+            "min_fps": governing.getfloat("min_fps", 5.0),
+            "cpu_high": governing.getfloat("cpu_high", 80.0),
+            "cpu_low": governing.getfloat("cpu_low", 50.0),
+            "interval": governing.getfloat("interval", 2.0),
+        }
+
+    mirror = None
+    mirror_slot = None
+    mirror_fps = web.getfloat("mirror_fps", 10.0)
+    if web.getboolean("enabled", False) and web.getboolean("mirror", True):
+        mirror = FrameMirror(max_fps=mirror_fps)
+
+    # In split mode a separate process renders; this one only ingests
+    render_process = None
+    publisher = None
+    if runtime.getint("processes", 1) == 2:
+        publisher = StatePublisher(StateSlot(create=True))
+        if mirror:
+            size = max_frame_size(panel_map.width, panel_map.height)
+            mirror_slot = StateSlot(capacity=size, create=True)
+            mirror.slot = mirror_slot
+        screen_kwargs = {
+            "layout": layout,
+            "color_scheme": color_scheme,
+            "brightness": led_brightness / 255,
+            "panel_map": panel_map,
+            "sleep": sleep,
+        }
+        render_process = RenderProcess(
+            (
+                publisher.slot.name,
+                screen_kwargs,
+                render_fps,
+                parse_cpus(runtime.get("render_cpus", "")),
+                reporting.getfloat("metrics_interval", 60.0),
+                mirror_slot.name if mirror_slot else None,
+                mirror_fps,
+                governor_kwargs,
+            )
+        )
+        render_fps = 0
+    set_affinity(parse_cpus(runtime.get("ingest_cpus", "")), "ingest")
+    lag_interval = runtime.getfloat("loop_lag_interval", 0.5)
+
+    dashboard = None
+    if web.getboolean("enabled", False):
+        dashboard = DashboardServer(
+            host=web.get("host", "0.0.0.0"),  # nosec B104
+            port=web.getint("port", 8080),
+            max_rate=web.getfloat("max_rate", 5.0),
+            max_clients=web.getint("max_clients", 16),
+        )
+
     # Create and run application
-    app = FluidNCLEDScreen(websocket_url="ws://localhost:81")
-    asyncio.run(app.start())
+    app = FluidNCLEDScreen(
+        websocket_url=f"ws://{host or 'localhost'}:81",
+        led_pin=fluidnc.getint("led_pin", 18),
+        led_brightness=led_brightness,
+        matrix_width=matrix_width,
+        matrix_height=matrix_height,
+        layout=layout,
+        color_scheme=color_scheme,
+        render_fps=render_fps,
+        panel_map=panel_map,
+        report_mode=reporting.get("mode", MODE_AUTO),
+        report_interval=reporting.getfloat("report_interval", 0.2),
+        poll_interval=reporting.getfloat("poll_interval", 0.5),
+        metrics_interval=reporting.getfloat("metrics_interval", 60.0),
+        connection_profile=connection_profile,
+        transport=transport,
+        bootstrapper=bootstrapper,
+        display=publisher,
+        stale_after=watchdog.getfloat("stale_after", 3.0),
+        lost_after=watchdog.getfloat("lost_after", 10.0),
+        reconnect_after=watchdog.getfloat("reconnect_after", 20.0),
+        dashboard=dashboard,
+        mirror=mirror,
+        sleep=sleep,
+        memory=MemoryMonitor(
+            check_interval=diagnostics.getfloat("check_interval", 60.0),
+            rss_limit_mb=diagnostics.getfloat("rss_limit_mb", 0.0),
+            trace=diagnostics.getboolean("tracemalloc", False),
+            snapshot_interval=diagnostics.getfloat("snapshot_interval", 600.0),
+            top=diagnostics.getint("top", 10),
+        ),
+        governor=(
+            FrameGovernor(max_fps=render_fps, **governor_kwargs)
+            if governor_kwargs and render_fps
+            else None
+        ),
+        supervisor=Supervisor(
+            backoff=runtime.getfloat("restart_backoff", 1.0),
+            max_backoff=runtime.getfloat("max_restart_backoff", 30.0),
+        ),
+        outbox=Outbox.from_config(config["Outbox"]),
+        utilization=UtilizationAccountant.from_config(config["Utilization"]),
+        render_process=render_process,
+        loop_lag=LoopLagMonitor(interval=lag_interval) if lag_interval > 0 else None,
+    )
+    try:
+        run(app.start(), runtime.get("loop", LOOP_AUTO))
+    finally:
+        if render_process:
+            render_process.stop()
+        if mirror_slot:
+            mirror_slot.close()
+    if app.restart_requested:
+        # The container or service manager starts a fresh process
+        sys.exit(RESTART_EXIT_CODE)
 
 
 if __name__ == "__main__":
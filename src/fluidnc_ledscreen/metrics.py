@@ -0,0 +1,90 @@
+"""Runtime metrics for FluidNC LED Screen Monitor.
+
+This module provides a small in-process registry of counters and gauges
+that components update on their hot paths at negligible cost. The main
+application logs a snapshot periodically.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Union
+
+logger = logging.getLogger(__name__)
+
+Number = Union[int, float]
+
+
+class Metrics:
+    """Registry of named counters and gauges.
+
+    Counters only ever increase; gauges hold the latest value, which may
+    be a number or a short string (e.g. a mode name).
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._counters: Dict[str, Number] = {}
+        self._gauges: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: Number = 1) -> None:
+        """Increase a counter.
+
+        Args:
+            name: Counter name
+            amount: Amount to add
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def set(self, name: str, value: Any) -> None:
+        """Set a gauge.
+
+        Args:
+            name: Gauge name
+            value: New value
+        """
+        self._gauges[name] = value
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Get the current value of a counter or gauge.
+
+        Args:
+            name: Metric name
+            default: Value returned if the metric is unknown
+
+        Returns:
+            Current value
+        """
+        if name in self._gauges:
+            return self._gauges[name]
+        return self._counters.get(name, default)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get all metrics.
+
+        Returns:
+            Mapping of metric name to value
+        """
+        with self._lock:
+            values: Dict[str, Any] = dict(self._counters)
+        values.update(self._gauges)
+        return values
+
+    def log(self, level: int = logging.INFO) -> None:
+        """Log a one-line snapshot of all metrics.
+
+        Args:
+            level: Logging level
+        """
+        snapshot = self.snapshot()
+        if snapshot:
+            text = " ".join(f"{k}={_format(v)}" for k, v in sorted(snapshot.items()))
+            logger.log(level, "Metrics: %s", text)
+
+
+def _format(value: Any) -> str:
+    """Format a metric value for logging."""
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return str(value)
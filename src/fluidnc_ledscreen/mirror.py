@@ -0,0 +1,266 @@
+"""Live mirror of the LED panel for remote viewers.
+
+The render loop hands every frame it pushes to the panel to a
+:class:`FrameMirror`, which only keeps a reference to the screen's frame
+buffer. The frame is encoded once, when a viewer is ready for it, and
+the same bytes go to every viewer. Frames are sent only when the panel
+changed, and a viewer whose connection has not drained the previous
+frame simply misses frames and gets the latest one later; nothing queues
+up behind a slow viewer.
+
+Frames are palette based: LED layouts use a handful of colors, so a
+frame is a small palette plus either one index byte per pixel or
+run-length encoded indices, whichever is shorter (raw RGB when a frame
+has more than 256 colors). A 64x32 status screen typically takes a few
+hundred bytes.
+
+Wire format (little endian), repeated for every frame::
+
+    magic "LM" | mode u8 | width u16 | height u16 | colors u16 | size u32
+    palette: colors x (r, g, b)
+    payload: size bytes; mode 0 raw RGB rows, 1 one index per pixel,
+             2 runs of (index u8, length u16)
+"""
+
+import asyncio
+import logging
+import struct
+from asyncio import StreamWriter
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+import numpy as np
+
+from fluidnc_ledscreen.dashboard import Request, respond
+from fluidnc_ledscreen.metrics import Metrics
+from fluidnc_ledscreen.runtime import spawn
+
+if TYPE_CHECKING:  # pragma: no cover - shared_state imports this module
+    from fluidnc_ledscreen.shared_state import StateSlot
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"LM"
+HEADER = struct.Struct("<2sBHHHI")
+
+MODE_RAW = 0
+MODE_INDEXED = 1
+MODE_RLE = 2
+
+_RUN = np.dtype([("index", "u1"), ("length", "<u2")])
+
+
+def max_frame_size(width: int, height: int) -> int:
+    """Get the largest encoded size of a frame.
+
+    Args:
+        width: Frame width in pixels
+        height: Frame height in pixels
+
+    Returns:
+        Size in bytes, e.g. for sizing a shared memory slot
+    """
+    return HEADER.size + max(width * height * 3, 256 * 3 + width * height)
+
+
+def encode_frame(frame: np.ndarray) -> bytes:
+    """Encode an RGB frame for the mirror stream.
+
+    Args:
+        frame: Frame of shape ``(height, width, 3)`` and dtype uint8
+
+    Returns:
+        Encoded frame including its header
+    """
+    height, width, _ = frame.shape
+    flat = frame.reshape(-1, 3)
+    packed = flat[:, 0].astype(np.uint32) << 16
+    packed |= flat[:, 1].astype(np.uint32) << 8
+    packed |= flat[:, 2]
+    colors, indices = np.unique(packed, return_inverse=True)
+    if len(colors) > 256:
+        payload = np.ascontiguousarray(frame).tobytes()
+        return HEADER.pack(MAGIC, MODE_RAW, width, height, 0, len(payload)) + payload
+
+    indices = indices.astype(np.uint8)
+    starts = np.flatnonzero(np.diff(indices)) + 1
+    starts = np.concatenate(([0], starts))
+    lengths = np.diff(np.append(starts, indices.size))
+    if len(starts) * _RUN.itemsize < indices.size and lengths.max() <= 0xFFFF:
+        runs = np.empty(len(starts), dtype=_RUN)
+        runs["index"] = indices[starts]
+        runs["length"] = lengths
+        mode, payload = MODE_RLE, runs.tobytes()
+    else:
+        mode, payload = MODE_INDEXED, indices.tobytes()
+    palette = np.empty((len(colors), 3), dtype=np.uint8)
+    palette[:, 0] = colors >> 16
+    palette[:, 1] = colors >> 8
+    palette[:, 2] = colors
+    header = HEADER.pack(MAGIC, mode, width, height, len(colors), len(payload))
+    return header + palette.tobytes() + payload
+
+
+class FrameMirror:
+    """Streams the panel contents to remote viewers.
+
+    Feed it with :meth:`on_frame` (the frame buffer of the screen, in the
+    rendering process) or :meth:`publish` (frames encoded elsewhere), and
+    serve viewers with :meth:`handle`, a dashboard route handler.
+
+    Attributes:
+        max_fps: Maximum frames per second sent to a viewer
+        max_viewers: Maximum concurrent viewers
+        slot: Slot to read encoded frames from, when another process renders
+        send_timeout: Seconds a viewer may take to accept a frame
+        metrics: Metrics registry
+    """
+
+    def __init__(
+        self,
+        max_fps: float = 10.0,
+        max_viewers: int = 8,
+        slot: Optional["StateSlot"] = None,
+        send_timeout: float = 10.0,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """Initialize the mirror.
+
+        Args:
+            max_fps: Maximum frames per second sent to a viewer
+            max_viewers: Maximum concurrent viewers
+            slot: Slot filled by :func:`~fluidnc_ledscreen.shared_state.render_main`
+                in two-process mode
+            send_timeout: Seconds a viewer may take to accept a frame
+                before it is disconnected
+            metrics: Metrics registry
+        """
+        self.max_fps = max_fps
+        self.max_viewers = max_viewers
+        self.slot = slot
+        self.send_timeout = send_timeout
+        self.metrics = metrics or Metrics()
+        self._frame: Optional[np.ndarray] = None
+        self._encoded: Optional[bytes] = None
+        self._version = 0
+        self._encoded_version = 0
+        self._viewers: Dict[asyncio.Event, Tuple[asyncio.Task, StreamWriter]] = {}
+        self._poll_task: Optional[asyncio.Task] = None
+        self._running = False
+
+    def start(self) -> None:
+        """Start accepting viewers (and following the slot, if any)."""
+        self._running = True
+        if self.slot is not None:
+            self._poll_task = spawn(self._follow_slot())
+
+    async def stop(self) -> None:
+        """Disconnect all viewers."""
+        self._running = False
+        if self._poll_task:
+            self._poll_task.cancel()
+            self._poll_task = None
+        viewers = list(self._viewers.items())
+        for changed, (_, writer) in viewers:
+            changed.set()
+            writer.close()
+        if viewers:
+            await asyncio.wait([task for _, (task, _) in viewers], timeout=2.0)
+
+    def on_frame(self, frame: np.ndarray) -> None:
+        """Note that the panel shows a new frame (render loop hot path).
+
+        Args:
+            frame: The screen's frame buffer; referenced, not copied, and
+                encoded on the same thread when a viewer needs it
+        """
+        self._frame = frame
+        self._version += 1
+        self._wake()
+
+    def publish(self, data: bytes) -> None:
+        """Set the latest frame from already encoded bytes.
+
+        Args:
+            data: Output of :func:`encode_frame`
+        """
+        self._frame = None
+        self._encoded = data
+        self._version += 1
+        self._encoded_version = self._version
+        self._wake()
+
+    def latest(self) -> Tuple[int, Optional[bytes]]:
+        """Get the latest frame, encoding it if needed.
+
+        Returns:
+            Frame version and encoded frame (None before the first frame)
+        """
+        if self._encoded_version != self._version and self._frame is not None:
+            self._encoded = encode_frame(self._frame)
+            self._encoded_version = self._version
+            self.metrics.inc("mirror_frames_encoded")
+            self.metrics.set("mirror_frame_bytes", len(self._encoded))
+        return self._encoded_version, self._encoded
+
+    def _wake(self) -> None:
+        """Wake the viewer streams."""
+        for changed in self._viewers:
+            changed.set()
+
+    async def _follow_slot(self) -> None:
+        """Publish frames written to the slot by the render process."""
+        interval = 1.0 / self.max_fps
+        while True:
+            data = self.slot.read()
+            if data is not None:
+                self.publish(data)
+            await asyncio.sleep(interval)
+
+    async def handle(self, request: Request, writer: StreamWriter) -> None:
+        """Stream frames to one viewer (dashboard route handler).
+
+        Args:
+            request: HTTP request
+            writer: Client stream
+        """
+        if not self._running or len(self._viewers) >= self.max_viewers:
+            await respond(writer, 503, "text/plain", b"Too many viewers\n")
+            return
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: application/octet-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        changed = asyncio.Event()
+        changed.set()
+        self._viewers[changed] = (asyncio.current_task(), writer)
+        self.metrics.set("mirror_viewers", len(self._viewers))
+        interval = 1.0 / self.max_fps if self.max_fps > 0 else 0.0
+        transport = writer.transport
+        sent = 0
+        try:
+            while self._running and not transport.is_closing():
+                await changed.wait()
+                changed.clear()
+                version, data = self.latest()
+                if data is None or version == sent:
+                    continue
+                if transport.get_write_buffer_size():
+                    # Still sending an older frame; skip to a later one
+                    self.metrics.inc("mirror_frames_dropped")
+                    await asyncio.wait_for(writer.drain(), self.send_timeout)
+                    changed.set()
+                    continue
+                writer.write(data)
+                sent = version
+                self.metrics.inc("mirror_frames_sent")
+                await asyncio.sleep(interval)
+        except ConnectionError:
+            pass
+        except asyncio.TimeoutError:
+            logger.info("Dropping stalled mirror viewer")
+            self.metrics.inc("mirror_slow_viewers")
+        finally:
+            del self._viewers[changed]
+            self.metrics.set("mirror_viewers", len(self._viewers))
@@ -0,0 +1,545 @@
+"""Persistent event outbox for machine notifications.
+
+State transitions detected in the parsed status stream (a machine going
+into ``Alarm``, leaving it, finishing a job) become events. The display
+path only appends an event to an in-memory queue; a writer task appends
+queued events to an append-only JSON-lines file in the state directory,
+and one delivery task per sink reads the file from its own persisted
+offset and hands events over in batches. A failed delivery is retried
+with exponential backoff, so a slow or dead target delays its own events
+and nothing else. Delivery is at-least-once: every event carries an
+``id`` that receivers can deduplicate on.
+
+Sinks: an HTTP webhook (JSON array per batch), an MQTT broker (one
+message per event on ``<topic>/<type>``, needs ``paho-mqtt``) and a
+directory receiving one JSON file per batch.
+"""
+
+import asyncio
+import configparser
+import json
+import logging
+import os
+import socket
+import time
+import urllib.request
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from fluidnc_ledscreen.config import state_path
+from fluidnc_ledscreen.metrics import Metrics
+
+try:
+    import paho.mqtt.publish as mqtt_publish
+except ImportError:  # pragma: no cover - MQTT is optional
+    mqtt_publish = None
+
+logger = logging.getLogger(__name__)
+
+EVENT_ALARM = "alarm"
+EVENT_ALARM_CLEARED = "alarm_cleared"
+EVENT_JOB_COMPLETE = "job_complete"
+
+# States a job passes through between starting and finishing
+JOB_STATES = ("Run", "Hold", "Door")
+
+# Compact JSON, one event per line
+SEPARATORS = (",", ":")
+
+# Type aliases
+Event = Dict[str, Any]
+
+
+class TransitionDetector:
+    """Turns parsed status messages into machine events.
+
+    A job starts when the machine enters ``Run`` and completes when it
+    returns to ``Idle`` without an alarm in between; holds and door
+    openings belong to the job. Jogging is not a job.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the detector."""
+        self.state: Optional[str] = None
+        self._job_started: Optional[float] = None
+
+    def feed(self, message: Dict[str, Any], now: Optional[float] = None) -> List[Event]:
+        """Check a parsed message for transitions.
+
+        Args:
+            message: Output of :class:`~fluidnc_ledscreen.status.StatusParser`
+            now: Wall clock time in seconds (default: current time)
+
+        Returns:
+            Events for the transitions, usually none
+        """
+        state = message.get("state")
+        if not state or state == self.state:
+            return []
+        now = time.time() if now is None else now
+        previous, self.state = self.state, state
+        events: List[Event] = []
+        if state == "Alarm":
+            event: Event = {"type": EVENT_ALARM, "previous": previous}
+            if message.get("alarm"):
+                event["alarm"] = message["alarm"]
+            if self._job_started is not None:
+                event["job_seconds"] = round(now - self._job_started, 1)
+            events.append(event)
+            self._job_started = None
+        elif previous == "Alarm":
+            events.append({"type": EVENT_ALARM_CLEARED})
+        if state == "Run" and self._job_started is None:
+            self._job_started = now
+        elif state not in JOB_STATES and self._job_started is not None:
+            if state == "Idle":
+                seconds = round(now - self._job_started, 1)
+                events.append({"type": EVENT_JOB_COMPLETE, "job_seconds": seconds})
+            self._job_started = None
+        for event in events:
+            event["state"] = state
+        return events
+
+
+class WebhookSink:
+    """POSTs each batch as a JSON array to an HTTP endpoint.
+
+    Attributes:
+        name: Sink name (also names its offset file)
+        url: Endpoint URL
+        timeout: Seconds before a request is abandoned
+    """
+
+    def __init__(self, url: str, timeout: float = 10.0) -> None:
+        """Initialize the sink.
+
+        Args:
+            url: Endpoint URL
+            timeout: Seconds before a request is abandoned
+        """
+        self.name = "webhook"
+        self.url = url
+        self.timeout = timeout
+
+    async def send(self, events: List[Event]) -> None:
+        """Deliver a batch.
+
+        Args:
+            events: Events to deliver
+
+        Raises:
+            OSError: If the request fails or is answered with an error
+        """
+        await asyncio.to_thread(self._post, json.dumps(events).encode())
+
+    def _post(self, body: bytes) -> None:
+        """Send the request (worker thread)."""
+        request = urllib.request.Request(
+            self.url,
+            data=body,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        # The URL comes from the operator's configuration
+        opened = urllib.request.urlopen(request, timeout=self.timeout)  # nosec B310
+        with opened as reply:
+            reply.read()
+
+
+class MqttSink:
+    """Publishes each event to an MQTT broker with QoS 1.
+
+    Attributes:
+        name: Sink name (also names its offset file)
+        host: Broker host
+        port: Broker port
+        topic: Topic prefix; events go to ``<topic>/<type>``
+        timeout: Seconds before a connection attempt is abandoned
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 1883,
+        topic: str = "fluidnc",
+        timeout: float = 10.0,
+    ) -> None:
+        """Initialize the sink.
+
+        Args:
+            host: Broker host
+            port: Broker port
+            topic: Topic prefix
+            timeout: Seconds before a connection attempt is abandoned
+
+        Raises:
+            RuntimeError: If ``paho-mqtt`` is not installed
+        """
+        if mqtt_publish is None:
+            raise RuntimeError("the MQTT sink needs paho-mqtt")
+        self.name = "mqtt"
+        self.host = host
+        self.port = port
+        self.topic = topic.rstrip("/")
+        self.timeout = timeout
+
+    async def send(self, events: List[Event]) -> None:
+        """Deliver a batch.
+
+        Args:
+            events: Events to deliver
+
+        Raises:
+            OSError: If the broker cannot be reached
+        """
+        messages = [
+            {
+                "topic": f"{self.topic}/{event['type']}",
+                "payload": json.dumps(event),
+                "qos": 1,
+            }
+            for event in events
+        ]
+        await asyncio.to_thread(
+            mqtt_publish.multiple,
+            messages,
+            hostname=self.host,
+            port=self.port,
+            keepalive=int(self.timeout),
+        )
+
+
+class FileSink:
+    """Drops each batch as a JSON file into a directory.
+
+    Files are named after the first event of the batch, so a retried
+    batch overwrites its earlier copy.
+
+    Attributes:
+        name: Sink name (also names its offset file)
+        directory: Target directory
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Initialize the sink.
+
+        Args:
+            directory: Target directory
+        """
+        self.name = "file"
+        self.directory = directory
+
+    async def send(self, events: List[Event]) -> None:
+        """Deliver a batch.
+
+        Args:
+            events: Events to deliver
+
+        Raises:
+            OSError: If the file cannot be written
+        """
+        await asyncio.to_thread(self._write, events)
+
+    def _write(self, events: List[Event]) -> None:
+        """Write the batch file (worker thread)."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{events[0]['id']}.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(events, f)
+        os.replace(tmp, path)
+
+
+class Outbox:
+    """Append-only event queue with asynchronous batched delivery.
+
+    :meth:`observe` and :meth:`publish` run on the display path and only
+    touch memory; :meth:`run` writes and delivers in the background.
+
+    Attributes:
+        sinks: Delivery targets
+        directory: Directory holding the queue file and sink offsets
+        source: Origin recorded in every event (default: host name)
+        batch_size: Most events per delivery
+        backoff: Seconds before the first retry
+        max_backoff: Longest delay between retries
+        max_pending: Events kept in memory while the disk is slow; older
+            ones are dropped beyond that
+        compact_bytes: Queue size above which a fully delivered queue is
+            truncated
+        metrics: Metrics registry
+    """
+
+    def __init__(
+        self,
+        sinks: List[Any],
+        directory: Optional[str] = None,
+        source: Optional[str] = None,
+        batch_size: int = 20,
+        backoff: float = 1.0,
+        max_backoff: float = 300.0,
+        max_pending: int = 1000,
+        compact_bytes: int = 65536,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """Initialize the outbox.
+
+        Args:
+            sinks: Delivery targets
+            directory: Queue directory (default: ``outbox`` in the state
+                directory)
+            source: Origin recorded in every event (default: host name)
+            batch_size: Most events per delivery
+            backoff: Seconds before the first retry
+            max_backoff: Longest delay between retries
+            max_pending: Events kept in memory while the disk is slow
+            compact_bytes: Queue size above which a fully delivered queue
+                is truncated
+            metrics: Metrics registry
+        """
+        self.sinks = sinks
+        self.directory = directory or state_path("outbox")
+        self.source = source or socket.gethostname()
+        self.batch_size = max(1, batch_size)
+        self.backoff = backoff
+        self.max_backoff = max(max_backoff, backoff)
+        self.max_pending = max_pending
+        self.compact_bytes = compact_bytes
+        self.metrics = metrics or Metrics()
+        self.detector = TransitionDetector()
+        self.path = os.path.join(self.directory, "events.jsonl")
+        self._incoming: Deque[Event] = deque()
+        self._written = asyncio.Event()
+        self._queued = asyncio.Event()
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        self._offsets: Dict[str, int] = {}
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_config(cls, section: configparser.SectionProxy) -> Optional["Outbox"]:
+        """Build an outbox from a config section.
+
+        Args:
+            section: Config section (e.g. ``[Outbox]``)
+
+        Returns:
+            Outbox, or None if disabled or no sink is configured
+        """
+        if not section.getboolean("enabled", False):
+            return None
+        timeout = section.getfloat("timeout", 10.0)
+        sinks: List[Any] = []
+        if section.get("webhook_url", "").strip():
+            sinks.append(WebhookSink(section.get("webhook_url").strip(), timeout))
+        if section.get("mqtt_host", "").strip():
+            try:
+                sinks.append(
+                    MqttSink(
+                        section.get("mqtt_host").strip(),
+                        section.getint("mqtt_port", 1883),
+                        section.get("mqtt_topic", "fluidnc"),
+                        timeout,
+                    )
+                )
+            except RuntimeError as e:
+                logger.error("MQTT notifications disabled: %s", str(e))
+        if section.get("file_dir", "").strip():
+            sinks.append(FileSink(section.get("file_dir").strip()))
+        if not sinks:
+            logger.warning("Outbox enabled without a webhook, MQTT broker or file_dir")
+            return None
+        return cls(
+            sinks,
+            source=section.get("source", "").strip() or None,
+            batch_size=section.getint("batch_size", 20),
+            backoff=section.getfloat("retry_backoff", 1.0),
+            max_backoff=section.getfloat("max_retry_backoff", 300.0),
+        )
+
+    def observe(self, message: Dict[str, Any]) -> None:
+        """Publish events for the transitions in a parsed message.
+
+        Args:
+            message: Output of :class:`~fluidnc_ledscreen.status.StatusParser`
+        """
+        if "state" not in message:
+            return
+        for event in self.detector.feed(message):
+            self.publish(event)
+
+    def publish(self, event: Event) -> None:
+        """Queue an event for delivery (display path: memory only).
+
+        Args:
+            event: Event with at least a ``type``
+        """
+        event = {
+            "id": uuid.uuid4().hex,
+            "time": time.time(),
+            "source": self.source,
+            **event,
+        }
+        if len(self._incoming) >= self.max_pending:
+            self._incoming.popleft()
+            self.metrics.inc("outbox_dropped")
+        self._incoming.append(event)
+        self.metrics.inc("outbox_events")
+        self._queued.set()
+        logger.info("Event %s queued", event["type"])
+
+    async def run(self) -> None:
+        """Write queued events and deliver them until cancelled."""
+        await asyncio.to_thread(os.makedirs, self.directory, exist_ok=True)
+        for sink in self.sinks:
+            offset = await asyncio.to_thread(self._load_offset, sink.name)
+            self._offsets[sink.name] = offset
+            self._wakeups[sink.name] = asyncio.Event()
+        deliveries = [self._deliver(sink) for sink in self.sinks]
+        await asyncio.gather(self._write_loop(), *deliveries)
+
+    async def _write_loop(self) -> None:
+        """Append queued events to the queue file."""
+        while True:
+            await self._queued.wait()
+            self._queued.clear()
+            batch = list(self._incoming)
+            self._incoming.clear()
+            async with self._lock:
+                await asyncio.to_thread(self._append, batch)
+            for wakeup in self._wakeups.values():
+                wakeup.set()
+
+    async def _deliver(self, sink: Any) -> None:
+        """Deliver events to one sink, retrying with backoff.
+
+        Args:
+            sink: Delivery target
+        """
+        delay = self.backoff
+        wakeup = self._wakeups[sink.name]
+        while True:
+            wakeup.clear()
+            async with self._lock:
+                offset = self._offsets[sink.name]
+                events, end = await asyncio.to_thread(self._read, offset)
+            if not events:
+                if end != offset:
+                    await self._advance(sink.name, end)
+                await wakeup.wait()
+                continue
+            try:
+                await sink.send(events)
+            except Exception as e:
+                logger.warning(
+                    "Delivering %d events to %s failed, retrying in %.1f s: %s",
+                    len(events),
+                    sink.name,
+                    delay,
+                    str(e) or repr(e),
+                )
+                self.metrics.inc("outbox_failures")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+                continue
+            delay = self.backoff
+            self.metrics.inc("outbox_delivered", len(events))
+            await self._advance(sink.name, end)
+
+    async def _advance(self, name: str, offset: int) -> None:
+        """Persist a sink's offset; truncate the queue once fully delivered.
+
+        Args:
+            name: Sink name
+            offset: Offset of the first undelivered byte
+        """
+        async with self._lock:
+            self._offsets[name] = offset
+            size = await asyncio.to_thread(_size, self.path)
+            delivered = all(o >= size for o in self._offsets.values())
+            if delivered and size > self.compact_bytes:
+                await asyncio.to_thread(self._truncate)
+                for sink in self._offsets:
+                    self._offsets[sink] = 0
+                    await asyncio.to_thread(self._save_offset, sink, 0)
+            else:
+                await asyncio.to_thread(self._save_offset, name, offset)
+            pending = max(0, size - min(self._offsets.values()))
+        self.metrics.set("outbox_pending_bytes", pending)
+
+    def _append(self, events: List[Event]) -> None:
+        """Append events to the queue file (worker thread)."""
+        lines = [json.dumps(event, separators=SEPARATORS) + "\n" for event in events]
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            logger.error("Failed to append to outbox %s: %s", self.path, str(e))
+            self.metrics.inc("outbox_dropped", len(events))
+
+    def _read(self, offset: int) -> Tuple[List[Event], int]:
+        """Read up to a batch of complete events (worker thread).
+
+        Args:
+            offset: Byte offset to start at
+
+        Returns:
+            Events and the offset after the last line read
+        """
+        events: List[Event] = []
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                while len(events) < self.batch_size:
+                    line = f.readline()
+                    if not line.endswith(b"\n"):
+                        # Not written completely (yet)
+                        break
+                    offset += len(line)
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        logger.warning("Skipping corrupt outbox entry at %d", offset)
+        except FileNotFoundError:
+            pass
+        return events, offset
+
+    def _truncate(self) -> None:
+        """Empty the fully delivered queue file (worker thread)."""
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+
+    def _offset_path(self, name: str) -> str:
+        """Get the offset file of a sink."""
+        return os.path.join(self.directory, f"{name}.offset")
+
+    def _load_offset(self, name: str) -> int:
+        """Read a sink's persisted offset (worker thread)."""
+        try:
+            with open(self._offset_path(name), encoding="utf-8") as f:
+                offset = int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+        # A queue truncated behind the sink's back starts over
+        return offset if offset <= _size(self.path) else 0
+
+    def _save_offset(self, name: str, offset: int) -> None:
+        """Persist a sink's offset (worker thread)."""
+        path = self._offset_path(name)
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(str(offset))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("Failed to save outbox offset %s: %s", path, str(e))
+
+
+def _size(path: str) -> int:
+    """Get a file's size, 0 if missing."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
@@ -0,0 +1,162 @@
+"""Logical canvas to physical HUB75 chain mapping.
+
+Chained or tiled panels are driven as one long physical chain, while the
+layout draws on a logical canvas shaped like the mounted display. The
+mapping between the two (chain order, serpentine wiring, per-panel and
+whole-display rotation) is precomputed once as a NumPy index permutation,
+so remapping a frame is a single vectorized ``np.take``.
+"""
+
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ORDERS = ("row-major", "serpentine")
+ROTATIONS = (0, 90, 180, 270)
+
+
+class PanelMap:
+    """Mapping from a logical canvas to the physical panel chain.
+
+    Panels are numbered in chain order starting at the panel nearest the
+    driver. With ``row-major`` order the chain runs left to right along
+    each row of panels, top row first. With ``serpentine`` order every
+    other row runs right to left and its panels are mounted upside down,
+    as is usual when the ribbon cables snake down the display.
+
+    Attributes:
+        panel_width: Width of a single panel in pixels
+        panel_height: Height of a single panel in pixels
+        cols: Number of panel columns
+        rows: Number of panel rows
+        width: Logical canvas width in pixels
+        height: Logical canvas height in pixels
+        physical_shape: Shape of the physical frame buffer
+        identity: Whether the mapping is a no-op
+    """
+
+    def __init__(
+        self,
+        panel_width: int = 64,
+        panel_height: int = 32,
+        cols: int = 1,
+        rows: int = 1,
+        order: str = "row-major",
+        panel_rotation: int = 0,
+        rotation: int = 0,
+    ) -> None:
+        """Initialize the mapping.
+
+        Args:
+            panel_width: Width of a single panel in pixels
+            panel_height: Height of a single panel in pixels
+            cols: Number of panel columns
+            rows: Number of panel rows
+            order: Chain order, ``row-major`` or ``serpentine``
+            panel_rotation: Clockwise rotation of every panel in degrees
+            rotation: Clockwise rotation of the whole display in degrees
+
+        Raises:
+            ValueError: If the arrangement is not supported
+        """
+        if order not in ORDERS:
+            raise ValueError(f"Unknown panel order: {order}")
+        if panel_rotation not in ROTATIONS or rotation not in ROTATIONS:
+            raise ValueError("Rotations must be 0, 90, 180 or 270 degrees")
+        if cols < 1 or rows < 1:
+            raise ValueError("Panel grid must have at least one row and column")
+
+        self.panel_width = panel_width
+        self.panel_height = panel_height
+        self.cols = cols
+        self.rows = rows
+
+        # Size of one panel as seen on the mounted display
+        if panel_rotation in (90, 270):
+            tile_w, tile_h = panel_height, panel_width
+        else:
+            tile_w, tile_h = panel_width, panel_height
+        mounted_w, mounted_h = cols * tile_w, rows * tile_h
+
+        # Logical canvas as the layout sees it
+        if rotation in (90, 270):
+            self.width, self.height = mounted_h, mounted_w
+        else:
+            self.width, self.height = mounted_w, mounted_h
+
+        self.physical_shape = (panel_height, panel_width * cols * rows, 3)
+        self._index = self._build_index(tile_w, tile_h, order, panel_rotation, rotation)
+        self.identity = bool(
+            self._index.shape == (self.height, self.width)
+            and np.array_equal(self._index.ravel(), np.arange(self._index.size))
+        )
+
+    def _build_index(
+        self,
+        tile_w: int,
+        tile_h: int,
+        order: str,
+        panel_rotation: int,
+        rotation: int,
+    ) -> np.ndarray:
+        """Precompute the physical-to-logical pixel index.
+
+        Args:
+            tile_w: Mounted panel width in pixels
+            tile_h: Mounted panel height in pixels
+            order: Chain order
+            panel_rotation: Clockwise panel rotation in degrees
+            rotation: Clockwise display rotation in degrees
+
+        Returns:
+            Array of shape ``(panel_height, chain_width)`` holding, for each
+            physical pixel, the flat index of its logical canvas pixel
+        """
+        logical = np.arange(self.width * self.height, dtype=np.intp)
+        logical = logical.reshape(self.height, self.width)
+        # np.rot90 rotates counter-clockwise; turn the canvas back into the
+        # orientation of the mounted panels.
+        mounted = np.rot90(logical, k=rotation // 90)
+
+        physical = np.empty(self.physical_shape[:2], dtype=np.intp)
+        for chain_pos in range(self.cols * self.rows):
+            row, col = divmod(chain_pos, self.cols)
+            turns = panel_rotation // 90
+            if order == "serpentine" and row % 2:
+                col = self.cols - 1 - col
+                turns += 2
+            tile_rows = slice(row * tile_h, (row + 1) * tile_h)
+            tile_cols = slice(col * tile_w, (col + 1) * tile_w)
+            tile = mounted[tile_rows, tile_cols]
+            x0 = chain_pos * self.panel_width
+            chain_cols = slice(x0, x0 + self.panel_width)
+            physical[:, chain_cols] = np.rot90(tile, k=turns % 4)
+        return physical
+
+    def apply(self, frame: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Remap a logical frame into physical chain order.
+
+        Args:
+            frame: Logical RGB frame of shape ``(height, width, 3)``
+            out: Physical frame buffer to write into (allocated if None)
+
+        Returns:
+            Physical RGB frame of shape :attr:`physical_shape`
+        """
+        if out is None:
+            out = np.empty(self.physical_shape, dtype=frame.dtype)
+        np.take(frame.reshape(-1, frame.shape[-1]), self._index, axis=0, out=out)
+        return out
+
+    @property
+    def addr_lines(self) -> int:
+        """Number of HUB75 address lines for the panel height."""
+        return max(1, int(self.panel_height // 2).bit_length() - 1)
+
+    @property
+    def chain_size(self) -> Tuple[int, int]:
+        """Physical chain size as ``(width, height)`` in pixels."""
+        return self.physical_shape[1], self.physical_shape[0]
@@ -0,0 +1,235 @@
+"""Built-in sampling profiler for live diagnosis.
+
+Started and stopped at runtime (SIGUSR1/SIGUSR2), so render stalls can be
+profiled on a running panel without restarting it or attaching external
+tools. A daemon thread samples the Python stack of every other thread at
+a fixed interval and counts identical stacks; on stop the counts are
+written in the collapsed-stack format understood by ``flamegraph.pl``
+and speedscope.
+
+While a session runs, asyncio debug mode is enabled on the owning loop
+so callbacks slower than ``slow_callback`` seconds are reported. Debug
+mode has a real cost and stays off outside profiling sessions. A text
+report next to the profile holds the slow callbacks and the state and
+stack of every task at the start and end of the session.
+"""
+
+import asyncio
+import io
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Dict, List, Optional, Tuple
+
+from fluidnc_ledscreen.config import DEFAULT_LOG_DIR
+
+logger = logging.getLogger(__name__)
+
+
+class _RecordCollector(logging.Handler):
+    """Keeps the slow-callback warnings asyncio logs in debug mode."""
+
+    def __init__(self) -> None:
+        """Initialize an empty collector."""
+        super().__init__(logging.WARNING)
+        self.lines: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Store a formatted record."""
+        self.lines.append(f"{record.created:.3f} {record.getMessage()}")
+
+
+class SamplingProfiler:
+    """Statistical profiler writing collapsed stacks.
+
+    Attributes:
+        out_dir: Directory receiving profiles and reports
+        interval: Seconds between samples
+        slow_callback: asyncio slow-callback threshold in seconds
+    """
+
+    def __init__(
+        self,
+        out_dir: Optional[str] = None,
+        interval: float = 0.005,
+        slow_callback: float = 0.05,
+    ) -> None:
+        """Initialize the profiler.
+
+        Args:
+            out_dir: Output directory (default: ``FLUIDNC_LOG_DIR`` or
+                ``logs``)
+            interval: Seconds between samples
+            slow_callback: asyncio slow-callback threshold in seconds
+        """
+        self.out_dir = out_dir or DEFAULT_LOG_DIR
+        self.interval = interval
+        self.slow_callback = slow_callback
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._counts: Counter = Counter()
+        self._labels: Dict[CodeType, str] = {}
+        self._samples = 0
+        self._started = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_debug: Tuple[bool, float] = (False, 0.1)
+        self._collector: Optional[_RecordCollector] = None
+        self._report = io.StringIO()
+
+    @property
+    def running(self) -> bool:
+        """Whether a profiling session is active."""
+        return self._thread is not None
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Start a profiling session.
+
+        Args:
+            loop: Event loop to watch for slow callbacks and tasks
+        """
+        if self.running:
+            logger.info("Profiler already running")
+            return
+        self._counts.clear()
+        self._samples = 0
+        self._started = time.time()
+        self._report = io.StringIO()
+        self._loop = loop
+        if loop is not None:
+            self._dump_tasks("start", loop)
+            self._loop_debug = (loop.get_debug(), loop.slow_callback_duration)
+            loop.slow_callback_duration = self.slow_callback
+            loop.set_debug(True)
+            self._collector = _RecordCollector()
+            logging.getLogger("asyncio").addHandler(self._collector)
+        self._stop.clear()
+        thread = threading.Thread(target=self._sample, name="profiler", daemon=True)
+        self._thread = thread
+        thread.start()
+        logger.info("Profiler started (%.0f Hz)", 1 / self.interval)
+
+    def stop(self) -> Optional[str]:
+        """Stop the session and write its output.
+
+        Returns:
+            Path of the collapsed-stack file, or None if not running
+        """
+        if not self.running:
+            logger.info("Profiler not running")
+            return None
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        loop, self._loop = self._loop, None
+        if loop is not None:
+            debug, duration = self._loop_debug
+            loop.set_debug(debug)
+            loop.slow_callback_duration = duration
+            logging.getLogger("asyncio").removeHandler(self._collector)
+            threshold_ms = self.slow_callback * 1000
+            self._report.write(f"== slow callbacks (> {threshold_ms:.0f} ms)\n")
+            for line in self._collector.lines:
+                self._report.write(line + "\n")
+            self._report.write("\n")
+            self._collector = None
+            self._dump_tasks("stop", loop)
+        return self._write()
+
+    def _sample(self) -> None:
+        """Sample all other threads until stopped (profiler thread)."""
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                name = names.get(ident)
+                if name is None:
+                    name = _thread_name(ident)
+                    names[ident] = name
+                self._counts[self._collapse(name, frame)] += 1
+            self._samples += 1
+
+    def _collapse(self, thread: str, frame: Optional[FrameType]) -> str:
+        """Turn a stack into a ``root;...;leaf`` line.
+
+        Args:
+            thread: Thread name used as the root frame
+            frame: Innermost frame
+
+        Returns:
+            Collapsed stack
+        """
+        labels = self._labels
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            label = labels.get(code)
+            if label is None:
+                module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                label = f"{module}.{code.co_name}".replace(";", ":")
+                labels[code] = label
+            stack.append(label)
+            frame = frame.f_back
+        stack.append(thread)
+        stack.reverse()
+        return ";".join(stack)
+
+    def _dump_tasks(self, when: str, loop: asyncio.AbstractEventLoop) -> None:
+        """Append the state and stack of every task to the report.
+
+        Args:
+            when: Label for the dump (``start`` or ``stop``)
+            loop: Event loop owning the tasks
+        """
+        tasks = asyncio.all_tasks(loop)
+        self._report.write(f"== tasks at {when} ({len(tasks)})\n")
+        for task in sorted(tasks, key=lambda t: t.get_name()):
+            if task.cancelled():
+                state = "cancelled"
+            elif task.done():
+                state = "done"
+            else:
+                state = "cancelling" if task.cancelling() else "pending"
+            self._report.write(f"{task.get_name()} [{state}] {task.get_coro()!r}\n")
+            for frame in task.get_stack(limit=8):
+                code = frame.f_code
+                where = f"{code.co_filename}:{frame.f_lineno}"
+                self._report.write(f"    {where} in {code.co_name}\n")
+        self._report.write("\n")
+
+    def _write(self) -> str:
+        """Write the collapsed stacks and the report.
+
+        Returns:
+            Path of the collapsed-stack file
+        """
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self._started))
+        base = os.path.join(self.out_dir, f"profile-{os.getpid()}-{stamp}")
+        os.makedirs(self.out_dir, exist_ok=True)
+        with open(base + ".folded", "w", encoding="utf-8") as f:
+            for stack, count in self._counts.most_common():
+                f.write(f"{stack} {count}\n")
+        elapsed = time.time() - self._started
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(f"{self._samples} samples over {elapsed:.1f} s\n\n")
+            f.write(self._report.getvalue())
+        logger.info(
+            "Profiler stopped after %d samples, wrote %s.folded and %s.txt",
+            self._samples,
+            base,
+            base,
+        )
+        return base + ".folded"
+
+
+def _thread_name(ident: int) -> str:
+    """Get the name of a thread by identifier."""
+    for thread in threading.enumerate():
+        if thread.ident == ident:
+            return thread.name
+    return f"thread-{ident}"
@@ -0,0 +1,230 @@
+"""Status report scheduling for FluidNC.
+
+FluidNC can push status reports on its own (``$Report/Interval``), only
+sending a report when something changed and at most once per interval.
+This module enables that stream where the firmware supports it and falls
+back to polling with ``?`` otherwise. A watchdog probes quiet streams so
+an idle machine and a dead stream can be told apart.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fluidnc_ledscreen.metrics import Metrics
+from fluidnc_ledscreen.runtime import Supervisor, spawn
+
+logger = logging.getLogger(__name__)
+
+# Type aliases
+SendCallback = Callable[[str], Awaitable[None]]
+
+MODE_AUTO = "auto"
+MODE_EVENT = "event"
+MODE_POLL = "poll"
+MODES = (MODE_AUTO, MODE_EVENT, MODE_POLL)
+
+
+class StatusReporter:
+    """Keeps status reports flowing from one FluidNC connection.
+
+    In ``auto`` mode the reporter asks the firmware for automatic reports
+    and falls back to polling if the setting is rejected or the stream
+    goes stale. ``event`` keeps re-arming the stream instead of falling
+    back, and ``poll`` always polls.
+
+    Attributes:
+        mode: Configured reporting mode
+        active_mode: Mode currently in effect (``event`` or ``poll``)
+    """
+
+    def __init__(
+        self,
+        send: SendCallback,
+        mode: str = MODE_AUTO,
+        report_interval: float = 0.2,
+        poll_interval: float = 0.5,
+        probe_timeout: float = 2.0,
+        quiet_timeout: float = 5.0,
+        metrics: Optional[Metrics] = None,
+        supervisor: Optional[Supervisor] = None,
+    ) -> None:
+        """Initialize the reporter.
+
+        Args:
+            send: Coroutine function sending one line to the controller
+            mode: ``auto``, ``event`` or ``poll``
+            report_interval: Automatic report interval in seconds
+            poll_interval: Polling interval in seconds
+            probe_timeout: Time to wait for a reply to a command or probe
+            quiet_timeout: Silence after which a stream is probed with ``?``
+            metrics: Metrics registry
+            supervisor: Runs reporting as the ``reporter`` service, so a
+                failure restarts it instead of ending it for the rest of
+                the connection (default: a plain task)
+
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown reporting mode: {mode}")
+        self.mode = mode
+        self.active_mode = MODE_POLL
+        self.send = send
+        self.report_interval = report_interval
+        self.poll_interval = poll_interval
+        self.probe_timeout = probe_timeout
+        self.quiet_timeout = max(quiet_timeout, report_interval * 2)
+        self.metrics = metrics or Metrics()
+        self.supervisor = supervisor
+        self._task: Optional[asyncio.Task] = None
+        self._report = asyncio.Event()
+        self._reply = asyncio.Event()
+        self._reply_ok = False
+        self._last_report = 0.0
+        self._reports = 0
+        self._rate_reports = 0
+        self._rate_time = 0.0
+
+    def start(self) -> None:
+        """Start (or restart) reporting on a freshly connected controller."""
+        self.stop()
+        self._last_report = time.monotonic()
+        if self.supervisor:
+            self.supervisor.add("reporter", self._run)
+        else:
+            self._task = spawn(self._run())
+
+    def stop(self) -> None:
+        """Stop reporting, e.g. when the connection is lost."""
+        if self.supervisor:
+            self.supervisor.remove("reporter")
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def observe(self, message: Dict[str, Any]) -> None:
+        """Feed a parsed protocol line to the reporter.
+
+        Args:
+            message: Output of :class:`~fluidnc_ledscreen.status.StatusParser`
+        """
+        kind = message.get("type")
+        if kind == "status":
+            self._last_report = time.monotonic()
+            self._reports += 1
+            self.metrics.inc("status_reports")
+            self._report.set()
+        elif kind in ("ok", "error"):
+            self._reply_ok = kind == "ok"
+            self._reply.set()
+
+    async def _run(self) -> None:
+        """Drive the configured reporting mode until cancelled."""
+        self._rate_time = time.monotonic()
+        self._rate_reports = self._reports
+        try:
+            while True:
+                if self.mode != MODE_POLL and await self._enable_stream():
+                    self._set_mode(MODE_EVENT)
+                    await self._watch_stream()
+                    if self.mode == MODE_EVENT:
+                        continue
+                    logger.warning("Status stream stale, falling back to polling")
+                    await self._disable_stream()
+                self._set_mode(MODE_POLL)
+                await self._poll()
+        except asyncio.CancelledError:
+            raise
+        except (ConnectionError, OSError) as e:
+            logger.error("Status reporting stopped: %s", str(e))
+
+    async def _command(self, line: str) -> bool:
+        """Send a command and wait for its ``ok``/``error`` reply.
+
+        Args:
+            line: Command line
+
+        Returns:
+            True if the controller answered ``ok`` in time
+        """
+        self._reply.clear()
+        await self.send(line)
+        try:
+            await asyncio.wait_for(self._reply.wait(), self.probe_timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self._reply_ok
+
+    async def _enable_stream(self) -> bool:
+        """Ask the firmware for automatic status reports.
+
+        Returns:
+            True if the firmware accepted the setting
+        """
+        interval_ms = int(self.report_interval * 1000)
+        if await self._command(f"$Report/Interval={interval_ms}"):
+            logger.info("Automatic status reports enabled every %d ms", interval_ms)
+            # Prime the display; the stream only reports changes
+            await self.send("?")
+            return True
+        logger.info("Automatic status reports not supported, polling instead")
+        return False
+
+    async def _disable_stream(self) -> None:
+        """Turn automatic reports off before polling (best effort).
+
+        A stream that comes back would otherwise arrive on top of the
+        polled reports.
+        """
+        if not await self._command("$Report/Interval=0"):
+            logger.info("Could not turn automatic status reports off")
+
+    async def _watch_stream(self) -> None:
+        """Watch an automatic report stream until it goes stale.
+
+        A quiet stream is normal on an idle machine, so silence only
+        triggers a ``?`` probe; the stream counts as stale when the probe
+        is not answered either.
+        """
+        while True:
+            await asyncio.sleep(self.quiet_timeout / 2)
+            now = time.monotonic()
+            self._update_rate(now)
+            if now - self._last_report < self.quiet_timeout:
+                continue
+            self.metrics.inc("status_probes")
+            self._report.clear()
+            await self.send("?")
+            try:
+                await asyncio.wait_for(self._report.wait(), self.probe_timeout)
+            except asyncio.TimeoutError:
+                self.metrics.inc("status_stream_stale")
+                return
+
+    async def _poll(self) -> None:
+        """Poll for status reports until cancelled."""
+        while True:
+            await self.send("?")
+            await asyncio.sleep(self.poll_interval)
+            self._update_rate(time.monotonic())
+
+    def _set_mode(self, mode: str) -> None:
+        """Record the reporting mode in effect."""
+        self.active_mode = mode
+        self.metrics.set("status_mode", mode)
+
+    def _update_rate(self, now: float) -> None:
+        """Publish the effective report rate over the last second or more.
+
+        Args:
+            now: Monotonic time in seconds
+        """
+        elapsed = now - self._rate_time
+        if elapsed < 1.0:
+            return
+        rate = (self._reports - self._rate_reports) / elapsed
+        self.metrics.set("status_report_rate_hz", rate)
+        self._rate_time = now
+        self._rate_reports = self._reports
@@ -0,0 +1,311 @@
+"""Supervised asyncio runtime.
+
+The application runs as one process on one event loop. Long-lived parts
+(the controller connection, the render loop, metrics, the loop-lag
+probe) run as named services under a :class:`Supervisor`: a service that
+raises is logged and restarted after an exponential backoff, and
+shutdown cancels the services in reverse start order and waits for each
+to finish. Short-lived tasks that components start on their own
+(readers, pollers, probes) go through :func:`spawn`, so their exceptions
+are logged when they happen instead of vanishing with the task.
+
+:func:`run` runs the main coroutine on uvloop when it is installed (or
+requested) and on the standard asyncio loop otherwise.
+:class:`LoopLagMonitor` measures how late the loop wakes up, which is
+the delay every callback on it sees.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Coroutine, Dict, List, Optional
+
+from fluidnc_ledscreen.metrics import Metrics
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - the asyncio loop is the fallback
+    uvloop = None
+
+logger = logging.getLogger(__name__)
+
+LOOP_AUTO = "auto"
+LOOP_ASYNCIO = "asyncio"
+LOOP_UVLOOP = "uvloop"
+
+# Restart policies
+RESTART_ALWAYS = "always"
+RESTART_ON_FAILURE = "on-failure"
+RESTART_NEVER = "never"
+
+# Type aliases
+ServiceFactory = Callable[[], Awaitable[None]]
+
+
+def run(main: Coroutine[Any, Any, Any], loop: str = LOOP_AUTO) -> Any:
+    """Run a coroutine on a new event loop.
+
+    Args:
+        main: Coroutine to run
+        loop: ``auto`` (uvloop if installed), ``uvloop`` or ``asyncio``
+
+    Returns:
+        Result of the coroutine
+    """
+    factory = None
+    if loop != LOOP_ASYNCIO:
+        if uvloop is not None:
+            factory = uvloop.new_event_loop
+        elif loop == LOOP_UVLOOP:
+            logger.warning("uvloop is not installed, using the asyncio event loop")
+    with asyncio.Runner(loop_factory=factory) as runner:
+        logger.info("Event loop: %s", LOOP_UVLOOP if factory else LOOP_ASYNCIO)
+        return runner.run(main)
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    """Log the exception of a finished task, if any."""
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        logger.error(
+            "Task %s failed: %s",
+            task.get_name(),
+            error,
+            exc_info=(type(error), error, error.__traceback__),
+        )
+
+
+def spawn(coro: Coroutine[Any, Any, Any], name: Optional[str] = None) -> asyncio.Task:
+    """Start a task whose exception is logged as soon as it fails.
+
+    The caller keeps the returned task (the loop only holds tasks
+    weakly) and cancels it when done.
+
+    Args:
+        coro: Coroutine to run
+        name: Task name for logs (default: the coroutine's name)
+
+    Returns:
+        Started task
+    """
+    task = asyncio.create_task(coro, name=name or coro.__qualname__)
+    task.add_done_callback(_log_failure)
+    return task
+
+
+@dataclass
+class Service:
+    """A supervised service.
+
+    Attributes:
+        name: Service name for logs and metrics
+        factory: Returns a fresh coroutine for every (re)start
+        restart: ``always``, ``on-failure`` or ``never``
+        task: Running supervision task
+        restarts: Number of restarts so far
+    """
+
+    name: str
+    factory: ServiceFactory
+    restart: str = RESTART_ON_FAILURE
+    task: Optional[asyncio.Task] = None
+    restarts: int = 0
+
+
+class Supervisor:
+    """Runs services, restarts them by policy and stops them in order.
+
+    Attributes:
+        backoff: Seconds before the first restart
+        max_backoff: Longest delay between restarts
+        stable_after: Seconds a service must run before its backoff is
+            reset
+        on_fatal: Called with a reason when a service with the ``never``
+            policy fails
+        metrics: Metrics registry
+    """
+
+    def __init__(
+        self,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        stable_after: float = 60.0,
+        on_fatal: Optional[Callable[[str], None]] = None,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """Initialize the supervisor.
+
+        Args:
+            backoff: Seconds before the first restart
+            max_backoff: Longest delay between restarts
+            stable_after: Seconds a service must run before its backoff
+                is reset
+            on_fatal: Called with a reason when a service with the
+                ``never`` policy fails
+            metrics: Metrics registry
+        """
+        self.backoff = backoff
+        self.max_backoff = max(max_backoff, backoff)
+        self.stable_after = stable_after
+        self.on_fatal = on_fatal
+        self.metrics = metrics or Metrics()
+        self.services: Dict[str, Service] = {}
+        self._order: List[str] = []
+
+    def add(
+        self,
+        name: str,
+        factory: ServiceFactory,
+        restart: str = RESTART_ON_FAILURE,
+    ) -> None:
+        """Start a service.
+
+        Args:
+            name: Unique service name
+            factory: Returns a fresh coroutine for every (re)start
+            restart: ``always`` restarts the service whenever it ends,
+                ``on-failure`` only when it raises, ``never`` reports a
+                failure to ``on_fatal`` instead
+
+        Raises:
+            ValueError: If a service of that name is running
+        """
+        if name in self.services:
+            raise ValueError(f"Service {name} is already running")
+        service = Service(name, factory, restart)
+        service.task = asyncio.create_task(self._supervise(service), name=name)
+        self.services[name] = service
+        self._order.append(name)
+
+    def remove(self, name: str) -> None:
+        """Cancel a service without waiting for it to finish.
+
+        For services tied to something that went away, such as a
+        connection. Unknown names are ignored.
+
+        Args:
+            name: Service name
+        """
+        service = self.services.pop(name, None)
+        if service is None:
+            return
+        self._order.remove(name)
+        if service.task is not None and not service.task.done():
+            service.task.cancel()
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Cancel the services, newest first, waiting for each to finish.
+
+        Args:
+            timeout: Seconds to wait for each service
+        """
+        for name in reversed(self._order):
+            service = self.services.pop(name)
+            if service.task is None or service.task.done():
+                continue
+            service.task.cancel()
+            done, _ = await asyncio.wait([service.task], timeout=timeout)
+            if not done:
+                logger.warning("Service %s did not stop within %.1f s", name, timeout)
+        self._order.clear()
+
+    async def _supervise(self, service: Service) -> None:
+        """Run a service and restart it according to its policy.
+
+        Args:
+            service: Service to run
+        """
+        delay = self.backoff
+        while True:
+            started = time.monotonic()
+            try:
+                await service.factory()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Network errors are expected; a traceback adds nothing
+                expected = isinstance(e, (OSError, asyncio.TimeoutError))
+                logger.log(
+                    logging.WARNING if expected else logging.ERROR,
+                    "Service %s failed: %s",
+                    service.name,
+                    str(e) or repr(e),
+                    exc_info=not expected,
+                )
+                self.metrics.inc("service_failures")
+                if service.restart == RESTART_NEVER:
+                    if self.on_fatal:
+                        self.on_fatal(f"service {service.name} failed: {e}")
+                    return
+            else:
+                if service.restart != RESTART_ALWAYS:
+                    logger.debug("Service %s finished", service.name)
+                    return
+            if time.monotonic() - started >= self.stable_after:
+                delay = self.backoff
+            logger.warning("Restarting service %s in %.1f s", service.name, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+            service.restarts += 1
+            self.metrics.inc("service_restarts")
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop runs scheduled callbacks.
+
+    Sleeps for ``interval`` and records how much later than requested it
+    woke up. Publishes the latest lag as ``loop_lag_ms``, the worst lag
+    of the last ``window`` samples as ``loop_lag_max_ms`` and counts
+    samples above ``stall_after`` in ``loop_stalls``.
+
+    Attributes:
+        interval: Seconds between samples
+        window: Samples covered by the maximum
+        stall_after: Lag in seconds that counts as a stall
+        metrics: Metrics registry
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        window: int = 120,
+        stall_after: float = 0.1,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """Initialize the monitor.
+
+        Args:
+            interval: Seconds between samples
+            window: Samples covered by the maximum
+            stall_after: Lag in seconds that counts as a stall
+            metrics: Metrics registry
+        """
+        self.interval = interval
+        self.stall_after = stall_after
+        self.metrics = metrics or Metrics()
+        self._samples: deque = deque(maxlen=window)
+
+    async def run(self) -> None:
+        """Sample the loop lag until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - expected))
+
+    def record(self, lag: float) -> None:
+        """Record one lag sample.
+
+        Args:
+            lag: Seconds the loop woke up late
+        """
+        self._samples.append(lag)
+        self.metrics.set("loop_lag_ms", lag * 1000)
+        self.metrics.set("loop_lag_max_ms", max(self._samples) * 1000)
+        if lag >= self.stall_after:
+            self.metrics.inc("loop_stalls")
+            logger.debug("Event loop stalled for %.0f ms", lag * 1000)
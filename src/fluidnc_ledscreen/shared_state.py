@@ -0,0 +1,423 @@
+"""Two-process mode: ingest and render connected by shared memory.
+
+In the default single-process mode the socket reader, the parser and
+the NumPy rendering share one GIL and one event loop, so a slow frame
+delays socket reads and a burst of reports delays frames. In split mode
+the ingest process (connection, parser, reporting) publishes the display
+state into a latest-value slot in shared memory, and a render process
+(:class:`LEDScreen` and the panel driver) picks up the newest value each
+frame. Neither side ever waits for the other.
+
+The slot is a seqlock: the writer makes the sequence number odd, copies
+the payload and makes it even again; a reader retries if it saw an odd
+number or the number changed while it copied. There is one writer, so no
+lock is needed on either side. Python has no memory fences, and on weakly
+ordered CPUs (the Pi's aarch64) the even number can become visible before
+the payload bytes, so the header also carries a CRC32 of the payload that
+the reader checks. A reader gives up after a bounded number of retries,
+so a writer that died mid-update cannot make it spin forever.
+
+In split mode the ingest process runs the render process as a supervised
+service (:class:`RenderProcess`) and starts it again if it exits.
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import time
+import zlib
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from fluidnc_ledscreen.governor import FrameGovernor
+from fluidnc_ledscreen.led_screen import LEDScreen
+from fluidnc_ledscreen.metrics import Metrics
+from fluidnc_ledscreen.mirror import encode_frame
+from fluidnc_ledscreen.profiler import SamplingProfiler
+
+logger = logging.getLogger(__name__)
+
+# Sequence number, payload length and payload CRC32
+_HEADER = 24
+
+# Reads attempted before giving up on a slot that is being written
+READ_RETRIES = 100
+
+# Lets the writer run between read attempts
+_yield = getattr(os, "sched_yield", None) or (lambda: time.sleep(0))
+
+# Keys that are one-shot ticker events rather than display state
+EVENT_KEYS = ("message", "alarm")
+
+
+class StateSlot:
+    """Single-writer latest-value slot in shared memory.
+
+    Attributes:
+        name: Shared memory block name, used to attach from another process
+        capacity: Maximum payload size in bytes
+        torn_reads: Reads that gave up because the value kept changing or
+            failed its checksum
+    """
+
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        capacity: int = 4096,
+        create: bool = False,
+    ) -> None:
+        """Create or attach to a slot.
+
+        Args:
+            name: Block name (required when attaching)
+            capacity: Maximum payload size in bytes (when creating)
+            create: Whether to create the block
+        """
+        size = _HEADER + capacity if create else 0
+        self._shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self.name = self._shm.name
+        self.capacity = self._shm.size - _HEADER
+        self._header = np.ndarray((3,), dtype=np.uint64, buffer=self._shm.buf)
+        self._payload = self._shm.buf[_HEADER:]
+        self._owner = create
+        self._seen = 0
+        self.torn_reads = 0
+        if create:
+            self._header[:] = 0
+
+    def write(self, data: bytes) -> None:
+        """Publish a new value.
+
+        Args:
+            data: Payload
+
+        Raises:
+            ValueError: If the payload exceeds the slot capacity
+        """
+        size = len(data)
+        if size > self.capacity:
+            raise ValueError(f"State of {size} bytes exceeds slot capacity")
+        seq = int(self._header[0])
+        self._header[0] = seq + 1
+        self._payload[0:size] = data
+        self._header[1] = size
+        self._header[2] = zlib.crc32(data)
+        self._header[0] = seq + 2
+
+    def read(self) -> Optional[bytes]:
+        """Get the latest value if it changed since the last read.
+
+        Returns:
+            Payload, or None if nothing new was published or no consistent
+            value could be read within :data:`READ_RETRIES` attempts
+        """
+        for _ in range(READ_RETRIES):
+            seq = int(self._header[0])
+            if seq == self._seen:
+                return None
+            # An odd number means the writer is mid-update
+            if not seq & 1:
+                size = min(int(self._header[1]), self.capacity)
+                crc = int(self._header[2])
+                data = bytes(self._payload[0:size])
+                if int(self._header[0]) == seq and zlib.crc32(data) == crc:
+                    self._seen = seq
+                    return data
+            _yield()
+        # The next read tries again
+        self.torn_reads += 1
+        return None
+
+    def close(self) -> None:
+        """Detach from the slot, removing it if this side created it."""
+        self._header = None
+        self._payload.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class StatePublisher:
+    """Ingest-side stand-in for :class:`LEDScreen`.
+
+    Merges status updates into the display state and publishes it to a
+    :class:`StateSlot`. Ticker messages and alarms are published as the
+    latest event with a running number, so the render side shows each
+    one once even when the same text repeats.
+    """
+
+    def __init__(self, slot: StateSlot) -> None:
+        """Initialize the publisher.
+
+        Args:
+            slot: Slot to publish to
+        """
+        self.slot = slot
+        self.state: Dict[str, Any] = {}
+        self._event: Dict[str, Any] = {}
+        self._event_id = 0
+
+    def update(self, message: Dict[str, Any]) -> None:
+        """Merge status values and publish the result.
+
+        Args:
+            message: Status values, as for :meth:`LEDScreen.update`
+        """
+        event = {key: message[key] for key in EVENT_KEYS if message.get(key)}
+        if event:
+            self._event = event
+            self._event_id += 1
+        for key, value in message.items():
+            if key not in EVENT_KEYS:
+                self.state[key] = value
+        snapshot = {
+            "state": self.state,
+            "event": self._event,
+            "event_id": self._event_id,
+        }
+        self.slot.write(json.dumps(snapshot, separators=(",", ":")).encode())
+
+    def render(self, now: Optional[float] = None) -> None:
+        """Do nothing; the render process draws the frames."""
+
+    def cleanup(self) -> None:
+        """Release the slot."""
+        self.slot.close()
+
+
+class StateSubscriber:
+    """Render-side reader applying published state to an :class:`LEDScreen`."""
+
+    def __init__(
+        self,
+        slot: StateSlot,
+        screen: LEDScreen,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """Initialize the subscriber.
+
+        Args:
+            slot: Slot to read from
+            screen: Screen to update
+            metrics: Metrics registry counting undecodable states
+        """
+        self.slot = slot
+        self.screen = screen
+        self.metrics = metrics or Metrics()
+        # Taken from the first state read: a restarted render process must
+        # not replay the event the previous one already showed
+        self._event_id: Optional[int] = None
+
+    def poll(self) -> bool:
+        """Apply the latest published state, if any.
+
+        Returns:
+            True if new state was applied
+        """
+        data = self.slot.read()
+        if data is None:
+            return False
+        try:
+            snapshot = json.loads(data)
+            event_id = snapshot["event_id"]
+            event = snapshot["event"]
+            state = snapshot["state"]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring undecodable display state: %s", str(e))
+            self.metrics.inc("state_decode_errors")
+            return False
+        # Event first: a later state (e.g. leaving Alarm) must win
+        if self._event_id is not None and event_id != self._event_id:
+            self.screen.update(event)
+        self._event_id = event_id
+        self.screen.update(state)
+        return True
+
+
+class RenderProcess:
+    """Render process, run as a service of the ingest process.
+
+    :meth:`run` starts the process and raises when it exits, so a
+    :class:`~fluidnc_ledscreen.runtime.Supervisor` starts it again after
+    its backoff instead of leaving the panel frozen.
+
+    Attributes:
+        args: Arguments of :func:`render_main`
+        poll_interval: Seconds between liveness checks
+        process: Current process, if started
+    """
+
+    def __init__(self, args: Sequence[Any], poll_interval: float = 1.0) -> None:
+        """Initialize the render process.
+
+        Args:
+            args: Arguments of :func:`render_main`
+            poll_interval: Seconds between liveness checks
+        """
+        self.args = tuple(args)
+        self.poll_interval = poll_interval
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+
+    async def run(self) -> None:
+        """Start the render process and watch it until cancelled.
+
+        Raises:
+            RuntimeError: If the process exits
+        """
+        process = multiprocessing.get_context("spawn").Process(
+            target=render_main, args=self.args, name="render", daemon=True
+        )
+        process.start()
+        self.process = process
+        try:
+            while process.is_alive():
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            if process.is_alive():
+                await asyncio.to_thread(self.stop)
+        raise RuntimeError(f"Render process exited with code {process.exitcode}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Terminate the render process and wait for it.
+
+        Args:
+            timeout: Seconds to wait for the process to exit
+        """
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+
+
+def set_affinity(cpus: Optional[Sequence[int]], role: str) -> None:
+    """Pin the calling process to a set of CPUs.
+
+    Args:
+        cpus: CPU numbers, or None/empty to leave the affinity alone
+        role: Process role for log messages
+    """
+    if not cpus:
+        return
+    try:
+        os.sched_setaffinity(0, cpus)
+        logger.info("Pinned %s process to CPUs %s", role, list(cpus))
+    except (AttributeError, OSError, ValueError) as e:
+        logger.warning("Failed to pin %s process to CPUs %s: %s", role, cpus, str(e))
+
+
+def parse_cpus(value: str) -> Optional[Sequence[int]]:
+    """Parse a CPU list such as ``2,3`` or ``2-3``.
+
+    Args:
+        value: CPU list (empty for no pinning)
+
+    Returns:
+        CPU numbers, or None
+
+    Raises:
+        ValueError: If the list is malformed
+    """
+    cpus = []
+    for part in filter(None, (p.strip() for p in value.split(","))):
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus or None
+
+
+def render_main(
+    slot_name: str,
+    screen_kwargs: Dict[str, Any],
+    render_fps: float,
+    cpus: Optional[Sequence[int]] = None,
+    metrics_interval: float = 60.0,
+    mirror_slot: Optional[str] = None,
+    mirror_fps: float = 10.0,
+    governor_kwargs: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Run the render process until terminated.
+
+    Args:
+        slot_name: Name of the state slot created by the ingest process
+        screen_kwargs: Keyword arguments for :class:`LEDScreen`
+        render_fps: Maximum display refresh rate
+        cpus: CPUs to pin the process to
+        metrics_interval: Seconds between metrics log lines (0 disables)
+        mirror_slot: Name of a slot receiving encoded frames for the panel
+            mirror, or None
+        mirror_fps: Maximum rate at which frames are encoded for the mirror
+        governor_kwargs: Keyword arguments for a :class:`FrameGovernor`
+            adapting the refresh rate to the CPU load, or None
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    set_affinity(cpus, "render")
+    running = True
+
+    def stop(signum, frame) -> None:
+        nonlocal running
+        running = False
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    profiler = SamplingProfiler()
+    signal.signal(signal.SIGUSR1, lambda signum, frame: profiler.start())
+    signal.signal(signal.SIGUSR2, lambda signum, frame: profiler.stop())
+
+    slot = StateSlot(slot_name)
+    metrics = Metrics()
+    screen = LEDScreen(**screen_kwargs, metrics=metrics)
+    subscriber = StateSubscriber(slot, screen, metrics)
+    mirror = StateSlot(mirror_slot) if mirror_slot else None
+    mirror_pending = False
+    next_mirror = 0.0
+    governor = None
+    if governor_kwargs is not None:
+        governor = FrameGovernor(max_fps=render_fps, metrics=metrics, **governor_kwargs)
+    interval = 1.0 / render_fps
+    next_sample = time.monotonic() + (governor.interval if governor else 0.0)
+    next_log = time.monotonic() + metrics_interval
+    next_render = 0.0
+    try:
+        while running:
+            try:
+                subscriber.poll()
+            except (RuntimeError, ValueError, KeyError, TypeError) as e:
+                # A bad update must not take the panel down
+                logger.error("Failed to apply display state: %s", str(e))
+                metrics.inc("state_apply_errors")
+            # While asleep keep polling for a wake-up but render less often
+            if not screen.sleeping or time.monotonic() >= next_render:
+                next_render = time.monotonic() + screen.sleep_interval
+                started = time.perf_counter()
+                try:
+                    mirror_pending |= screen.render()
+                except RuntimeError as e:
+                    logger.error("LED screen error: %s", str(e))
+                if governor:
+                    governor.record_render(time.perf_counter() - started)
+            if governor and time.monotonic() >= next_sample:
+                if governor.sample():
+                    interval = 1.0 / governor.fps
+                    screen.set_effects(governor.effects)
+                next_sample = time.monotonic() + governor.interval
+            if mirror and mirror_pending and time.monotonic() >= next_mirror:
+                # Latest frame only; skipped frames are covered by this one
+                mirror.write(encode_frame(screen.frame))
+                mirror_pending = False
+                next_mirror = time.monotonic() + 1.0 / mirror_fps
+            if metrics_interval > 0 and time.monotonic() >= next_log:
+                metrics.set("state_torn_reads", slot.torn_reads)
+                metrics.log()
+                next_log += metrics_interval
+            time.sleep(interval)
+    finally:
+        screen.cleanup()
+        slot.close()
+        if mirror:
+            mirror.close()
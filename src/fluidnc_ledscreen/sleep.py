@@ -0,0 +1,140 @@
+"""Display sleep policy.
+
+A shop display is often on around the clock while the machine sits idle
+or switched off. After a quiet period the screen switches to a dim
+minimal layout (clock, machine state and connection dot), renders at a
+low rate and pushes a frame only when the clock ticks over. Any state
+change, connection change, message or position change wakes it on the
+next update.
+"""
+
+import configparser
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# Type aliases
+Status = Dict[str, Any]
+
+# Status keys whose changes count as activity
+WAKE_KEYS = ("state", "connected", "link", "message", "alarm")
+
+# Position keys; changes smaller than the policy's epsilon are ignored
+POSITION_KEYS = ("x", "y", "z")
+
+
+@dataclass(frozen=True)
+class SleepPolicy:
+    """When and how the display sleeps.
+
+    Attributes:
+        idle_after: Quiet seconds before the display sleeps
+        fps: Render rate while asleep
+        brightness: Brightness factor applied to the sleep layout
+        layout: Layout shown while asleep
+        clock_format: ``time.strftime`` format of the clock
+        position_epsilon: Smallest position change that wakes the display
+        idle_states: Machine states in which the display may sleep (it
+            also sleeps while disconnected)
+    """
+
+    idle_after: float = 900.0
+    fps: float = 1.0
+    brightness: float = 0.25
+    layout: str = "sleep"
+    clock_format: str = "%H:%M"
+    position_epsilon: float = 0.005
+    idle_states: Tuple[str, ...] = ("Idle", "Sleep")
+
+    @classmethod
+    def from_config(cls, section: configparser.SectionProxy) -> Optional["SleepPolicy"]:
+        """Build a policy from a config section.
+
+        Args:
+            section: Config section (e.g. ``[Display]``)
+
+        Returns:
+            Sleep policy, or None if ``sleep_after`` is 0
+        """
+        idle_after = section.getfloat("sleep_after", cls.idle_after)
+        if idle_after <= 0:
+            return None
+        return cls(
+            idle_after=idle_after,
+            fps=section.getfloat("sleep_fps", cls.fps),
+            brightness=section.getfloat("sleep_brightness", cls.brightness),
+            layout=section.get("sleep_layout", cls.layout),
+        )
+
+
+class SleepTimer:
+    """Tracks display activity against a :class:`SleepPolicy`.
+
+    Attributes:
+        policy: Sleep policy
+        asleep: Whether the display is asleep
+    """
+
+    def __init__(self, policy: SleepPolicy, now: Optional[float] = None) -> None:
+        """Initialize the timer.
+
+        Args:
+            policy: Sleep policy
+            now: Monotonic time in seconds (default: current time)
+        """
+        self.policy = policy
+        self.asleep = False
+        self._last_activity = time.monotonic() if now is None else now
+        self._position: Dict[str, float] = {}
+
+    def observe(self, update: Status, state: Status, now: float) -> bool:
+        """Check a status update for activity.
+
+        Args:
+            update: New status values
+            state: Status values before the update
+            now: Monotonic time in seconds
+
+        Returns:
+            True if the update counts as activity
+        """
+        changed = [key for key in WAKE_KEYS if key in update]
+        active = any(update[key] != state.get(key) for key in changed)
+        for key in POSITION_KEYS:
+            value = update.get(key)
+            if not isinstance(value, (int, float)):
+                continue
+            # Compared with the position at the last activity, so a slow
+            # creep adds up instead of hiding below the epsilon
+            anchor = self._position.get(key)
+            epsilon = self.policy.position_epsilon
+            if anchor is None or abs(value - anchor) > epsilon:
+                self._position[key] = value
+                active = active or anchor is not None
+        if active:
+            self.touch(now)
+        return active
+
+    def touch(self, now: float) -> None:
+        """Record activity.
+
+        Args:
+            now: Monotonic time in seconds
+        """
+        self._last_activity = now
+
+    def due(self, state: Status, now: float) -> bool:
+        """Check whether the display should go to sleep.
+
+        Args:
+            state: Current status values
+            now: Monotonic time in seconds
+
+        Returns:
+            True if awake, quiet for long enough and idle or disconnected
+        """
+        if self.asleep or now - self._last_activity < self.policy.idle_after:
+            return False
+        if not state.get("connected", False):
+            return True
+        return state.get("state") in self.policy.idle_states
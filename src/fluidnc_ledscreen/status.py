@@ -0,0 +1,113 @@
+"""FluidNC line protocol parser.
+
+This module turns the lines FluidNC sends (status reports, messages,
+alarms and command responses) into dictionaries the display and the
+status reporter can consume.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+AXES = ("x", "y", "z", "a", "b", "c")
+
+# Lines that carry no status information
+IGNORED_PREFIXES = ("PING:", "CURRENT_ID:", "ACTIVE_ID:")
+
+
+def _floats(value: str) -> List[float]:
+    """Parse a comma separated list of numbers."""
+    return [float(part) for part in value.split(",") if part]
+
+
+class StatusParser:
+    """Stateful parser for FluidNC protocol lines.
+
+    Status reports only include the work coordinate offset (``WCO``)
+    every few reports, so the parser remembers the last offset to derive
+    work positions from machine positions.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        self.wco: Optional[List[float]] = None
+
+    def parse(self, line: str) -> Optional[Dict[str, Any]]:
+        """Parse one protocol line.
+
+        Args:
+            line: Line received from FluidNC, without the line terminator
+
+        Returns:
+            Parsed data with a ``type`` key (``status``, ``message``,
+            ``alarm``, ``ok``, ``error`` or ``info``), or None for lines
+            that carry no information
+        """
+        line = line.strip()
+        if not line or line.startswith(IGNORED_PREFIXES):
+            return None
+        if line.startswith("<") and line.endswith(">"):
+            try:
+                return self._parse_report(line[1:-1])
+            except ValueError as e:
+                logger.error("Failed to parse status report: %s", str(e))
+                return None
+        if line.startswith("[MSG:") and line.endswith("]"):
+            return {"type": "message", "message": line[5:-1].strip()}
+        if line.startswith("ALARM:"):
+            return {"type": "alarm", "alarm": line, "state": "Alarm"}
+        if line == "ok":
+            return {"type": "ok"}
+        if line.startswith("error:"):
+            return {"type": "error", "error": line[6:].strip()}
+        return {"type": "info", "line": line}
+
+    def _parse_report(self, body: str) -> Dict[str, Any]:
+        """Parse the body of a ``<State|Key:Value|...>`` status report.
+
+        Args:
+            body: Report without the angle brackets
+
+        Returns:
+            Parsed status values
+        """
+        fields = body.split("|")
+        state = fields[0].split(":", 1)[0]
+        values: Dict[str, Any] = {"type": "status", "state": state}
+        mpos = wpos = None
+
+        for item in fields[1:]:
+            key, _, value = item.partition(":")
+            if key == "MPos":
+                mpos = _floats(value)
+            elif key == "WPos":
+                wpos = _floats(value)
+            elif key == "WCO":
+                self.wco = _floats(value)
+            elif key == "FS":
+                speeds = _floats(value)
+                values["feed"] = speeds[0]
+                if len(speeds) > 1:
+                    values["spindle"] = speeds[1]
+            elif key == "F":
+                values["feed"] = float(value)
+            elif key == "Pn":
+                values["pins"] = value
+            elif key == "Ln":
+                values["line_number"] = int(value)
+            elif key == "Ov":
+                values["overrides"] = _floats(value)
+            elif key == "Bf":
+                values["buffer"] = _floats(value)
+
+        if wpos is None and mpos is not None:
+            if self.wco is not None:
+                wpos = [m - o for m, o in zip(mpos, self.wco)]
+            else:
+                wpos = mpos
+        if wpos is not None:
+            values.update(zip(AXES, wpos))
+        if mpos is not None:
+            values["mpos"] = mpos
+        return values
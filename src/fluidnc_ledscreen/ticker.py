@@ -0,0 +1,223 @@
+"""Scrolling ticker for messages that do not fit on the panel.
+
+A message is rendered once into a wide off-screen strip; scrolling is
+then just moving a slice window across that strip at a fixed pixel rate.
+Messages carry a priority so an alarm preempts informational text and
+the preempted message resumes once the alarm is cleared.
+"""
+
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Message priorities (higher wins)
+PRIORITY_MESSAGE = 10
+PRIORITY_ALARM = 100
+
+
+class TickerMessage:
+    """A message rendered into its scroll strip.
+
+    Attributes:
+        text: Message text
+        priority: Message priority
+        strip: RGB strip of shape ``(height, period + width, 3)``
+        period: Scroll period in pixels (0 if the text fits without scrolling)
+        started: Monotonic time the message was first shown, or None
+        expires: Monotonic time the message expires, or None if it persists
+        passes: Number of full scroll passes before the message expires
+    """
+
+    __slots__ = ("text", "priority", "strip", "period", "started", "expires", "passes")
+
+    def __init__(
+        self,
+        text: str,
+        priority: int,
+        strip: np.ndarray,
+        period: int,
+        passes: Optional[int],
+    ) -> None:
+        """Initialize the message.
+
+        Args:
+            text: Message text
+            priority: Message priority
+            strip: Pre-rendered RGB strip
+            period: Scroll period in pixels
+            passes: Scroll passes before expiry (None to persist)
+        """
+        self.text = text
+        self.priority = priority
+        self.strip = strip
+        self.period = period
+        self.passes = passes
+        self.started: Optional[float] = None
+        self.expires: Optional[float] = None
+
+
+class Ticker:
+    """Priority-preempting scrolling text window.
+
+    Attributes:
+        width: Window width in pixels
+        height: Window height in pixels
+        speed: Scroll speed in pixels per second
+        gap: Blank pixels between repetitions of the text
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        speed: float = 20.0,
+        gap: Optional[int] = None,
+        min_duration: float = 3.0,
+    ) -> None:
+        """Initialize the ticker.
+
+        Args:
+            width: Window width in pixels
+            height: Window height in pixels
+            speed: Scroll speed in pixels per second
+            gap: Blank pixels between repetitions (default: half the width)
+            min_duration: Minimum display time for expiring messages
+        """
+        self.width = width
+        self.height = height
+        self.speed = speed
+        self.gap = width // 2 if gap is None else gap
+        self.min_duration = min_duration
+        self._messages: Dict[int, TickerMessage] = {}
+        self._current: Optional[TickerMessage] = None
+        self._offset = -1
+
+    @property
+    def active(self) -> bool:
+        """Whether a message is being shown."""
+        return bool(self._messages)
+
+    def render_strip(self, tiles: Dict[str, np.ndarray], text: str) -> tuple:
+        """Render text once into a scroll strip.
+
+        The strip holds the text, the gap and a copy of the first window's
+        worth of columns, so any window offset within one period is a single
+        contiguous slice.
+
+        Args:
+            tiles: Character to RGB tile mapping from the glyph atlas
+            text: Message text
+
+        Returns:
+            Tuple of ``(strip, period)``
+        """
+        blank = tiles[" "]
+        cells = [tiles.get(char, tiles["?"]) for char in text] or [blank]
+        rendered = np.concatenate(cells, axis=1)[: self.height]
+        if rendered.shape[0] < self.height:
+            pad = self.height - rendered.shape[0]
+            rendered = np.pad(rendered, ((0, pad), (0, 0), (0, 0)))
+
+        if rendered.shape[1] <= self.width:
+            strip = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+            strip[:, : rendered.shape[1]] = rendered
+            return strip, 0
+
+        period = rendered.shape[1] + self.gap
+        strip = np.zeros((self.height, period + self.width, 3), dtype=np.uint8)
+        strip[:, : rendered.shape[1]] = rendered
+        strip[:, period:] = strip[:, : self.width]
+        return strip, period
+
+    def show(
+        self,
+        tiles: Dict[str, np.ndarray],
+        text: str,
+        priority: int = PRIORITY_MESSAGE,
+        passes: Optional[int] = 2,
+    ) -> None:
+        """Queue a message, replacing any message of the same priority.
+
+        Args:
+            tiles: Character to RGB tile mapping from the glyph atlas
+            text: Message text
+            priority: Message priority; the highest queued priority is shown
+            passes: Scroll passes before expiry (None to persist until
+                :meth:`clear` is called)
+        """
+        existing = self._messages.get(priority)
+        if existing is not None and existing.text == text:
+            return
+        strip, period = self.render_strip(tiles, text)
+        self._messages[priority] = TickerMessage(text, priority, strip, period, passes)
+
+    def clear(self, priority: Optional[int] = None) -> None:
+        """Remove queued messages.
+
+        Args:
+            priority: Priority to remove (default: all messages)
+        """
+        if priority is None:
+            self._messages.clear()
+        else:
+            self._messages.pop(priority, None)
+
+    def window(self, now: float) -> Optional[np.ndarray]:
+        """Get the visible window, or None if it has not moved.
+
+        Args:
+            now: Monotonic time in seconds
+
+        Returns:
+            RGB view of shape ``(height, width, 3)`` into the strip, or None
+            when the previous window is still current
+        """
+        message = self._select(now)
+        if message is None:
+            self._current = None
+            return None
+        if message is not self._current:
+            self._current = message
+            self._offset = -1
+            if message.started is None:
+                message.started = now
+                if message.passes is not None:
+                    scroll = 0.0
+                    if self.speed > 0:
+                        scroll = message.passes * message.period / self.speed
+                    message.expires = now + max(scroll, self.min_duration)
+
+        offset = 0
+        if message.period and self.speed > 0:
+            offset = int((now - message.started) * self.speed) % message.period
+        if offset == self._offset:
+            return None
+        self._offset = offset
+        return message.strip[:, offset:][:, : self.width]
+
+    def invalidate(self) -> None:
+        """Force the next :meth:`window` call to return the window."""
+        self._offset = -1
+
+    def _select(self, now: float) -> Optional[TickerMessage]:
+        """Drop expired messages and pick the highest priority one.
+
+        Args:
+            now: Monotonic time in seconds
+
+        Returns:
+            Message to show, or None
+        """
+        expired = [
+            priority
+            for priority, message in self._messages.items()
+            if message.expires is not None and now >= message.expires
+        ]
+        for priority in expired:
+            del self._messages[priority]
+        if not self._messages:
+            return None
+        return self._messages[max(self._messages)]
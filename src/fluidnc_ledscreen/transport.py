@@ -0,0 +1,487 @@
+"""Byte transports for the FluidNC line protocol.
+
+FluidNC speaks the same line protocol over WebSocket (port 81), raw TCP
+(telnet, port 23) and its USB/UART serial port. :class:`WebSocketClient`
+talks to a
+:class:`Transport`, so the connection type is a configuration choice and
+the line splitting, parsing and reconnect logic are shared.
+"""
+
+import asyncio
+import codecs
+import logging
+import os
+import socket
+import time
+from typing import List, Optional, Union
+
+import websockets
+from websockets.exceptions import ConnectionClosed, InvalidHandshake, WebSocketException
+
+from fluidnc_ledscreen.connection_profile import ConnectionProfile
+
+try:
+    import serial
+except ImportError:  # pragma: no cover - pyserial is only needed for USB
+    serial = None
+
+logger = logging.getLogger(__name__)
+
+TRANSPORTS = ("websocket", "tcp", "serial")
+DEFAULT_PORTS = {"websocket": 81, "tcp": 23}
+DEFAULT_BAUDRATE = 115200
+
+
+class TransportClosed(ConnectionError):
+    """Raised when the transport's connection is gone."""
+
+
+class LineSplitter:
+    """Incremental splitter turning received chunks into protocol lines.
+
+    Chunks may end in the middle of a line or of a UTF-8 sequence; the
+    remainder is kept until the next chunk completes it.
+    """
+
+    def __init__(self, max_line: int = 4096) -> None:
+        """Initialize the splitter.
+
+        Args:
+            max_line: Longest partial line kept before it is flushed as is
+        """
+        self.max_line = max_line
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+
+    def feed(self, chunk: Union[str, bytes]) -> List[str]:
+        """Add received data and return the completed lines.
+
+        Args:
+            chunk: Received text or bytes
+
+        Returns:
+            Completed lines without terminators
+        """
+        if isinstance(chunk, bytes):
+            chunk = self._decoder.decode(chunk)
+        data = self._partial + chunk
+        lines = data.split("\n")
+        self._partial = lines.pop()
+        if len(self._partial) > self.max_line:
+            lines.append(self._partial)
+            self._partial = ""
+        return [line.rstrip("\r") for line in lines if line.strip("\r")]
+
+    def reset(self) -> None:
+        """Drop any buffered partial line, e.g. after a reconnect."""
+        self._decoder.reset()
+        self._partial = ""
+
+
+class Transport:
+    """Base class for a bidirectional byte stream to a controller.
+
+    Attributes:
+        name: Transport name used in logs and metrics
+        address: Human readable peer address
+    """
+
+    name = "transport"
+
+    def __init__(self, address: str) -> None:
+        """Initialize the transport.
+
+        Args:
+            address: Human readable peer address
+        """
+        self.address = address
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the transport is connected."""
+        raise NotImplementedError
+
+    async def open(self) -> None:
+        """Connect to the controller.
+
+        Raises:
+            OSError: If the connection cannot be established
+            asyncio.TimeoutError: If connecting takes too long
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Close the connection."""
+        raise NotImplementedError
+
+    async def write(self, data: str) -> None:
+        """Send raw protocol text.
+
+        Args:
+            data: Text to send, including any line terminator
+
+        Raises:
+            TransportClosed: If the connection is gone
+        """
+        raise NotImplementedError
+
+    async def recv(self) -> Union[str, bytes]:
+        """Receive the next chunk of protocol output.
+
+        Returns:
+            Received text or bytes (not necessarily whole lines)
+
+        Raises:
+            TransportClosed: If the connection is gone
+        """
+        raise NotImplementedError
+
+    async def ping(self, timeout: float) -> Optional[float]:
+        """Measure the link round-trip time.
+
+        Args:
+            timeout: Seconds to wait for the reply
+
+        Returns:
+            Round-trip time in seconds, or None if unsupported
+
+        Raises:
+            asyncio.TimeoutError: If no reply arrives in time
+            TransportClosed: If the connection is gone
+        """
+        return None
+
+
+class WebSocketTransport(Transport):
+    """FluidNC WebSocket transport (port 81)."""
+
+    name = "websocket"
+
+    def __init__(self, url: str, profile: Optional[ConnectionProfile] = None) -> None:
+        """Initialize the transport.
+
+        Args:
+            url: WebSocket URL
+            profile: Connection tuning
+        """
+        super().__init__(url)
+        self.url = url
+        self.profile = profile or ConnectionProfile()
+        self.websocket = None
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the WebSocket is connected."""
+        return self.websocket is not None
+
+    async def open(self) -> None:
+        """Perform the WebSocket handshake."""
+        try:
+            self.websocket = await websockets.connect(
+                self.url,
+                **self.profile.connect_kwargs(),
+            )
+        except InvalidHandshake as e:
+            raise ConnectionRefusedError(str(e)) from e
+
+    async def close(self) -> None:
+        """Close the WebSocket."""
+        if self.websocket:
+            try:
+                await self.websocket.close()
+            except WebSocketException as e:
+                logger.error("Error closing connection: %s", str(e))
+            finally:
+                self.websocket = None
+
+    async def write(self, data: str) -> None:
+        """Send a text frame."""
+        if not self.websocket:
+            raise TransportClosed("WebSocket is not connected")
+        try:
+            await self.websocket.send(data)
+        except WebSocketException as e:
+            raise TransportClosed(str(e)) from e
+
+    async def recv(self) -> Union[str, bytes]:
+        """Receive the next text or binary frame.
+
+        Text frames (e.g. ``CURRENT_ID:0``) are whole lines even without a
+        terminator; binary frames carry raw protocol output.
+        """
+        if not self.websocket:
+            raise TransportClosed("WebSocket is not connected")
+        try:
+            message = await self.websocket.recv()
+        except ConnectionClosed as e:
+            raise TransportClosed(str(e)) from e
+        except WebSocketException as e:
+            raise TransportClosed(str(e)) from e
+        if isinstance(message, str) and not message.endswith("\n"):
+            message += "\n"
+        return message
+
+    async def ping(self, timeout: float) -> Optional[float]:
+        """Time a WebSocket ping/pong exchange."""
+        if not self.websocket:
+            raise TransportClosed("WebSocket is not connected")
+        started = time.perf_counter()
+        try:
+            pong = await self.websocket.ping()
+            await asyncio.wait_for(pong, timeout)
+        except WebSocketException as e:
+            raise TransportClosed(str(e)) from e
+        return time.perf_counter() - started
+
+
+class TcpTransport(Transport):
+    """FluidNC raw TCP (telnet) transport (port 23).
+
+    No framing, masking or HTTP upgrade: the line protocol goes straight
+    over the socket. Dead links are detected with TCP keep-alive, tuned
+    from the profile's ping settings where the platform allows it.
+    """
+
+    name = "tcp"
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 23,
+        profile: Optional[ConnectionProfile] = None,
+        read_size: int = 4096,
+    ) -> None:
+        """Initialize the transport.
+
+        Args:
+            host: Controller host name or address
+            port: Telnet port
+            profile: Connection tuning (``open_timeout`` and keep-alive)
+            read_size: Maximum bytes per read
+        """
+        super().__init__(f"{host}:{port}")
+        self.host = host
+        self.port = port
+        self.profile = profile or ConnectionProfile()
+        self.read_size = read_size
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the socket is connected."""
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def open(self) -> None:
+        """Open the TCP connection."""
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port),
+            self.profile.open_timeout,
+        )
+        sock = self._writer.get_extra_info("socket")
+        if sock is not None:
+            self._tune_socket(sock)
+
+    def _tune_socket(self, sock: socket.socket) -> None:
+        """Disable Nagle and enable keep-alive probing.
+
+        Args:
+            sock: Connected socket
+        """
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        interval = self.profile.ping_interval
+        if interval and hasattr(socket, "TCP_KEEPIDLE"):
+            seconds = max(1, int(interval))
+            probes = max(1, int((self.profile.ping_timeout or interval) / seconds))
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, seconds)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, seconds)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, probes)
+
+    async def close(self) -> None:
+        """Close the TCP connection."""
+        writer, self._writer, self._reader = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError as e:
+                logger.error("Error closing connection: %s", str(e))
+
+    async def write(self, data: str) -> None:
+        """Write to the socket."""
+        if not self.is_open:
+            raise TransportClosed("TCP connection is not open")
+        try:
+            self._writer.write(data.encode("utf-8"))
+            await self._writer.drain()
+        except OSError as e:
+            raise TransportClosed(str(e)) from e
+
+    async def recv(self) -> bytes:
+        """Read whatever bytes are available."""
+        if self._reader is None:
+            raise TransportClosed("TCP connection is not open")
+        try:
+            data = await self._reader.read(self.read_size)
+        except OSError as e:
+            raise TransportClosed(str(e)) from e
+        if not data:
+            raise TransportClosed("Connection closed by controller")
+        return data
+
+
+class SerialTransport(Transport):
+    """FluidNC USB/UART serial transport.
+
+    pyserial only opens and configures the port; reads are driven by the
+    event loop watching the non-blocking file descriptor, so there is no
+    polling thread and no ``readline()`` timeout on the latency path. Any
+    character device works, including one end of a pty pair.
+    """
+
+    name = "serial"
+
+    def __init__(
+        self,
+        device: str,
+        baudrate: int = DEFAULT_BAUDRATE,
+        read_size: int = 4096,
+    ) -> None:
+        """Initialize the transport.
+
+        Args:
+            device: Serial device path (e.g. ``/dev/ttyUSB0``)
+            baudrate: Line speed
+            read_size: Maximum bytes per read
+        """
+        super().__init__(device)
+        self.device = device
+        self.baudrate = baudrate
+        self.read_size = read_size
+        self._serial = None
+        self._fd: Optional[int] = None
+        self._chunks: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the device is open."""
+        return self._fd is not None
+
+    async def open(self) -> None:
+        """Open and configure the serial device.
+
+        Raises:
+            OSError: If the device cannot be opened
+        """
+        if serial is None:
+            raise FileNotFoundError("pyserial is required for serial transport")
+        # SerialException is an OSError subclass
+        self._serial = serial.Serial(
+            self.device,
+            self.baudrate,
+            timeout=0,
+            exclusive=True,
+        )
+        self._fd = self._serial.fileno()
+        os.set_blocking(self._fd, False)
+        self._chunks = asyncio.Queue()
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self._fd, self._on_readable)
+
+    def _on_readable(self) -> None:
+        """Read available bytes when the event loop reports the fd ready."""
+        try:
+            data = os.read(self._fd, self.read_size)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            # EIO when the USB device goes away or the pty peer closes
+            logger.warning("Serial read failed: %s", str(e))
+            data = b""
+        if not data:
+            self._loop.remove_reader(self._fd)
+        self._chunks.put_nowait(data)
+
+    async def close(self) -> None:
+        """Close the serial device."""
+        fd, self._fd = self._fd, None
+        if fd is not None and self._loop is not None:
+            self._loop.remove_reader(fd)
+        if self._serial is not None:
+            try:
+                self._serial.close()
+            except OSError as e:
+                logger.error("Error closing connection: %s", str(e))
+            finally:
+                self._serial = None
+        if self._chunks is not None:
+            # Wake a pending recv()
+            self._chunks.put_nowait(b"")
+
+    async def write(self, data: str) -> None:
+        """Write to the device, waiting for buffer space if needed."""
+        if self._fd is None:
+            raise TransportClosed("Serial device is not open")
+        payload = memoryview(data.encode("utf-8"))
+        while payload:
+            try:
+                written = os.write(self._fd, payload)
+            except BlockingIOError:
+                await self._writable()
+                continue
+            except OSError as e:
+                raise TransportClosed(str(e)) from e
+            payload = payload[written:]
+
+    async def _writable(self) -> None:
+        """Wait until the device accepts more output."""
+        ready = self._loop.create_future()
+        self._loop.add_writer(self._fd, ready.set_result, None)
+        try:
+            await ready
+        finally:
+            if self._fd is not None:
+                self._loop.remove_writer(self._fd)
+
+    async def recv(self) -> bytes:
+        """Receive the next chunk read from the device."""
+        if self._chunks is None:
+            raise TransportClosed("Serial device is not open")
+        data = await self._chunks.get()
+        if not data:
+            raise TransportClosed("Serial device closed")
+        return data
+
+
+def create_transport(
+    kind: str,
+    host: str,
+    port: Optional[int] = None,
+    profile: Optional[ConnectionProfile] = None,
+    baudrate: int = DEFAULT_BAUDRATE,
+) -> Transport:
+    """Create a transport from configuration values.
+
+    Args:
+        kind: ``websocket``, ``tcp`` or ``serial``
+        host: Controller host name or address, or the serial device path
+        port: Port (default: 81 for WebSocket, 23 for TCP)
+        profile: Connection tuning
+        baudrate: Serial line speed
+
+    Returns:
+        Unopened transport
+
+    Raises:
+        ValueError: If the transport kind is unknown
+    """
+    if kind not in TRANSPORTS:
+        raise ValueError(f"Unknown transport: {kind}")
+    if kind == "serial":
+        return SerialTransport(host, baudrate)
+    port = port or DEFAULT_PORTS[kind]
+    if kind == "tcp":
+        return TcpTransport(host, port, profile)
+    return WebSocketTransport(f"ws://{host}:{port}", profile)
@@ -0,0 +1,407 @@
+"""Machine utilization accounting.
+
+Time spent in each machine state is added to running totals per machine,
+per day and per shift as the state changes, so utilization is available
+on the display Pi without post-processing logs. A transition costs O(1):
+the time since the previous transition is credited to the state it
+ended, split only where it crosses a shift or day boundary, and the
+boundary of the current slot is cached. A shift crossing midnight is
+booked under the day it started.
+
+Totals are kept as one short list of seconds per machine, day and shift
+(in :data:`BUCKETS` order) and persisted as compact JSON in the state
+directory; days beyond the latest ``keep_days`` are dropped. Time while the
+application was not running is not accounted.
+"""
+
+import asyncio
+import configparser
+import datetime
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fluidnc_ledscreen.config import state_path
+from fluidnc_ledscreen.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+RUN = "Run"
+DISCONNECTED = "Disconnected"
+BUCKETS = (RUN, "Idle", "Hold", "Alarm", "Jog", DISCONNECTED)
+
+# Machine states outside the buckets count towards the closest one
+STATE_BUCKETS = {
+    "Run": "Run",
+    "Idle": "Idle",
+    "Hold": "Hold",
+    "Door": "Hold",
+    "Alarm": "Alarm",
+    "Jog": "Jog",
+    "Home": "Jog",
+    "Check": "Idle",
+    "Sleep": "Idle",
+}
+
+# Type aliases
+Shift = Tuple[str, int]  # name, minutes after midnight
+Slot = Tuple[str, str, float, float]  # day, shift, start, end
+Totals = Dict[str, Dict[str, Dict[str, List[float]]]]  # day, machine, shift
+
+
+def parse_shifts(text: str) -> List[Shift]:
+    """Parse shift start times.
+
+    Args:
+        text: Comma separated ``name@HH:MM`` items (e.g.
+            ``early@06:00,late@14:00,night@22:00``); empty for one
+            ``day`` shift starting at midnight
+
+    Returns:
+        Shifts sorted by start time
+
+    Raises:
+        ValueError: If an item is malformed
+    """
+    shifts: List[Shift] = []
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        name, _, start = item.partition("@")
+        hours, _, minutes = start.partition(":")
+        if not name or not hours.isdigit() or not minutes.isdigit():
+            raise ValueError(f"Bad shift {item!r}, expected name@HH:MM")
+        offset = int(hours) * 60 + int(minutes)
+        if offset >= 24 * 60:
+            raise ValueError(f"Bad shift start {start!r}")
+        shifts.append((name, offset))
+    return sorted(shifts, key=lambda shift: shift[1]) or [("day", 0)]
+
+
+class UtilizationAccountant:
+    """Running per-state time totals by machine, day and shift.
+
+    Feed every display update to :meth:`observe`; :meth:`run` brings the
+    totals up to date at the interval, hands the display values to
+    ``on_update`` and persists the totals.
+
+    Attributes:
+        shifts: Shift names and start times in minutes after midnight
+        path: Persistence file
+        keep_days: Days of totals kept (at least one)
+        interval: Seconds between published updates
+        flush_interval: Seconds between saves
+        page_every: Seconds between showing the utilization page (0: never)
+        page_seconds: Seconds the page stays up
+        page_layout: Layout of the page
+        on_update: Receives the display values of :meth:`publish`
+        machine: Machine the current time is credited to
+        bucket: Bucket the current time is credited to
+        days: Totals by day, machine and shift
+        metrics: Metrics registry
+    """
+
+    def __init__(
+        self,
+        shifts: Sequence[Shift] = (("day", 0),),
+        path: Optional[str] = None,
+        keep_days: int = 35,
+        interval: float = 10.0,
+        flush_interval: float = 300.0,
+        page_every: float = 0.0,
+        page_seconds: float = 5.0,
+        page_layout: str = "utilization",
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """Initialize the accountant and load persisted totals.
+
+        Args:
+            shifts: Shifts as returned by :func:`parse_shifts`
+            path: Persistence file (default: ``utilization.json`` in the
+                state directory)
+            keep_days: Days of totals kept (at least one)
+            interval: Seconds between published updates
+            flush_interval: Seconds between saves (also saved on stop)
+            page_every: Seconds between showing the utilization page
+                (0: never)
+            page_seconds: Seconds the page stays up
+            page_layout: Layout of the page
+            metrics: Metrics registry
+        """
+        self.shifts = sorted(shifts, key=lambda shift: shift[1]) or [("day", 0)]
+        self.path = path or state_path("utilization.json")
+        # The current day must survive pruning
+        self.keep_days = max(1, keep_days)
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.page_every = page_every
+        self.page_seconds = page_seconds
+        self.page_layout = page_layout
+        self.on_update: Optional[Callable[[Dict[str, Any]], None]] = None
+        self.metrics = metrics or Metrics()
+        self.machine = "fluidnc"
+        self.bucket = DISCONNECTED
+        self.days: Totals = {}
+        self._since = time.monotonic()
+        # Day, shift, start and end (epoch seconds) of the slot last credited
+        self._slot: Slot = ("", "", 0.0, 0.0)
+        self.load()
+
+    @classmethod
+    def from_config(
+        cls,
+        section: configparser.SectionProxy,
+    ) -> Optional["UtilizationAccountant"]:
+        """Build an accountant from a config section.
+
+        Args:
+            section: Config section (e.g. ``[Utilization]``)
+
+        Returns:
+            Accountant, or None if disabled
+
+        Raises:
+            ValueError: If the shifts are malformed
+        """
+        if not section.getboolean("enabled", True):
+            return None
+        return cls(
+            parse_shifts(section.get("shifts", "")),
+            keep_days=section.getint("keep_days", 35),
+            interval=section.getfloat("interval", 10.0),
+            flush_interval=section.getfloat("flush_interval", 300.0),
+            page_every=section.getfloat("page_every", 0.0),
+            page_seconds=section.getfloat("page_seconds", 5.0),
+            page_layout=section.get("page_layout", "utilization"),
+        )
+
+    def observe(self, update: Dict[str, Any]) -> None:
+        """Account a display update (hot path: a few lookups).
+
+        Args:
+            update: Display state values (``state``, ``connected``, ...)
+        """
+        if update.get("connected") is False:
+            self._switch(DISCONNECTED)
+        elif "state" in update:
+            self._switch(STATE_BUCKETS.get(update["state"], "Idle"))
+
+    def set_machine(self, machine: str) -> None:
+        """Credit time from now on to another machine.
+
+        Args:
+            machine: Machine name (e.g. the controller's mDNS name)
+        """
+        if machine != self.machine:
+            self.tick()
+            self.machine = machine
+
+    def tick(self, now: Optional[float] = None) -> None:
+        """Credit the open interval up to now.
+
+        Args:
+            now: Monotonic time in seconds (default: current time)
+        """
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._since
+        self._since = now
+        if elapsed > 0:
+            end = time.time()
+            self._credit(self.bucket, end - elapsed, end)
+
+    def totals(
+        self,
+        day: Optional[str] = None,
+        shift: Optional[str] = None,
+    ) -> Dict[str, float]:
+        """Get the current machine's totals.
+
+        Args:
+            day: ISO date the shifts started on (default: the day of the
+                current shift)
+            shift: Shift name (default: all shifts of the day)
+
+        Returns:
+            Seconds per bucket
+        """
+        day = day or self._locate(time.time())[0]
+        shifts = self.days.get(day, {}).get(self.machine, {})
+        sums = [0.0] * len(BUCKETS)
+        for name, seconds in shifts.items():
+            if shift is None or name == shift:
+                sums = [a + b for a, b in zip(sums, seconds)]
+        return dict(zip(BUCKETS, sums))
+
+    def current_shift(self, wall: Optional[float] = None) -> str:
+        """Get the name of the shift at a time.
+
+        Args:
+            wall: Epoch seconds (default: now)
+
+        Returns:
+            Shift name
+        """
+        return self._locate(time.time() if wall is None else wall)[1]
+
+    def publish(self) -> Dict[str, Any]:
+        """Bring the totals up to date and publish them as metrics.
+
+        Returns:
+            Display values: ``util_shift`` (name), ``util_shift_run`` and
+            ``util_day_run`` (percent of the time in ``Run``) and
+            ``util_day_run_time`` (``H:MM`` in ``Run`` on the current
+            shift's day)
+        """
+        self.tick()
+        shift = self.current_shift()
+        day = self.totals()
+        in_shift = self.totals(shift=shift)
+        for bucket, seconds in day.items():
+            self.metrics.set(f"util_day_{bucket.lower()}_s", round(seconds))
+        shift_pct = _percent(in_shift)
+        day_pct = _percent(day)
+        self.metrics.set("util_shift", shift)
+        self.metrics.set("util_shift_run_pct", shift_pct)
+        self.metrics.set("util_day_run_pct", day_pct)
+        minutes = int(day[RUN] // 60)
+        return {
+            "util_shift": shift.upper(),
+            "util_shift_run": shift_pct,
+            "util_day_run": day_pct,
+            "util_day_run_time": f"{minutes // 60}:{minutes % 60:02d}",
+        }
+
+    def load(self) -> None:
+        """Load persisted totals, keeping empty totals if unavailable."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Failed to read utilization %s: %s", self.path, str(e))
+            return
+        if data.get("buckets") != list(BUCKETS):
+            logger.warning("Ignoring utilization %s with other buckets", self.path)
+            return
+        self.days = data.get("days", {})
+        self.machine = data.get("machine", self.machine)
+
+    def save(self) -> None:
+        """Persist the totals (including the open interval)."""
+        self._write(self._dump())
+
+    async def run(self) -> None:
+        """Publish the totals at the interval and save them until cancelled."""
+        saved = time.monotonic()
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                values = self.publish()
+                if self.on_update:
+                    self.on_update(values)
+                if time.monotonic() - saved >= self.flush_interval:
+                    saved = time.monotonic()
+                    # Serialized here; the loop keeps mutating the totals
+                    await asyncio.to_thread(self._write, self._dump())
+        finally:
+            self.save()
+
+    def _dump(self) -> str:
+        """Serialize the totals up to now."""
+        self.tick()
+        days = {
+            day: {
+                machine: {
+                    shift: [round(seconds, 1) for seconds in totals]
+                    for shift, totals in shifts.items()
+                }
+                for machine, shifts in machines.items()
+            }
+            for day, machines in self.days.items()
+        }
+        data = {"buckets": list(BUCKETS), "machine": self.machine, "days": days}
+        return json.dumps(data, separators=(",", ":"))
+
+    def _write(self, text: str) -> None:
+        """Replace the persistence file atomically."""
+        tmp = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning("Failed to save utilization %s: %s", self.path, str(e))
+
+    def _switch(self, bucket: str) -> None:
+        """Close the open interval if the bucket changes."""
+        if bucket != self.bucket:
+            self.tick()
+            self.bucket = bucket
+
+    def _credit(self, bucket: str, start: float, end: float) -> None:
+        """Add an interval to the totals, split at slot boundaries.
+
+        Args:
+            bucket: Bucket the interval belongs to
+            start: Interval start in epoch seconds
+            end: Interval end in epoch seconds
+        """
+        index = BUCKETS.index(bucket)
+        while start < end:
+            day, shift, slot_start, slot_end = self._slot
+            if not slot_start <= start < slot_end:
+                day, shift, slot_start, slot_end = self._slot = self._locate(start)
+            stop = min(end, slot_end)
+            totals = self._totals(day, shift)
+            totals[index] += stop - start
+            start = stop
+
+    def _totals(self, day: str, shift: str) -> List[float]:
+        """Get (creating) the totals list of the current machine."""
+        if day not in self.days:
+            self.days[day] = {}
+            self._prune()
+        shifts = self.days[day].setdefault(self.machine, {})
+        if shift not in shifts:
+            shifts[shift] = [0.0] * len(BUCKETS)
+        return shifts[shift]
+
+    def _prune(self) -> None:
+        """Drop days beyond ``keep_days``."""
+        for day in sorted(self.days)[: -self.keep_days or None]:
+            del self.days[day]
+
+    def _locate(self, wall: float) -> Slot:
+        """Find the slot containing a time.
+
+        Args:
+            wall: Epoch seconds
+
+        Returns:
+            ISO date the shift started on, shift name, slot start and slot
+            end in epoch seconds
+        """
+        moment = datetime.datetime.fromtimestamp(wall)
+        midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        minute = moment.hour * 60 + moment.minute
+        if minute < self.shifts[0][1]:
+            # Before the first start the previous day's last shift continues
+            midnight -= datetime.timedelta(days=1)
+            minute += 24 * 60
+        name, first, last = "", 0, self.shifts[0][1] + 24 * 60
+        for shift_name, start in self.shifts:
+            if start > minute:
+                last = start
+                break
+            name, first = shift_name, start
+        start = midnight + datetime.timedelta(minutes=first)
+        end = midnight + datetime.timedelta(minutes=last)
+        return midnight.date().isoformat(), name, start.timestamp(), end.timestamp()
+
+
+def _percent(totals: Dict[str, float]) -> float:
+    """Share of the accounted time spent in ``Run``, in percent."""
+    total = sum(totals.values())
+    return round(100.0 * totals[RUN] / total, 1) if total else 0.0
@@ -0,0 +1,206 @@
+"""Stale-data watchdog for the controller link.
+
+A connection can stay open while the controller has stopped answering,
+and the panel would then keep showing the last coordinates as if they
+were live. The watchdog tracks the age of the last status report and
+escalates as it grows: ``stale`` (coordinates dimmed), ``lost`` and
+finally a forced reconnect. Feeding it is a single timestamp store on
+the message path; all checks run in a separate task on a monotonic
+timer.
+
+The same task pings the systemd watchdog (``sd_notify``) when the
+service runs with ``WatchdogSec=``, so a wedged event loop gets the
+process restarted.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Awaitable, Callable, Optional
+
+from fluidnc_ledscreen.metrics import Metrics
+from fluidnc_ledscreen.runtime import spawn
+
+logger = logging.getLogger(__name__)
+
+LIVE = "live"
+STALE = "stale"
+LOST = "lost"
+
+# Type aliases
+LevelCallback = Callable[[str], None]
+ReconnectCallback = Callable[[], Awaitable[None]]
+
+
+class SystemdNotifier:
+    """Minimal ``sd_notify`` client.
+
+    Messages go to the datagram socket named by ``NOTIFY_SOCKET``. Without
+    that variable (not running under systemd) every call is a no-op.
+
+    Attributes:
+        watchdog_interval: Seconds between watchdog pings requested by the
+            service manager (half of ``WATCHDOG_USEC``), or None
+    """
+
+    def __init__(self) -> None:
+        """Initialize the notifier from the environment."""
+        address = os.environ.get("NOTIFY_SOCKET")
+        if address and address.startswith("@"):
+            # Abstract namespace socket
+            address = "\0" + address[1:]
+        self._address = address
+        self._socket: Optional[socket.socket] = None
+        usec = os.environ.get("WATCHDOG_USEC")
+        pid = os.environ.get("WATCHDOG_PID")
+        if usec and (not pid or pid == str(os.getpid())):
+            self.watchdog_interval: Optional[float] = int(usec) / 2e6
+        else:
+            self.watchdog_interval = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a service manager is listening."""
+        return bool(self._address)
+
+    def notify(self, message: str) -> None:
+        """Send a notification.
+
+        Args:
+            message: Newline-separated ``KEY=value`` assignments
+        """
+        if not self._address:
+            return
+        try:
+            if self._socket is None:
+                self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                self._socket.setblocking(False)
+            self._socket.sendto(message.encode(), self._address)
+        except OSError as e:
+            # Runs every check interval; a full socket buffer must not
+            # flood the log
+            logger.debug("sd_notify failed: %s", str(e))
+
+    def close(self) -> None:
+        """Close the notification socket."""
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+class StatusWatchdog:
+    """Escalates a silent controller from live to stale, lost and reconnect.
+
+    Attributes:
+        level: Current link level (``live``, ``stale`` or ``lost``)
+    """
+
+    def __init__(
+        self,
+        on_level: LevelCallback,
+        reconnect: ReconnectCallback,
+        stale_after: float = 3.0,
+        lost_after: float = 10.0,
+        reconnect_after: float = 20.0,
+        metrics: Optional[Metrics] = None,
+        notifier: Optional[SystemdNotifier] = None,
+    ) -> None:
+        """Initialize the watchdog.
+
+        Args:
+            on_level: Called with the new level whenever it changes
+            reconnect: Coroutine function dropping the connection so it is
+                re-established
+            stale_after: Report age in seconds at which data is stale
+            lost_after: Report age in seconds at which the link is lost
+            reconnect_after: Report age in seconds that forces a reconnect
+                (0 disables)
+            metrics: Metrics registry
+            notifier: systemd notifier (default: from the environment)
+        """
+        self.on_level = on_level
+        self.reconnect = reconnect
+        self.stale_after = stale_after
+        self.lost_after = max(lost_after, stale_after)
+        self.reconnect_after = reconnect_after
+        self.metrics = metrics or Metrics()
+        self.notifier = notifier or SystemdNotifier()
+        self.level = LIVE
+        self._last_report = time.monotonic()
+        self._last_reconnect = 0.0
+        self._task: Optional[asyncio.Task] = None
+        interval = min(0.5, stale_after / 4)
+        if self.notifier.watchdog_interval:
+            interval = min(interval, self.notifier.watchdog_interval)
+        self.check_interval = interval
+
+    def feed(self) -> None:
+        """Record a valid status report (hot path: one store)."""
+        self._last_report = time.monotonic()
+
+    def start(self) -> None:
+        """Start checking and tell the service manager we are ready."""
+        self.stop()
+        self._last_report = time.monotonic()
+        self._task = spawn(self._run())
+        self.notifier.notify("READY=1")
+
+    def stop(self) -> None:
+        """Stop checking."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def close(self) -> None:
+        """Stop checking and tell the service manager we are stopping."""
+        self.stop()
+        self.notifier.notify("STOPPING=1")
+        self.notifier.close()
+
+    def _level_for(self, age: float) -> str:
+        """Get the link level for a report age in seconds."""
+        if age >= self.lost_after:
+            return LOST
+        if age >= self.stale_after:
+            return STALE
+        return LIVE
+
+    async def _run(self) -> None:
+        """Check the report age until cancelled."""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            self.notifier.notify("WATCHDOG=1")
+            now = time.monotonic()
+            age = now - self._last_report
+            level = self._level_for(age)
+            if level != self.level:
+                self._set_level(level, age)
+            # Give each new connection a full period before forcing another
+            quiet = now - max(self._last_report, self._last_reconnect)
+            if self.reconnect_after and quiet >= self.reconnect_after:
+                logger.warning("No status report for %.1f s, reconnecting", age)
+                self.metrics.inc("watchdog_reconnects")
+                self._last_reconnect = now
+                try:
+                    await self.reconnect()
+                except (ConnectionError, OSError) as e:
+                    logger.error("Forced reconnect failed: %s", str(e))
+
+    def _set_level(self, level: str, age: float) -> None:
+        """Publish a level change.
+
+        Args:
+            level: New level
+            age: Report age in seconds
+        """
+        if level == LIVE:
+            logger.info("Status reports resumed")
+        else:
+            logger.warning("No status report for %.1f s, link %s", age, level)
+            self.metrics.inc(f"watchdog_{level}")
+        self.level = level
+        self.metrics.set("watchdog_level", level)
+        self.notifier.notify(f"STATUS=Controller link {level}")
+        self.on_level(level)
@@ -1,39 +1,59 @@
 """WebSocket client for FluidNC communication.
 
-This module handles WebSocket communication with the FluidNC controller,
-managing connection, message handling, and reconnection logic.
+This module handles communication with the FluidNC controller, managing
+connection, message handling, and reconnection logic. The bytes travel
+over a :class:`~fluidnc_ledscreen.transport.Transport`, WebSocket by
+default or raw TCP where configured.
 """
 
 import asyncio
 import json
 import logging
+import time
 from typing import Any, Callable, Dict, Optional
 
-import websockets
-from websockets.exceptions import (
-    ConnectionClosed,
-    ConnectionError,
-    InvalidStatusCode,
-    WebSocketException,
+from fluidnc_ledscreen.bootstrap import Bootstrapper
+from fluidnc_ledscreen.capabilities import (
+    Capabilities,
+    CapabilityCache,
+    CapabilityProbe,
+)
+from fluidnc_ledscreen.connection_profile import ConnectionProfile
+from fluidnc_ledscreen.metrics import Metrics
+from fluidnc_ledscreen.runtime import spawn
+from fluidnc_ledscreen.status import StatusParser
+from fluidnc_ledscreen.transport import (
+    LineSplitter,
+    Transport,
+    TransportClosed,
+    WebSocketTransport,
 )
 
 logger = logging.getLogger(__name__)
 
 # Type aliases
 MessageCallback = Callable[[Dict[str, Any]], None]
-WSProtocol = websockets.WebSocketClientProtocol
+ConnectionCallback = Callable[[], None]
 
 
 class WebSocketClient:
     """WebSocket client for FluidNC communication.
 
-    This class manages the WebSocket connection to FluidNC, handling
-    connection, message processing, and automatic reconnection.
+    This class manages the connection to FluidNC, handling connection,
+    message processing, and automatic reconnection.
 
     Attributes:
         url: WebSocket URL to connect to
         reconnect_interval: Time between reconnection attempts
         message_callback: Callback function for received messages
+        on_connect: Callback invoked after each successful connection
+        on_disconnect: Callback invoked when the connection is lost
+        profile: Connection tuning (compression, pings, limits, timeouts)
+        metrics: Metrics registry receiving handshake and RTT timings
+        transport: Byte transport carrying the line protocol
+        bootstrapper: Picks the controller address on each connect
+        capability_cache: Controller capabilities from earlier connections
+        capabilities: Capabilities of the connected controller, if known
     """
 
     def __init__(
@@ -41,75 +61,281 @@ class WebSocketClient:
         url: str,
         reconnect_interval: float = 5.0,
         message_callback: Optional[MessageCallback] = None,
+        on_connect: Optional[ConnectionCallback] = None,
+        on_disconnect: Optional[ConnectionCallback] = None,
+        profile: Optional[ConnectionProfile] = None,
+        metrics: Optional[Metrics] = None,
+        transport: Optional[Transport] = None,
+        bootstrapper: Optional[Bootstrapper] = None,
+        capability_cache: Optional[CapabilityCache] = None,
     ) -> None:
         """Initialize the WebSocket client.
 
         Args:
-            url: WebSocket URL to connect to
+            url: WebSocket URL to connect to (ignored with ``transport``)
             reconnect_interval: Time between reconnection attempts
             message_callback: Callback function for received messages
+            on_connect: Callback invoked after each successful connection
+            on_disconnect: Callback invoked when the connection is lost
+            profile: Connection tuning (default: :class:`ConnectionProfile`)
+            metrics: Metrics registry
+            transport: Transport to use (default: WebSocket to ``url``)
+            bootstrapper: Races candidate controller addresses on each
+                connect; replaces ``transport`` with the winner
+            capability_cache: Capability store (default:
+                :class:`CapabilityCache`)
         """
         self.url = url
         self.reconnect_interval = reconnect_interval
         self.message_callback = message_callback
-        self.websocket: Optional[WSProtocol] = None
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+        self.profile = profile or ConnectionProfile()
+        self.metrics = metrics or Metrics()
+        self.transport = transport or WebSocketTransport(url, self.profile)
+        self.bootstrapper = bootstrapper
+        self.capability_cache = capability_cache or CapabilityCache()
+        self.capabilities: Optional[Capabilities] = None
+        self.parser = StatusParser()
+        self.splitter = LineSplitter()
         self.running = False
         self._connection_task: Optional[asyncio.Task] = None
+        self._rtt_task: Optional[asyncio.Task] = None
+        self._capability_task: Optional[asyncio.Task] = None
+        self._probe: Optional[CapabilityProbe] = None
+        self._status_seen = asyncio.Event()
+        self._axes: Optional[int] = None
+        self._done = asyncio.Event()
+        self._error: Optional[BaseException] = None
+
+    @property
+    def controller(self) -> str:
+        """Identity of the connected controller: mDNS name or address."""
+        if self.bootstrapper and self.bootstrapper.controller:
+            return self.bootstrapper.controller
+        return self.transport.address
+
+    async def run(self) -> None:
+        """Connect and stay connected until disconnected.
+
+        Runs as a supervised service: the reader reconnects by itself
+        after a lost connection, and when that fails the error is raised
+        here so the supervisor retries with backoff.
+
+        Raises:
+            OSError: If the connection cannot be established
+            asyncio.TimeoutError: If the handshake times out
+        """
+        self._done.clear()
+        self._error = None
+        await self.connect()
+        await self._done.wait()
+        if self._error is not None:
+            raise self._error
 
     async def connect(self) -> None:
-        """Establish WebSocket connection."""
+        """Establish the connection."""
         try:
-            self.websocket = await websockets.connect(self.url)
-            logger.info("Connected to FluidNC WebSocket")
+            started = time.perf_counter()
+            if self.bootstrapper:
+                self.transport = await self.bootstrapper.open()
+            else:
+                await self.transport.open()
+            handshake_ms = (time.perf_counter() - started) * 1000
+            self.metrics.set("link_handshake_ms", handshake_ms)
+            self.metrics.set("link_transport", self.transport.name)
+            self.metrics.inc("link_connects")
+            logger.info(
+                "Connected to FluidNC %s at %s in %.1f ms",
+                self.transport.name,
+                self.transport.address,
+                handshake_ms,
+            )
+            self.splitter.reset()
             self.running = True
-            self._connection_task = asyncio.create_task(self._handle_messages())
-        except (ConnectionError, InvalidStatusCode) as e:
+            self._connection_task = spawn(self._handle_messages())
+            if self.profile.rtt_interval:
+                self._rtt_task = spawn(self._measure_rtt())
+            self._load_capabilities()
+            if self.on_connect:
+                self.on_connect()
+        except (OSError, asyncio.TimeoutError) as e:
             logger.error("Failed to connect to FluidNC: %s", str(e))
             self.running = False
             raise
 
     async def disconnect(self) -> None:
-        """Close WebSocket connection."""
+        """Close the connection."""
         self.running = False
-        if self.websocket:
-            try:
-                await self.websocket.close()
-            except WebSocketException as e:
-                logger.error("Error closing connection: %s", str(e))
-            finally:
-                self.websocket = None
+        self._done.set()
+        await self.transport.close()
         if self._connection_task:
             self._connection_task.cancel()
             self._connection_task = None
+        self._stop_rtt()
+        self._stop_capabilities()
+
+    async def force_reconnect(self) -> None:
+        """Drop an open but unresponsive connection.
+
+        The reader sees the transport close and goes through the normal
+        reconnect path.
+        """
+        if self.transport.is_open:
+            logger.warning("Dropping unresponsive link to %s", self.transport.address)
+            self.metrics.inc("link_forced_reconnects")
+            await self.transport.close()
+
+    async def _measure_rtt(self) -> None:
+        """Sample the link round-trip time where the transport supports it."""
+        timeout = self.profile.ping_timeout or self.profile.rtt_interval
+        while self.running and self.transport.is_open:
+            await asyncio.sleep(self.profile.rtt_interval)
+            try:
+                rtt = await self.transport.ping(timeout)
+            except (asyncio.TimeoutError, TransportClosed):
+                self.metrics.inc("link_ping_timeouts")
+                continue
+            if rtt is None:
+                return
+            self.metrics.set("link_rtt_ms", rtt * 1000)
+
+    def _stop_rtt(self) -> None:
+        """Stop sampling the round-trip time."""
+        if self._rtt_task:
+            self._rtt_task.cancel()
+            self._rtt_task = None
+
+    def _load_capabilities(self) -> None:
+        """Publish cached capabilities and schedule their revalidation.
+
+        The cached entry is used immediately; the controller is only
+        asked once status reports flow, so no settings round trip delays
+        the first frame.
+        """
+        cached = self.capability_cache.get(self.controller)
+        self.capabilities = cached
+        if cached is not None:
+            logger.info("Using cached capabilities of %s", self.controller)
+            self.metrics.set("capabilities_source", "cache")
+            self._publish_capabilities(cached)
+        self._status_seen.clear()
+        self._capability_task = spawn(self._revalidate_capabilities())
+
+    async def _revalidate_capabilities(self) -> None:
+        """Ask the controller for its capabilities in the background."""
+        await self._status_seen.wait()
+        self._probe = CapabilityProbe(axes=self._axes)
+        started = time.perf_counter()
+        try:
+            reported = await self._probe.run(self.send)
+        finally:
+            self._probe = None
+        if reported is None:
+            logger.warning("Controller did not report its capabilities")
+            return
+        self.metrics.set("capabilities_ms", (time.perf_counter() - started) * 1000)
+        if reported == self.capabilities:
+            return
+        if self.capabilities and reported.build != self.capabilities.build:
+            logger.info("Firmware changed to %s", reported.build)
+        controller = self.controller
+        logger.info("Capabilities of %s: %s", controller, reported)
+        self.capabilities = reported
+        self.metrics.set("capabilities_source", "controller")
+        self.capability_cache.put(controller, reported)
+        self._publish_capabilities(reported)
+
+    def _publish_capabilities(self, capabilities: Capabilities) -> None:
+        """Hand capabilities to the message callback."""
+        if self.message_callback:
+            self.message_callback(capabilities.to_message())
+
+    def _stop_capabilities(self) -> None:
+        """Stop revalidating capabilities."""
+        if self._capability_task:
+            self._capability_task.cancel()
+            self._capability_task = None
+        self._probe = None
+
+    async def send(self, line: str) -> None:
+        """Send one protocol line to FluidNC.
+
+        Lines sent while disconnected are dropped; the reconnect logic
+        restarts whoever is sending once the connection is back.
+
+        Args:
+            line: Command or realtime character (e.g. ``?``)
+        """
+        if not self.transport.is_open:
+            return
+        try:
+            await self.transport.write(line if line == "?" else line + "\n")
+        except TransportClosed as e:
+            logger.error("Error sending message: %s", str(e))
 
     async def _handle_messages(self) -> None:
-        """Handle incoming WebSocket messages."""
-        while self.running and self.websocket:
+        """Handle incoming messages until the connection is lost."""
+        while self.running and self.transport.is_open:
             try:
-                msg = await self.websocket.recv()
-                await self._process_message(msg)
-            except ConnectionClosed:
-                logger.warning("WebSocket connection closed")
-                await self._reconnect()
-            except WebSocketException as e:
-                logger.error("Error handling message: %s", str(e))
+                chunk = await self.transport.recv()
+            except TransportClosed as e:
+                logger.warning("Connection closed: %s", str(e))
+                self._lost()
+                # A successful reconnect starts a new reader task
                 await self._reconnect()
+                return
+            self._process_chunk(chunk)
 
-    async def _process_message(self, message: str) -> None:
-        """Process received WebSocket message.
+    def _lost(self) -> None:
+        """Notify the owner that the connection was lost."""
+        self._stop_rtt()
+        self._stop_capabilities()
+        self.metrics.inc("link_disconnects")
+        if self.on_disconnect:
+            self.on_disconnect()
+
+    def _process_chunk(self, chunk: Any) -> None:
+        """Process received protocol output.
+
+        FluidNC sends protocol output as text or binary frames (or a raw
+        byte stream over TCP), with any number of lines per chunk.
 
         Args:
-            message: Raw message string from WebSocket
+            chunk: Received text or bytes
         """
-        try:
-            data = json.loads(message)
+        for line in self.splitter.feed(chunk):
+            data = self._parse_line(line)
+            if data is None:
+                continue
+            if data.get("type") == "status" and not self._status_seen.is_set():
+                if "mpos" in data:
+                    self._axes = len(data["mpos"])
+                self._status_seen.set()
+            if self._probe and self._probe.observe(data):
+                continue
             if self.message_callback:
                 self.message_callback(data)
-        except json.JSONDecodeError as e:
-            logger.error("Failed to parse message: %s", str(e))
+
+    def _parse_line(self, line: str) -> Optional[Dict[str, Any]]:
+        """Parse one received line.
+
+        Args:
+            line: Protocol line or JSON document
+
+        Returns:
+            Parsed data, or None if the line carries no information
+        """
+        if line.startswith("{"):
+            try:
+                return json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error("Failed to parse message: %s", str(e))
+                return None
+        return self.parser.parse(line)
 
     async def _reconnect(self) -> None:
-        """Attempt to reconnect to WebSocket."""
+        """Attempt to reconnect."""
         if not self.running:
             return
 
@@ -117,9 +343,12 @@ class WebSocketClient:
             "Attempting to reconnect in %s seconds",
             self.reconnect_interval,
         )
+        await self.transport.close()
         await asyncio.sleep(self.reconnect_interval)
         try:
             await self.connect()
-        except (ConnectionError, InvalidStatusCode) as e:
+        except (OSError, asyncio.TimeoutError) as e:
             logger.error("Reconnection failed: %s", str(e))
             self.running = False
+            self._error = e
+            self._done.set()
@@ -0,0 +1,163 @@
+"""Address racing with fake transports of controlled speed."""
+
+import asyncio
+
+import pytest
+
+from fluidnc_ledscreen import bootstrap
+from fluidnc_ledscreen.bootstrap import (
+    SOURCE_CACHE,
+    SOURCE_MDNS,
+    SOURCE_STATIC,
+    AddressCache,
+    Bootstrapper,
+)
+
+
+class FakeTransport:
+    """Opens after ``delay`` seconds, or once ``gate`` is set; may fail."""
+
+    def __init__(self, host, delay=0.0, fail=False, gate=None):
+        """Initialize the transport."""
+        self.address = host
+        self.delay = delay
+        self.fail = fail
+        self.gate = gate
+        self.opened = False
+        self.cancelled = False
+        self.closed = False
+
+    async def open(self):
+        try:
+            if self.gate:
+                await self.gate.wait()
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise ConnectionRefusedError(f"{self.address} refused")
+        self.opened = True
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def controllers(monkeypatch):
+    """Hosts to fake transports; unknown hosts refuse at once."""
+    made = {}
+
+    def create_transport(kind, host, port=None, profile=None):
+        made[host] = made.get(host) or FakeTransport(host, fail=True)
+        return made[host]
+
+    monkeypatch.setattr(bootstrap, "create_transport", create_transport)
+    return made
+
+
+def make_bootstrapper(tmp_path, static_host=None, cached=None):
+    cache = AddressCache(str(tmp_path / "last_controller.json"))
+    if cached:
+        cache.save("websocket", cached)
+    return Bootstrapper("websocket", static_host, cache=cache, discovery=False)
+
+
+def test_fastest_candidate_wins_and_losers_are_cancelled(tmp_path, controllers):
+    controllers["10.0.0.1"] = FakeTransport("10.0.0.1", delay=30)
+    controllers["10.0.0.2"] = FakeTransport("10.0.0.2", delay=0.01)
+    bootstrapper = make_bootstrapper(tmp_path, "10.0.0.1", cached="10.0.0.2")
+
+    transport = asyncio.run(asyncio.wait_for(bootstrapper.open(), 5))
+
+    assert transport is controllers["10.0.0.2"]
+    assert (bootstrapper.host, bootstrapper.source) == ("10.0.0.2", SOURCE_CACHE)
+    assert bootstrapper.metrics.get("bootstrap_source") == SOURCE_CACHE
+    loser = controllers["10.0.0.1"]
+    assert loser.cancelled and loser.closed and not loser.opened
+    assert not transport.closed
+
+
+def test_failed_candidates_do_not_end_the_race(tmp_path, controllers):
+    controllers["10.0.0.1"] = FakeTransport("10.0.0.1", fail=True)
+    controllers["10.0.0.2"] = FakeTransport("10.0.0.2", delay=0.05)
+    bootstrapper = make_bootstrapper(tmp_path, "10.0.0.1", cached="10.0.0.2")
+
+    assert asyncio.run(bootstrapper.open()) is controllers["10.0.0.2"]
+
+
+def test_all_candidates_failing_raises(tmp_path, controllers):
+    controllers["10.0.0.2"] = FakeTransport("10.0.0.2", delay=0.02, fail=True)
+    bootstrapper = make_bootstrapper(tmp_path, "10.0.0.1", cached="10.0.0.2")
+
+    with pytest.raises(ConnectionRefusedError, match="10.0.0.1"):
+        asyncio.run(bootstrapper.open())
+    assert bootstrapper.host is None
+
+
+def test_late_finishers_are_closed(tmp_path, controllers):
+    async def race():
+        gate = asyncio.Event()
+        controllers["10.0.0.1"] = FakeTransport("10.0.0.1", gate=gate)
+        controllers["10.0.0.2"] = FakeTransport("10.0.0.2", gate=gate)
+        bootstrapper = make_bootstrapper(tmp_path, "10.0.0.1", cached="10.0.0.2")
+        opening = asyncio.create_task(bootstrapper.open())
+        await asyncio.sleep(0.01)
+        # Both handshakes complete before the race looks at the results
+        gate.set()
+        return await opening
+
+    winner = asyncio.run(race())
+    both = [controllers["10.0.0.1"], controllers["10.0.0.2"]]
+    assert all(transport.opened for transport in both)
+    (loser,) = [transport for transport in both if transport is not winner]
+    assert loser.closed and not winner.closed
+
+
+def test_static_winner_is_cached_and_tried_first_next_time(tmp_path, controllers):
+    controllers["10.0.0.1"] = FakeTransport("10.0.0.1")
+    bootstrapper = make_bootstrapper(tmp_path, "10.0.0.1")
+
+    asyncio.run(bootstrapper.open())
+
+    assert bootstrapper.source == SOURCE_STATIC
+    assert bootstrapper.cache.load("websocket") == "10.0.0.1"
+    assert bootstrapper.candidates()[0] == ("10.0.0.1", SOURCE_STATIC)
+
+
+def test_discovered_candidate_joins_the_race(tmp_path, controllers, monkeypatch):
+    controllers["10.0.0.1"] = FakeTransport("10.0.0.1", delay=30)
+    controllers["10.0.0.9"] = FakeTransport("10.0.0.9", delay=0.01)
+
+    async def browse(self, attempt, results):
+        await asyncio.sleep(0.02)
+        self.names["10.0.0.9"] = "router._fluidnc._tcp.local."
+        attempt("10.0.0.9", SOURCE_MDNS)
+        await asyncio.sleep(30)
+
+    monkeypatch.setattr(Bootstrapper, "_browse", browse)
+    bootstrapper = make_bootstrapper(tmp_path, "10.0.0.1")
+    bootstrapper.discovery = True
+
+    transport = asyncio.run(asyncio.wait_for(bootstrapper.open(), 5))
+
+    assert transport is controllers["10.0.0.9"]
+    assert bootstrapper.controller == "router._fluidnc._tcp.local."
+    assert controllers["10.0.0.1"].cancelled
+    assert bootstrapper.cache.entry("websocket")["name"] == bootstrapper.controller
+
+
+def test_race_waits_for_discovery_before_giving_up(tmp_path, controllers, monkeypatch):
+    controllers["10.0.0.9"] = FakeTransport("10.0.0.9", delay=0.01)
+
+    async def browse(self, attempt, results):
+        # The static address has failed long before this shows up
+        await asyncio.sleep(0.1)
+        attempt("10.0.0.9", SOURCE_MDNS)
+        results.put_nowait(None)
+
+    monkeypatch.setattr(Bootstrapper, "_browse", browse)
+    bootstrapper = make_bootstrapper(tmp_path, "10.0.0.1")
+    bootstrapper.discovery = True
+
+    assert asyncio.run(bootstrapper.open()) is controllers["10.0.0.9"]
@@ -0,0 +1,77 @@
+"""Capability probing without leaking its replies to the display."""
+
+import asyncio
+
+from fluidnc_ledscreen.capabilities import (
+    Capabilities,
+    CapabilityCache,
+    CapabilityProbe,
+)
+from fluidnc_ledscreen.status import StatusParser
+from fluidnc_ledscreen.websocket_client import WebSocketClient
+
+# Replies of FluidNC to $I and $G
+PROBE_REPLIES = [
+    "[VER:3.7 FluidNC v3.7.8:]",
+    "[OPT:PHS]",
+    "[MSG: Machine: Router]",
+    "[MSG: Mode=STA:SSID=shop:Status=Connected:IP=10.0.1.82:MAC=00-11]",
+    "ok",
+    "[GC:G0 G54 G17 G20 G90 G94 M5 M9 T0 F0 S0]",
+    "ok",
+]
+
+
+def feed(probe, lines):
+    parser = StatusParser()
+    return [probe.observe(parser.parse(line)) for line in lines]
+
+
+def test_probe_consumes_its_replies():
+    probe = CapabilityProbe(axes=3)
+    assert feed(probe, PROBE_REPLIES) == [True] * len(PROBE_REPLIES)
+    assert probe._complete.is_set()
+
+
+def test_probe_passes_other_lines_on():
+    probe = CapabilityProbe(axes=3)
+    lines = ["ok", "[MSG:INFO: Homing done]", "<Idle|MPos:0.000,0.000,0.000>"]
+    assert feed(probe, lines) == [False, False, False]
+    assert not probe._complete.is_set()
+
+
+def test_probe_completes_after_the_last_reply():
+    async def probe_controller():
+        probe = CapabilityProbe(axes=4)
+        sent = []
+
+        async def send(line):
+            sent.append(line)
+            if line == "$G":
+                feed(probe, PROBE_REPLIES)
+
+        return await probe.run(send), sent
+
+    capabilities, sent = asyncio.run(probe_controller())
+    assert sent == ["$I", "$G"]
+    assert capabilities == Capabilities(
+        build="3.7 FluidNC v3.7.8",
+        firmware="FluidNC v3.7.8",
+        options="PHS",
+        axes=4,
+        units="inch",
+    )
+
+
+def test_probe_replies_are_not_forwarded(tmp_path):
+    received = []
+    client = WebSocketClient(
+        "ws://127.0.0.1:81",
+        message_callback=received.append,
+        capability_cache=CapabilityCache(str(tmp_path / "capabilities.json")),
+    )
+    client._probe = CapabilityProbe(axes=3)
+    lines = ["<Idle|MPos:0.000,0.000,0.000>", "ok", *PROBE_REPLIES, "[MSG:Reset]"]
+    client._process_chunk("\r\n".join(lines) + "\r\n")
+    assert [message["type"] for message in received] == ["status", "ok", "message"]
+    assert received[-1]["message"] == "Reset"
@@ -0,0 +1,36 @@
+"""Connection profiles from the configuration."""
+
+import configparser
+
+import pytest
+
+from fluidnc_ledscreen.connection_profile import ConnectionProfile
+
+
+def section(**options):
+    parser = configparser.ConfigParser()
+    parser["Connection"] = options
+    return parser["Connection"]
+
+
+def test_preset_with_overrides():
+    profile = ConnectionProfile.from_config(
+        section(profile="wifi", max_size="4096", ping_timeout="1.5")
+    )
+    assert profile == ConnectionProfile(
+        ping_interval=5.0, ping_timeout=1.5, max_size=4096, open_timeout=5.0
+    )
+
+
+def test_none_disables_options():
+    profile = ConnectionProfile.from_config(
+        section(compression="none", ping_interval="none", rtt_interval="none")
+    )
+    assert profile.compression is None
+    assert profile.ping_interval is None
+    assert profile.rtt_interval == 0.0
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        ConnectionProfile.from_config(section(profile="satellite"))
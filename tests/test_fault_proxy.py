@@ -0,0 +1,62 @@
+"""Fault proxy links between a local client and a local target."""
+
+import asyncio
+
+import pytest
+from fault_proxy import FaultProxy
+
+
+async def echo(reader, writer):
+    while data := await reader.read(1024):
+        writer.write(data)
+        await writer.drain()
+    writer.close()
+
+
+async def proxied(session):
+    """Run ``session(proxy, reader, writer)`` through a proxy to an echo."""
+    target = await asyncio.start_server(echo, "127.0.0.1", 0)
+    proxy = FaultProxy(target.sockets[0].getsockname()[:2])
+    await proxy.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", proxy.port)
+        await session(proxy, reader, writer)
+    finally:
+        await proxy.stop()
+        target.close()
+        await target.wait_closed()
+
+
+async def wait_for_links(proxy, count):
+    for _ in range(200):
+        if len(proxy.links) == count:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"{len(proxy.links)} links open, expected {count}")
+
+
+def test_traffic_passes():
+    async def session(proxy, reader, writer):
+        writer.write(b"?\n")
+        assert await asyncio.wait_for(reader.readline(), 2) == b"?\n"
+        writer.close()
+        await wait_for_links(proxy, 0)
+
+    asyncio.run(proxied(session))
+
+
+def test_half_open_link_ends_when_the_client_gives_up():
+    async def session(proxy, reader, writer):
+        writer.write(b"?\n")
+        await asyncio.wait_for(reader.readline(), 2)
+        proxy.inject("half-open")
+        writer.write(b"?\n")
+        await writer.drain()
+        # Nothing comes back, and the target never hangs up
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(reader.read(1024), 0.2)
+        assert len(proxy.links) == 1
+        writer.close()
+        await wait_for_links(proxy, 0)
+
+    asyncio.run(proxied(session))
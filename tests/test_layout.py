@@ -0,0 +1,30 @@
+"""Layout compilation."""
+
+import pytest
+
+from fluidnc_ledscreen.fonts import DEFAULT_FONT_DIR
+from fluidnc_ledscreen.layout import (
+    LAYOUTS,
+    compile_layout,
+    load_color_scheme,
+    load_layout,
+)
+
+
+# A ticker's own height must not leak into the plan (default and xy)
+@pytest.mark.parametrize("size", [(64, 32), (128, 64)])
+@pytest.mark.parametrize("font_dir", [DEFAULT_FONT_DIR, "missing"])
+@pytest.mark.parametrize("layout", list(LAYOUTS))
+def test_plan_keeps_canvas_size(layout, font_dir, size, tmp_path):
+    if font_dir == "missing":
+        # Every font falls back to the built-in glyphs
+        font_dir = str(tmp_path)
+    width, height = size
+    plan = compile_layout(
+        load_layout(layout),
+        width,
+        height,
+        load_color_scheme("default"),
+        font_dir=font_dir,
+    )
+    assert (plan.width, plan.height) == (width, height)
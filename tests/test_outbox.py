@@ -0,0 +1,236 @@
+"""Outbox delivery and machine event detection.
+
+Delivery runs :meth:`Outbox.run` in-process against the stand-in
+receiver of ``tools/outbox_receiver.py`` or an in-memory sink.
+"""
+
+import asyncio
+import json
+import os
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+from outbox_receiver import Receiver, make_handler
+
+from fluidnc_ledscreen.outbox import (
+    EVENT_ALARM,
+    EVENT_JOB_COMPLETE,
+    Outbox,
+    TransitionDetector,
+    WebhookSink,
+)
+
+# Kept before tests patch ``asyncio.sleep`` to record the backoff
+real_sleep = asyncio.sleep
+
+
+class MemorySink:
+    """Records delivered batches; fails while ``fail`` is set."""
+
+    def __init__(self, name="memory", fail=False):
+        """Initialize the sink."""
+        self.name = name
+        self.fail = fail
+        self.batches = []
+
+    async def send(self, events):
+        if self.fail:
+            raise OSError("sink down")
+        self.batches.append(events)
+
+    @property
+    def events(self):
+        return [event for batch in self.batches for event in batch]
+
+
+@pytest.fixture
+def receiver():
+    """Run the stand-in webhook receiver on a free port."""
+    receiver = Receiver(fail=0, drop=0, delay=0.0, out=None)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(receiver))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    receiver.url = f"http://127.0.0.1:{server.server_address[1]}/events"
+    yield receiver
+    server.shutdown()
+    server.server_close()
+
+
+def deliver(outbox, done, timeout=10.0):
+    """Run the outbox until ``done()`` holds, then stop it."""
+
+    async def main():
+        task = asyncio.create_task(outbox.run())
+        try:
+            for _ in range(int(timeout / 0.01)):
+                if task.done():
+                    task.result()
+                if done():
+                    return
+                await real_sleep(0.01)
+            raise AssertionError("outbox did not deliver in time")
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(main())
+
+
+def publish(outbox, count, first=0):
+    for i in range(first, first + count):
+        outbox.publish({"type": EVENT_ALARM, "alarm": str(i)})
+
+
+def queued_ids(outbox):
+    with open(outbox.path, encoding="utf-8") as f:
+        return [json.loads(line)["id"] for line in f]
+
+
+def saved_offset(outbox, name):
+    with open(os.path.join(outbox.directory, f"{name}.offset")) as f:
+        return int(f.read())
+
+
+def test_failed_delivery_is_retried_with_backoff(tmp_path, receiver, monkeypatch):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    receiver.fail = 3
+    outbox = Outbox(
+        [WebhookSink(receiver.url, timeout=5)],
+        directory=str(tmp_path),
+        backoff=0.5,
+        max_backoff=1.0,
+    )
+    publish(outbox, 3)
+    deliver(outbox, lambda: len(receiver.seen) == 3)
+    assert delays == [0.5, 1.0, 1.0]
+    assert receiver.requests == 4
+    assert outbox.metrics.get("outbox_failures") == 3
+    assert outbox.metrics.get("outbox_delivered") == 3
+
+
+def test_offsets_persist_across_restart(tmp_path):
+    first = MemorySink()
+    outbox = Outbox([first], directory=str(tmp_path), compact_bytes=1 << 20)
+    publish(outbox, 2)
+    deliver(outbox, lambda: len(first.events) == 2)
+    assert saved_offset(outbox, "memory") == os.path.getsize(outbox.path)
+
+    second = MemorySink()
+    outbox = Outbox([second], directory=str(tmp_path), compact_bytes=1 << 20)
+    publish(outbox, 1, first=2)
+    deliver(outbox, lambda: len(second.events) == 1)
+    assert [event["alarm"] for event in second.events] == ["2"]
+    assert [event["id"] for event in first.events + second.events] == queued_ids(outbox)
+
+
+def test_undelivered_offset_is_redelivered_after_restart(tmp_path):
+    down = MemorySink(fail=True)
+    outbox = Outbox([down], directory=str(tmp_path), backoff=0.01)
+    publish(outbox, 2)
+    deliver(outbox, lambda: outbox.metrics.get("outbox_failures", 0) >= 1)
+
+    up = MemorySink()
+    outbox = Outbox([up], directory=str(tmp_path))
+    deliver(outbox, lambda: len(up.events) == 2)
+    assert [event["id"] for event in up.events] == queued_ids(outbox)
+
+
+def test_delivered_queue_is_truncated_past_compact_bytes(tmp_path):
+    sinks = [MemorySink("a"), MemorySink("b")]
+    outbox = Outbox(sinks, directory=str(tmp_path), compact_bytes=200)
+    publish(outbox, 5)
+    deliver(
+        outbox,
+        lambda: all(len(sink.events) == 5 for sink in sinks)
+        and os.path.getsize(outbox.path) == 0,
+    )
+    assert saved_offset(outbox, "a") == saved_offset(outbox, "b") == 0
+
+
+def test_queue_is_kept_while_a_sink_lags(tmp_path):
+    up, down = MemorySink("up"), MemorySink("down", fail=True)
+    outbox = Outbox([up, down], directory=str(tmp_path), compact_bytes=200)
+    publish(outbox, 5)
+    lagging = []
+
+    def caught_up():
+        if not lagging and len(up.events) == 5:
+            lagging.append(os.path.getsize(outbox.path))
+            down.fail = False
+        return len(down.events) == 5
+
+    deliver(outbox, caught_up)
+    assert lagging[0] > 200
+    assert [event["id"] for event in down.events] == [
+        event["id"] for event in up.events
+    ]
+
+
+def test_redelivery_keeps_event_ids(tmp_path, receiver):
+    # The first reply comes after the sender gave up, so the batch arrives twice
+    accept = receiver.accept
+
+    def accept_once_slowly(events):
+        accept(events)
+        receiver.delay = 0.0
+
+    receiver.accept = accept_once_slowly
+    receiver.delay = 0.5
+    outbox = Outbox(
+        [WebhookSink(receiver.url, timeout=0.1)],
+        directory=str(tmp_path),
+        backoff=0.8,
+    )
+    publish(outbox, 3)
+    deliver(outbox, lambda: receiver.duplicates == 3)
+    assert list(receiver.seen) == queued_ids(outbox)
+    assert outbox.metrics.get("outbox_failures") == 1
+
+
+def test_run_then_idle_completes_a_job():
+    detector = TransitionDetector()
+    assert detector.feed({"state": "Idle"}, now=0) == []
+    assert detector.feed({"state": "Run"}, now=10) == []
+    assert detector.feed({"state": "Hold"}, now=20) == []
+    assert detector.feed({"state": "Run"}, now=30) == []
+    assert detector.feed({"state": "Idle"}, now=52.5) == [
+        {"type": EVENT_JOB_COMPLETE, "job_seconds": 42.5, "state": "Idle"}
+    ]
+
+
+def test_alarm_during_a_job_ends_it():
+    detector = TransitionDetector()
+    detector.feed({"state": "Idle"}, now=0)
+    detector.feed({"state": "Run"}, now=10)
+    assert detector.feed({"state": "Alarm", "alarm": "1"}, now=25) == [
+        {
+            "type": EVENT_ALARM,
+            "previous": "Run",
+            "alarm": "1",
+            "job_seconds": 15.0,
+            "state": "Alarm",
+        }
+    ]
+    events = detector.feed({"state": "Idle"}, now=30)
+    assert [event["type"] for event in events] == ["alarm_cleared"]
+
+
+def test_jogging_is_not_a_job():
+    detector = TransitionDetector()
+    detector.feed({"state": "Idle"}, now=0)
+    assert detector.feed({"state": "Jog"}, now=5) == []
+    assert detector.feed({"state": "Idle"}, now=9) == []
+
+
+def test_repeated_state_is_ignored():
+    detector = TransitionDetector()
+    detector.feed({"state": "Run"}, now=0)
+    assert detector.feed({"state": "Run"}, now=5) == []
+    assert detector.feed({"pos": (0, 0, 0)}, now=6) == []
@@ -0,0 +1,101 @@
+"""Panel chain mapping against hand-computed pixel positions.
+
+Every logical pixel is labelled with its flat index, so a remapped frame
+reads as the logical pixel shown at each physical chain position.
+"""
+
+import numpy as np
+import pytest
+
+from fluidnc_ledscreen.panel_map import PanelMap
+
+
+def chain(panel_map):
+    """Remap a labelled canvas and return the labels in chain order."""
+    labels = np.arange(panel_map.width * panel_map.height)
+    frame = np.repeat(labels, 3).reshape(panel_map.height, panel_map.width, 3)
+    physical = panel_map.apply(frame)
+    assert physical.shape == panel_map.physical_shape
+    assert (physical == physical[..., :1]).all()
+    return physical[..., 0].tolist()
+
+
+def test_single_panel_is_identity():
+    panel_map = PanelMap(panel_width=3, panel_height=2)
+    assert panel_map.identity
+    assert chain(panel_map) == [[0, 1, 2], [3, 4, 5]]
+
+
+def test_row_major_grid():
+    # Canvas 4x4 of 2x2 panels, chained along each row
+    panel_map = PanelMap(panel_width=2, panel_height=2, cols=2, rows=2)
+    assert (panel_map.width, panel_map.height) == (4, 4)
+    assert not panel_map.identity
+    assert chain(panel_map) == [
+        [0, 1, 2, 3, 8, 9, 10, 11],
+        [4, 5, 6, 7, 12, 13, 14, 15],
+    ]
+
+
+def test_serpentine_grid():
+    # Canvas:   0  1 |  2  3     The chain runs along the top row, then
+    #           4  5 |  6  7     back along the bottom row, whose panels
+    #          ------+------     hang upside down: the third panel's
+    #           8  9 | 10 11     first pixel is the bottom right one.
+    #          12 13 | 14 15
+    panel_map = PanelMap(
+        panel_width=2, panel_height=2, cols=2, rows=2, order="serpentine"
+    )
+    assert panel_map.chain_size == (8, 2)
+    assert chain(panel_map) == [
+        [0, 1, 2, 3, 15, 14, 13, 12],
+        [4, 5, 6, 7, 11, 10, 9, 8],
+    ]
+
+
+@pytest.mark.parametrize(
+    "rotation, size, expected",
+    [
+        # Canvas 2x3; the panel's top left pixel ends up top right
+        (90, (2, 3), [[1, 3, 5], [0, 2, 4]]),
+        # Canvas 3x2, upside down
+        (180, (3, 2), [[5, 4, 3], [2, 1, 0]]),
+        # Canvas 2x3; the panel's top left pixel ends up bottom left
+        (270, (2, 3), [[4, 2, 0], [5, 3, 1]]),
+    ],
+)
+def test_display_rotation(rotation, size, expected):
+    panel_map = PanelMap(panel_width=3, panel_height=2, rotation=rotation)
+    assert (panel_map.width, panel_map.height) == size
+    assert chain(panel_map) == expected
+
+
+@pytest.mark.parametrize(
+    "panel_rotation, size, expected",
+    [
+        # Canvas 4x3:  0  1  2  3
+        #              4  5  6  7
+        #              8  9 10 11
+        # Each 3x2 panel stands on its side and covers two columns
+        (90, (4, 3), [[1, 5, 9, 3, 7, 11], [0, 4, 8, 2, 6, 10]]),
+        # Canvas 6x2; each panel is upside down in its own place
+        (180, (6, 2), [[8, 7, 6, 11, 10, 9], [2, 1, 0, 5, 4, 3]]),
+        # Canvas 4x3 as for 90, panels on their other side
+        (270, (4, 3), [[8, 4, 0, 10, 6, 2], [9, 5, 1, 11, 7, 3]]),
+    ],
+)
+def test_panel_rotation(panel_rotation, size, expected):
+    panel_map = PanelMap(
+        panel_width=3, panel_height=2, cols=2, panel_rotation=panel_rotation
+    )
+    assert (panel_map.width, panel_map.height) == size
+    assert chain(panel_map) == expected
+
+
+def test_rejects_unsupported_arrangements():
+    with pytest.raises(ValueError):
+        PanelMap(order="spiral")
+    with pytest.raises(ValueError):
+        PanelMap(rotation=45)
+    with pytest.raises(ValueError):
+        PanelMap(cols=0)
@@ -0,0 +1,61 @@
+"""Render regression over the corpus of ``benchmarks/render_regression.py``.
+
+Every frame of every built-in layout must equal a full repaint of the
+same state and the stored golden image. The render-time gate depends on
+the machine and is opt-in: ``pytest -m perf``.
+"""
+
+import functools
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pytest
+import render_regression
+
+from fluidnc_ledscreen.fonts import DEFAULT_FONT_DIR
+from fluidnc_ledscreen.layout import LAYOUTS
+
+CASES = [case for case, _, _ in render_regression.CORPUS]
+GOLDEN_DIR = os.path.join(
+    render_regression.GOLDEN_DIR,
+    render_regression.font_fingerprint(DEFAULT_FONT_DIR),
+)
+# Allowed slowdown against the recorded baseline
+MAX_REGRESSION = 0.5
+
+
+@functools.lru_cache(maxsize=None)
+def rendered(layout: str) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    """Render the corpus once per layout."""
+    return render_regression.run_layout(layout, DEFAULT_FONT_DIR)
+
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("layout", list(LAYOUTS))
+def test_incremental_render_matches_repaint(layout, case):
+    _, inconsistent = rendered(layout)
+    assert case not in inconsistent
+
+
+@pytest.mark.parametrize("case", CASES)
+@pytest.mark.parametrize("layout", list(LAYOUTS))
+def test_frame_matches_golden(layout, case):
+    path = os.path.join(GOLDEN_DIR, layout, f"{case}.png")
+    golden = render_regression.load_golden(path)
+    if golden is None:
+        pytest.skip("no golden for this glyph set; record them with --update")
+    frames, _ = rendered(layout)
+    mismatched = np.any(golden != frames[case], axis=2)
+    assert not mismatched.any(), f"{mismatched.sum()} pixels differ"
+
+
+@pytest.mark.perf
+@pytest.mark.parametrize("layout", list(LAYOUTS))
+def test_render_time_within_baseline(layout):
+    arch = render_regression.ARCH
+    baselines = render_regression.load_baselines(GOLDEN_DIR).get(arch, {})
+    if layout not in baselines:
+        pytest.skip(f"no {arch} baseline; record it on the target hardware")
+    total, _, _ = render_regression.time_layout(layout, DEFAULT_FONT_DIR, repeat=200)
+    assert total * 1e6 <= baselines[layout] * (1 + MAX_REGRESSION)
@@ -0,0 +1,52 @@
+"""Status report scheduling against a scripted controller."""
+
+import asyncio
+
+from fluidnc_ledscreen.reporting import MODE_EVENT, MODE_POLL, StatusReporter
+
+
+def run_reporter(answer_probes, seconds=0.4):
+    """Run an ``auto`` reporter and return the lines it sent.
+
+    The controller accepts every setting; ``?`` is only answered while
+    ``answer_probes`` is true.
+    """
+    sent = []
+
+    async def session():
+        async def send(line):
+            sent.append(line)
+            if line.startswith("$"):
+                reporter.observe({"type": "ok"})
+            elif answer_probes:
+                reporter.observe({"type": "status", "state": "Idle"})
+
+        reporter = StatusReporter(
+            send,
+            report_interval=0.01,
+            poll_interval=0.01,
+            probe_timeout=0.05,
+            quiet_timeout=0.05,
+        )
+        reporter.start()
+        await asyncio.sleep(seconds)
+        reporter.stop()
+        return reporter
+
+    return asyncio.run(session()), sent
+
+
+def test_stale_stream_is_turned_off_before_polling():
+    reporter, sent = run_reporter(answer_probes=False)
+    assert reporter.active_mode == MODE_POLL
+    assert sent[0] == "$Report/Interval=10"
+    off = sent.index("$Report/Interval=0")
+    assert sent.count("$Report/Interval=10") == 1
+    assert sent[off:].count("?") > 3
+    assert reporter.metrics.get("status_stream_stale") == 1
+
+
+def test_answered_stream_stays_on():
+    reporter, sent = run_reporter(answer_probes=True)
+    assert reporter.active_mode == MODE_EVENT
+    assert "$Report/Interval=0" not in sent
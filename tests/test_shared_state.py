@@ -0,0 +1,71 @@
+"""Display state handed from the ingest to the render process."""
+
+import pytest
+
+from fluidnc_ledscreen.shared_state import StatePublisher, StateSlot, StateSubscriber
+
+
+class RecordingScreen:
+    """Records the updates a subscriber applies."""
+
+    def __init__(self):
+        """Initialize the screen."""
+        self.updates = []
+
+    def update(self, message):
+        self.updates.append(dict(message))
+
+
+@pytest.fixture
+def slot():
+    slot = StateSlot(create=True)
+    slot.attached = []
+    yield slot
+    for attached in slot.attached:
+        attached.close()
+    slot.close()
+
+
+def attach(slot):
+    """Subscribe like a (re)started render process does."""
+    screen = RecordingScreen()
+    slot.attached.append(StateSlot(slot.name))
+    return StateSubscriber(slot.attached[-1], screen), screen
+
+
+def test_events_are_shown_once(slot):
+    publisher = StatePublisher(slot)
+    subscriber, screen = attach(slot)
+    publisher.update({"state": "Idle"})
+    assert subscriber.poll()
+    publisher.update({"message": "Homing done"})
+    publisher.update({"state": "Run"})
+    assert subscriber.poll()
+    assert not subscriber.poll()
+    assert screen.updates == [
+        {"state": "Idle"},
+        {"message": "Homing done"},
+        {"state": "Run"},
+    ]
+
+
+def test_restarted_subscriber_does_not_replay_the_last_event(slot):
+    publisher = StatePublisher(slot)
+    publisher.update({"state": "Alarm", "alarm": "Hard limit"})
+    publisher.update({"state": "Idle"})
+
+    subscriber, screen = attach(slot)
+    assert subscriber.poll()
+    assert screen.updates == [{"state": "Idle"}]
+
+    publisher.update({"message": "Reset"})
+    assert subscriber.poll()
+    assert screen.updates[1:] == [{"message": "Reset"}, {"state": "Idle"}]
+
+
+def test_undecodable_state_is_counted(slot):
+    subscriber, screen = attach(slot)
+    slot.write(b"{not json")
+    assert not subscriber.poll()
+    assert subscriber.metrics.get("state_decode_errors") == 1
+    assert screen.updates == []
@@ -0,0 +1,175 @@
+"""Transports and line splitting against local peers.
+
+The serial transport runs on the slave end of a pty pair with the test
+playing the controller on the master end; the TCP transport talks to a
+local ``asyncio.start_server``.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from fluidnc_ledscreen.transport import (
+    LineSplitter,
+    SerialTransport,
+    TcpTransport,
+    TransportClosed,
+)
+
+REPORT = "<Idle|MPos:0.000,0.000,0.000|FS:0,0>"
+
+
+async def receive(transport, splitter, count):
+    """Read from a transport until ``count`` lines are complete."""
+    lines = []
+    while len(lines) < count:
+        chunk = await asyncio.wait_for(transport.recv(), 2.0)
+        lines.extend(splitter.feed(chunk))
+    return lines
+
+
+def test_splitter_keeps_partial_lines():
+    splitter = LineSplitter()
+    assert splitter.feed(b"<Idle|MPos:0.0") == []
+    assert splitter.feed(b"00,0.000,0.000|FS:0,0>\r") == []
+    assert splitter.feed(b"\nok\r\n") == [REPORT, "ok"]
+
+
+def test_splitter_splits_several_lines_and_skips_blank_ones():
+    splitter = LineSplitter()
+    assert splitter.feed("ok\r\n\r\n[MSG:INFO: Homed]\nerror:9\n") == [
+        "ok",
+        "[MSG:INFO: Homed]",
+        "error:9",
+    ]
+
+
+def test_splitter_completes_split_utf8_sequences():
+    splitter = LineSplitter()
+    data = "[MSG:Temperatur 40 °C]\n".encode()
+    cut = data.index("°".encode()) + 1
+    assert splitter.feed(data[:cut]) == []
+    assert splitter.feed(data[cut:]) == ["[MSG:Temperatur 40 °C]"]
+
+
+def test_splitter_flushes_overlong_lines_and_resets():
+    splitter = LineSplitter(max_line=8)
+    assert splitter.feed("0123456789") == ["0123456789"]
+    assert splitter.feed("abc") == []
+    splitter.reset()
+    assert splitter.feed("ok\n") == ["ok"]
+
+
+@pytest.fixture
+def pty():
+    """Open a pty pair: the master fd and the slave device path."""
+    master, slave = os.openpty()
+    device = os.ttyname(slave)
+    yield master, device
+    os.close(slave)
+    try:
+        os.close(master)
+    except OSError:
+        pass
+
+
+def test_serial_transport_over_pty(pty):
+    master, device = pty
+
+    async def session():
+        transport = SerialTransport(device)
+        splitter = LineSplitter()
+        await transport.open()
+        try:
+            await transport.write("?")
+            assert os.read(master, 64) == b"?"
+            # Partial line, then its end with CRLF and more lines in one read
+            os.write(master, REPORT[:12].encode())
+            assert splitter.feed(await transport.recv()) == []
+            os.write(master, (REPORT[12:] + "\r\nok\r\nok\r\n").encode())
+            assert await receive(transport, splitter, 3) == [REPORT, "ok", "ok"]
+        finally:
+            await transport.close()
+        assert not transport.is_open
+        with pytest.raises(TransportClosed):
+            await transport.recv()
+        with pytest.raises(TransportClosed):
+            await transport.write("?")
+
+        # The same device opens again after a close
+        splitter.reset()
+        await transport.open()
+        try:
+            os.write(master, b"[MSG:Reset]\r\n")
+            assert await receive(transport, splitter, 1) == ["[MSG:Reset]"]
+        finally:
+            await transport.close()
+
+    asyncio.run(session())
+
+
+def test_serial_transport_sees_peer_close(pty):
+    master, device = pty
+
+    async def session():
+        transport = SerialTransport(device)
+        await transport.open()
+        try:
+            os.close(master)
+            with pytest.raises(TransportClosed):
+                while True:
+                    await asyncio.wait_for(transport.recv(), 2.0)
+        finally:
+            await transport.close()
+
+    asyncio.run(session())
+
+
+def test_tcp_transport():
+    async def session():
+        received = []
+        connections = []
+
+        async def controller(reader, writer):
+            connections.append(writer)
+            received.append(await reader.readexactly(2))
+            writer.write(REPORT[:12].encode())
+            await writer.drain()
+            await asyncio.sleep(0.05)
+            writer.write((REPORT[12:] + "\r\nok\r\nok\r\n").encode())
+            await writer.drain()
+            await reader.read()
+            writer.close()
+
+        server = await asyncio.start_server(controller, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        transport = TcpTransport("127.0.0.1", port)
+        splitter = LineSplitter()
+        try:
+            await transport.open()
+            await transport.write("?\n")
+            assert await receive(transport, splitter, 3) == [REPORT, "ok", "ok"]
+            assert received == [b"?\n"]
+
+            # The controller hangs up
+            connections[0].close()
+            with pytest.raises(TransportClosed):
+                await asyncio.wait_for(transport.recv(), 2.0)
+            await transport.close()
+            assert not transport.is_open
+            with pytest.raises(TransportClosed):
+                await transport.write("?\n")
+
+            # And accepts a new connection
+            splitter.reset()
+            await transport.open()
+            await transport.write("?\n")
+            assert await receive(transport, splitter, 3) == [REPORT, "ok", "ok"]
+            assert len(connections) == 2
+        finally:
+            await transport.close()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(session())
@@ -0,0 +1,59 @@
+"""Utilization totals across shift and day boundaries."""
+
+import datetime
+
+import pytest
+
+from fluidnc_ledscreen.utilization import RUN, UtilizationAccountant, parse_shifts
+
+SHIFTS = parse_shifts("early@06:00,late@14:00,night@22:00")
+
+
+def at(day, hour, minute=0):
+    return datetime.datetime(2026, 6, day, hour, minute).timestamp()
+
+
+@pytest.fixture
+def accountant(tmp_path):
+    return UtilizationAccountant(SHIFTS, path=str(tmp_path / "utilization.json"))
+
+
+def test_night_shift_is_booked_under_its_start_day(accountant):
+    accountant._credit(RUN, at(10, 21), at(11, 7))
+    assert accountant.totals("2026-06-10", "late")[RUN] == 3600
+    assert accountant.totals("2026-06-10", "night")[RUN] == 8 * 3600
+    assert accountant.totals("2026-06-11", "early")[RUN] == 3600
+    assert "night" not in accountant.days["2026-06-11"]["fluidnc"]
+
+
+def test_slot_after_midnight_belongs_to_previous_night(accountant):
+    day, shift, start, end = accountant._locate(at(11, 2, 30))
+    assert (day, shift) == ("2026-06-10", "night")
+    assert (start, end) == (at(10, 22), at(11, 6))
+
+
+def test_single_shift_starts_at_midnight(tmp_path):
+    accountant = UtilizationAccountant(path=str(tmp_path / "utilization.json"))
+    accountant._credit(RUN, at(10, 23), at(11, 1))
+    assert accountant.totals("2026-06-10", "day")[RUN] == 3600
+    assert accountant.totals("2026-06-11", "day")[RUN] == 3600
+
+
+def test_old_days_are_pruned(tmp_path):
+    accountant = UtilizationAccountant(
+        SHIFTS, path=str(tmp_path / "utilization.json"), keep_days=2
+    )
+    for day in (10, 11, 12):
+        accountant._credit(RUN, at(day, 8), at(day, 9))
+    assert sorted(accountant.days) == ["2026-06-11", "2026-06-12"]
+
+
+def test_keep_days_zero_keeps_the_current_day(tmp_path):
+    accountant = UtilizationAccountant(
+        SHIFTS, path=str(tmp_path / "utilization.json"), keep_days=0
+    )
+    accountant._credit(RUN, at(10, 8), at(10, 9))
+    accountant._credit(RUN, at(11, 8), at(11, 9))
+    assert list(accountant.days) == ["2026-06-11"]
+    accountant.tick()
+    accountant.publish()
@@ -0,0 +1,339 @@
+"""Fault-injection TCP proxy for connection-resilience testing.
+
+Sits between the LED screen and a controller (or a simulator) and
+forwards bytes in both directions, so it carries WebSocket and raw TCP
+links alike. Traffic can be shaped with latency, jitter and a bandwidth
+cap, and faults can be injected on a schedule:
+
+* ``stall`` - traffic stops for a while and is then delivered late, as
+  during a shop WiFi dropout or an ESP32 busy in a long operation;
+* ``half-open`` - open connections silently lose all traffic and are
+  never closed, as when the peer vanished without a FIN; new connections
+  work;
+* ``reset`` - open connections are reset (RST);
+* ``refuse`` - new connections are reset for a while;
+* ``reboot`` - ``reset`` followed by ``refuse``, like an ESP32 reboot.
+
+Usage:
+    python tools/fault_proxy.py --target 192.168.1.50:81 [--listen 8081]
+        [--latency 0.05] [--jitter 0.02] [--bandwidth 20000]
+        [--schedule "10:stall:5,30:reset,60:reboot:8,90:half-open"]
+
+Point the LED screen's ``ip_address`` (and port) at the proxy.
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import socket
+import struct
+import time
+from typing import List, Optional, Set, Tuple
+
+logger = logging.getLogger("fault_proxy")
+
+FAULTS = ("stall", "half-open", "reset", "refuse", "reboot")
+
+# Type aliases
+Schedule = List[Tuple[float, str, float]]
+
+
+def parse_schedule(text: str) -> Schedule:
+    """Parse a fault schedule.
+
+    Args:
+        text: Comma separated ``AT:FAULT[:DURATION]`` items, times in
+            seconds after the proxy starts
+
+    Returns:
+        (at, fault, duration) tuples sorted by time
+
+    Raises:
+        ValueError: If an item is malformed or names an unknown fault
+    """
+    schedule: Schedule = []
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        parts = item.split(":")
+        if len(parts) not in (2, 3) or parts[1] not in FAULTS:
+            raise ValueError(f"Bad schedule item {item!r}; faults: {', '.join(FAULTS)}")
+        duration = float(parts[2]) if len(parts) == 3 else 0.0
+        schedule.append((float(parts[0]), parts[1], duration))
+    return sorted(schedule)
+
+
+def _reset(writer: asyncio.StreamWriter) -> None:
+    """Close a connection with a RST instead of a FIN."""
+    sock = writer.get_extra_info("socket")
+    if sock is not None:
+        try:
+            sock.setsockopt(
+                socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0)
+            )
+        except OSError:
+            pass
+    writer.transport.abort()
+
+
+class Link:
+    """One proxied connection.
+
+    Attributes:
+        client: Writer towards the connecting client
+        upstream: Writer towards the target
+        blackholed: Whether traffic is silently dropped
+    """
+
+    def __init__(
+        self, client: asyncio.StreamWriter, upstream: asyncio.StreamWriter
+    ) -> None:
+        """Initialize the link."""
+        self.client = client
+        self.upstream = upstream
+        self.blackholed = False
+
+    def reset(self) -> None:
+        """Reset both sides."""
+        _reset(self.client)
+        _reset(self.upstream)
+
+
+class FaultProxy:
+    """TCP proxy with traffic shaping and fault injection.
+
+    Attributes:
+        target: Target host and port
+        latency: One-way delay added to every chunk in seconds
+        jitter: Random extra delay, uniform in [0, jitter) seconds
+        bandwidth: Cap in bytes per second per direction (0: none)
+        port: Listening port once started
+    """
+
+    def __init__(
+        self,
+        target: Tuple[str, int],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        bandwidth: float = 0.0,
+    ) -> None:
+        """Initialize the proxy."""
+        self.target = target
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.port = 0
+        self.links: Set[Link] = set()
+        self._flowing = asyncio.Event()
+        self._flowing.set()
+        self._refuse_until = 0.0
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Start listening.
+
+        Args:
+            host: Listening address
+            port: Listening port (0: any free port)
+        """
+        self._server = await asyncio.start_server(self._accept, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop listening and reset all connections."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        for link in list(self.links):
+            link.reset()
+        for task in list(self._tasks):
+            task.cancel()
+        self.links.clear()
+
+    def shape(
+        self, latency: float = 0.0, jitter: float = 0.0, bandwidth: float = 0.0
+    ) -> None:
+        """Change the traffic shaping.
+
+        Args:
+            latency: One-way delay in seconds
+            jitter: Random extra delay in seconds
+            bandwidth: Cap in bytes per second (0: none)
+        """
+        self.latency, self.jitter, self.bandwidth = latency, jitter, bandwidth
+
+    def inject(self, fault: str, duration: float = 0.0) -> None:
+        """Inject a fault.
+
+        Args:
+            fault: One of :data:`FAULTS`
+            duration: Seconds a ``stall``, ``refuse`` or ``reboot`` lasts
+
+        Raises:
+            ValueError: If the fault is unknown
+        """
+        logger.info("Injecting %s%s", fault, f" for {duration:g} s" if duration else "")
+        if fault == "stall":
+            self._flowing.clear()
+            asyncio.get_running_loop().call_later(duration, self._flowing.set)
+        elif fault == "half-open":
+            for link in self.links:
+                link.blackholed = True
+        elif fault in ("reset", "reboot"):
+            for link in list(self.links):
+                link.reset()
+            self.links.clear()
+            if fault == "reboot":
+                self._refuse_until = time.monotonic() + duration
+        elif fault == "refuse":
+            self._refuse_until = time.monotonic() + duration
+        else:
+            raise ValueError(f"Unknown fault {fault!r}")
+
+    async def run_schedule(self, schedule: Schedule) -> None:
+        """Inject faults at their scheduled times.
+
+        Args:
+            schedule: Output of :func:`parse_schedule`
+        """
+        started = time.monotonic()
+        for at, fault, duration in schedule:
+            await asyncio.sleep(max(0.0, started + at - time.monotonic()))
+            self.inject(fault, duration)
+
+    async def _accept(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Connect a new client to the target."""
+        if time.monotonic() < self._refuse_until:
+            _reset(writer)
+            return
+        try:
+            up_reader, up_writer = await asyncio.open_connection(*self.target)
+        except OSError as e:
+            logger.warning("Target %s:%d unreachable: %s", *self.target, str(e))
+            _reset(writer)
+            return
+        link = Link(writer, up_writer)
+        self.links.add(link)
+        pumps = [
+            self._spawn(self._pump(reader, up_writer, link)),
+            self._spawn(self._pump(up_reader, writer, link)),
+        ]
+        await asyncio.wait(pumps, return_when=asyncio.FIRST_COMPLETED)
+        if link.blackholed:
+            # A half-open peer never closes; wait for the client to give up
+            await asyncio.wait(pumps[:1])
+        for pump in pumps:
+            pump.cancel()
+        self.links.discard(link)
+        for side in (writer, up_writer):
+            side.close()
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """Start a task that is cancelled when the proxy stops."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _pump(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        link: Link,
+    ) -> None:
+        """Forward one direction through the delay line until EOF."""
+        queue: asyncio.Queue = asyncio.Queue()
+        sender = self._spawn(self._send(queue, writer, link))
+        last = 0.0
+        try:
+            while True:
+                try:
+                    data = await reader.read(65536)
+                except OSError:
+                    data = b""
+                if not data:
+                    break
+                # Chunks keep their order however the jitter falls
+                last = max(
+                    last,
+                    time.monotonic() + self.latency + random.uniform(0, self.jitter),
+                )
+                queue.put_nowait((last, data))
+            queue.put_nowait((last, b""))
+            await sender
+        finally:
+            sender.cancel()
+
+    async def _send(
+        self, queue: asyncio.Queue, writer: asyncio.StreamWriter, link: Link
+    ) -> None:
+        """Deliver queued chunks at their release times."""
+        while True:
+            release, data = await queue.get()
+            await asyncio.sleep(max(0.0, release - time.monotonic()))
+            await self._flowing.wait()
+            if not data:
+                # A half-open link swallows the FIN, but this direction is done
+                if not link.blackholed and writer.can_write_eof():
+                    writer.write_eof()
+                return
+            if link.blackholed:
+                continue
+            if self.bandwidth > 0:
+                await asyncio.sleep(len(data) / self.bandwidth)
+            try:
+                writer.write(data)
+                await writer.drain()
+            except OSError:
+                return
+
+
+def _address(text: str, default_host: str = "127.0.0.1") -> Tuple[str, int]:
+    """Parse ``host:port`` or a bare port."""
+    host, _, port = text.rpartition(":")
+    return host or default_host, int(port)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    """Run the proxy and its schedule until interrupted."""
+    proxy = FaultProxy(_address(args.target), args.latency, args.jitter, args.bandwidth)
+    host, port = _address(args.listen, "0.0.0.0")  # nosec B104
+    await proxy.start(host, port)
+    logger.info("Proxying %s:%d to %s:%d", host, proxy.port, *proxy.target)
+    schedule = asyncio.create_task(proxy.run_schedule(args.schedule))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        schedule.cancel()
+        await proxy.stop()
+
+
+def main() -> None:
+    """Parse arguments and run the proxy."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", required=True, help="controller host:port")
+    parser.add_argument("--listen", default="8081", help="[host:]port to listen on")
+    parser.add_argument("--latency", type=float, default=0.0, help="one-way delay (s)")
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="random extra delay (s)"
+    )
+    parser.add_argument(
+        "--bandwidth", type=float, default=0.0, help="bytes/s (0: none)"
+    )
+    parser.add_argument("--schedule", default="", help="AT:FAULT[:DURATION],...")
+    args = parser.parse_args()
+    try:
+        args.schedule = parse_schedule(args.schedule)
+    except ValueError as e:
+        parser.error(str(e))
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Connection-resilience scenarios with time-to-detect and time-to-recover.
+
+Runs the LED screen application (without a panel) against a stand-in
+FluidNC through :mod:`fault_proxy`, injects one fault per scenario and
+reports:
+
+* detect - seconds from the fault until the application noticed it (the
+  watchdog marked the link stale or lost, or the connection dropped);
+* recover - seconds from the end of the fault until status reports flow
+  again;
+* gap - longest interval between two status reports around the fault;
+* reconnects - connections made during the scenario.
+
+Every scenario starts from a fresh application, simulator and proxy, so
+results are reproducible. Tune ``[Watchdog]`` and ``[Connection]`` with
+the matching options and compare.
+
+Usage:
+    PYTHONPATH=src python tools/fault_scenarios.py [SCENARIO ...]
+        [--profile default] [--stale-after 3] [--lost-after 10]
+        [--reconnect-after 20] [--reconnect-interval 5] [--report-ms 200]
+        [--timeout 60] [--json FILE]
+"""
+
+import argparse
+import asyncio
+import atexit
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+import websockets
+
+# Caches the application persists stay out of the real state directory
+if "FLUIDNC_STATE_DIR" not in os.environ:
+    os.environ["FLUIDNC_STATE_DIR"] = tempfile.mkdtemp(prefix="fault-scenarios-")
+    atexit.register(shutil.rmtree, os.environ["FLUIDNC_STATE_DIR"], True)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fault_proxy import FaultProxy  # noqa: E402
+
+from fluidnc_ledscreen.connection_profile import PROFILES  # noqa: E402
+from fluidnc_ledscreen.main import FluidNCLEDScreen  # noqa: E402
+
+
+@dataclass
+class Scenario:
+    """One fault and how long it lasts.
+
+    Attributes:
+        name: Scenario name
+        description: What the fault models
+        fault: Proxy fault (or ``shape`` for latency/bandwidth changes)
+        duration: Seconds the fault lasts
+        shaping: Latency, jitter and bandwidth while shaping
+    """
+
+    name: str
+    description: str
+    fault: str
+    duration: float = 0.0
+    shaping: tuple = (0.0, 0.0, 0.0)
+
+
+SCENARIOS = [
+    Scenario(
+        "latency", "300 ms +-200 ms latency for 10 s", "shape", 10.0, (0.3, 0.2, 0.0)
+    ),
+    Scenario("bandwidth", "200 B/s link for 10 s", "shape", 10.0, (0.0, 0.0, 200.0)),
+    Scenario("hiccup", "2 s stall (ESP32 busy)", "stall", 2.0),
+    Scenario("dropout", "8 s WiFi dropout, traffic delivered late", "stall", 8.0),
+    Scenario("long-dropout", "30 s WiFi dropout", "stall", 30.0),
+    Scenario("half-open", "peer vanished without closing", "half-open"),
+    Scenario("reset", "connection reset", "reset"),
+    Scenario("reboot", "ESP32 reboot, port closed for 8 s", "reboot", 8.0),
+]
+
+
+@dataclass
+class Result:
+    """Measurements of one scenario (seconds, None when not observed)."""
+
+    scenario: str
+    detect: Optional[float]
+    detected_by: str
+    recover: Optional[float]
+    gap: float
+    reconnects: int
+
+
+class Recorder:
+    """Display stand-in that timestamps what the application shows."""
+
+    def __init__(self) -> None:
+        """Initialize the recorder."""
+        self.reports: List[float] = []
+        self.changes: List[tuple] = []
+
+    def update(self, message: Dict[str, Any]) -> None:
+        """Record status reports and link changes."""
+        now = time.monotonic()
+        if message.get("type") == "status":
+            self.reports.append(now)
+        if message.get("link") in ("stale", "lost"):
+            self.changes.append((now, message["link"]))
+        if message.get("connected") is False:
+            self.changes.append((now, "disconnect"))
+
+    def cleanup(self) -> None:
+        """Nothing to release."""
+
+
+async def _controller(websocket: Any) -> None:
+    """Stand-in FluidNC: answers ``?`` and streams automatic reports."""
+    n = 0
+    stream: Optional[asyncio.Task] = None
+
+    async def report() -> None:
+        nonlocal n
+        n += 1
+        await websocket.send(f"<Idle|MPos:{n / 1000:.3f},0.000,0.000|FS:0,0>\n")
+
+    async def auto(interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await report()
+
+    try:
+        async for line in websocket:
+            if line == "?":
+                await report()
+            elif line.startswith("$Report/Interval="):
+                interval = int(line.split("=", 1)[1]) / 1000
+                if stream:
+                    stream.cancel()
+                stream = asyncio.create_task(auto(interval)) if interval else None
+                await websocket.send("ok\n")
+            else:
+                await websocket.send("ok\n")
+    except websockets.exceptions.ConnectionClosed:
+        pass
+    finally:
+        if stream:
+            stream.cancel()
+
+
+async def run_scenario(scenario: Scenario, args: argparse.Namespace) -> Result:
+    """Run one scenario on a fresh simulator, proxy and application.
+
+    Args:
+        scenario: Scenario to run
+        args: Command line options
+
+    Returns:
+        Measurements
+    """
+    server = await websockets.serve(_controller, "127.0.0.1", 0)
+    target = server.sockets[0].getsockname()[:2]
+    proxy = FaultProxy(target)
+    await proxy.start()
+    recorder = Recorder()
+    app = FluidNCLEDScreen(
+        websocket_url=f"ws://127.0.0.1:{proxy.port}",
+        render_fps=0,
+        display=recorder,
+        metrics_interval=0,
+        report_interval=args.report_ms / 1000,
+        connection_profile=PROFILES[args.profile],
+        stale_after=args.stale_after,
+        lost_after=args.lost_after,
+        reconnect_after=args.reconnect_after,
+    )
+    app.websocket_client.reconnect_interval = args.reconnect_interval
+    running = asyncio.create_task(app.start())
+    try:
+        while len(recorder.reports) < 10:
+            await asyncio.sleep(0.1)
+        await asyncio.sleep(1.0)
+        connects = app.metrics.get("link_connects", 0)
+        fault_start = time.monotonic()
+        if scenario.fault == "shape":
+            proxy.shape(*scenario.shaping)
+        else:
+            proxy.inject(scenario.fault, scenario.duration)
+        await asyncio.sleep(scenario.duration)
+        if scenario.fault == "shape":
+            proxy.shape()
+        fault_end = time.monotonic()
+        # Recovered once reports flow again, past whatever the stall buffered
+        deadline = fault_end + args.timeout
+        recovered = None
+        while recovered is None and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            recovered = _recovered(recorder.reports, fault_end, args.report_ms / 1000)
+        detections = [(t, what) for t, what in recorder.changes if t >= fault_start]
+        window = [
+            t
+            for t in recorder.reports
+            if fault_start - 1.0 <= t <= (recovered or deadline)
+        ]
+        gaps = [b - a for a, b in zip(window, window[1:])]
+        return Result(
+            scenario.name,
+            round(detections[0][0] - fault_start, 2) if detections else None,
+            detections[0][1] if detections else "",
+            round(recovered - fault_end, 2) if recovered is not None else None,
+            round(max(gaps, default=0.0), 2),
+            app.metrics.get("link_connects", 0) - connects,
+        )
+    finally:
+        app.shutdown()
+        await running
+        await proxy.stop()
+        server.close()
+        await server.wait_closed()
+
+
+def _recovered(reports: List[float], since: float, interval: float) -> Optional[float]:
+    """Find the start of a steady run of reports after a fault.
+
+    A stall releases its backlog in a burst, so recovery is the first of
+    three consecutive reports after ``since`` that arrive at about the
+    report interval.
+    """
+    recent = [t for t in reports if t >= since]
+    for first, second, third in zip(recent, recent[1:], recent[2:]):
+        if second - first >= interval / 2 and third - second >= interval / 2:
+            return first
+    return None
+
+
+def _format(value: Optional[float]) -> str:
+    """Format seconds for the table."""
+    return "-" if value is None else f"{value:.2f}"
+
+
+async def _main(args: argparse.Namespace) -> List[Result]:
+    """Run the selected scenarios one after another."""
+    selected = [s for s in SCENARIOS if not args.scenarios or s.name in args.scenarios]
+    results = []
+    print(
+        f"profile={args.profile} stale_after={args.stale_after}"
+        f" lost_after={args.lost_after} reconnect_after={args.reconnect_after}"
+        f" reconnect_interval={args.reconnect_interval}"
+    )
+    print(
+        f"{'scenario':13} {'detect':>7} {'by':10} {'recover':>8}"
+        f" {'gap':>6} {'reconn':>6}"
+    )
+    for scenario in selected:
+        result = await run_scenario(scenario, args)
+        results.append(result)
+        print(
+            f"{result.scenario:13} {_format(result.detect):>7} {result.detected_by:10}"
+            f" {_format(result.recover):>8} {result.gap:6.2f} {result.reconnects:6d}"
+            f"  {scenario.description}",
+            flush=True,
+        )
+    return results
+
+
+def main() -> None:
+    """Parse arguments and run the scenarios."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    names = [s.name for s in SCENARIOS]
+    parser.add_argument(
+        "scenarios", nargs="*", metavar="SCENARIO", help=", ".join(names)
+    )
+    parser.add_argument("--profile", default="default", choices=sorted(PROFILES))
+    parser.add_argument("--stale-after", type=float, default=3.0)
+    parser.add_argument("--lost-after", type=float, default=10.0)
+    parser.add_argument("--reconnect-after", type=float, default=20.0)
+    parser.add_argument("--reconnect-interval", type=float, default=5.0)
+    parser.add_argument("--report-ms", type=int, default=200)
+    parser.add_argument(
+        "--timeout", type=float, default=60.0, help="max seconds to recover"
+    )
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(names)
+    if unknown:
+        parser.error(
+            f"unknown scenarios {', '.join(sorted(unknown))}; choose from {names}"
+        )
+    logging.basicConfig(level=logging.CRITICAL)
+    results = asyncio.run(_main(args))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([asdict(result) for result in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Stand-in HTTP receiver for outbox webhooks.
+
+Accepts the JSON arrays the outbox POSTs, prints every event and counts
+duplicates (redeliveries after a failed or slow attempt). To exercise
+the retry path it can answer the first requests with an error, delay its
+replies beyond the sender's timeout, or drop connections.
+
+Point ``webhook_url`` in ``[Outbox]`` at it:
+
+    python tools/outbox_receiver.py --port 8099 --fail 3
+    webhook_url = http://127.0.0.1:8099/events
+
+Usage:
+    python tools/outbox_receiver.py [--host H] [--port N] [--fail N]
+        [--delay S] [--drop N] [--out FILE]
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+
+class Receiver:
+    """Received events and failure injection state.
+
+    Attributes:
+        fail: Requests still to answer with 503
+        drop: Requests still to drop without a reply
+        delay: Seconds to wait before replying
+        out: File to append received events to (JSON lines)
+        seen: Event ids received so far
+        duplicates: Events received more than once
+        requests: Requests handled
+    """
+
+    def __init__(self, fail: int, drop: int, delay: float, out: Optional[str]) -> None:
+        """Initialize the receiver."""
+        self.fail = fail
+        self.drop = drop
+        self.delay = delay
+        self.out = out
+        self.seen: Dict[str, Dict[str, Any]] = {}
+        self.duplicates = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def accept(self, events: list) -> None:
+        """Record a delivered batch."""
+        with self.lock:
+            for event in events:
+                if event.get("id") in self.seen:
+                    self.duplicates += 1
+                    print(f"duplicate {event.get('id')} {event.get('type')}")
+                    continue
+                self.seen[event.get("id")] = event
+                print(json.dumps(event, sort_keys=True))
+                if self.out:
+                    with open(self.out, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(event) + "\n")
+            print(
+                f"-- {len(self.seen)} events, {self.duplicates} duplicates",
+                flush=True,
+            )
+
+
+def make_handler(receiver: Receiver) -> type:
+    """Build a request handler bound to a receiver."""
+
+    class Handler(BaseHTTPRequestHandler):
+        """Handles webhook POSTs."""
+
+        def do_POST(self) -> None:
+            """Receive one batch."""
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with receiver.lock:
+                receiver.requests += 1
+                drop = receiver.drop > 0
+                fail = not drop and receiver.fail > 0
+                receiver.drop -= drop
+                receiver.fail -= fail
+            if drop:
+                print("dropping connection", flush=True)
+                self.close_connection = True
+                self.connection.close()
+                return
+            if receiver.delay:
+                time.sleep(receiver.delay)
+            if fail:
+                print("answering 503", flush=True)
+                self.send_response(503)
+                self.end_headers()
+                return
+            try:
+                events = json.loads(body)
+            except ValueError:
+                self.send_response(400)
+                self.end_headers()
+                return
+            receiver.accept(events if isinstance(events, list) else [events])
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format: str, *args: Any) -> None:
+            """Silence per-request logging."""
+
+    return Handler
+
+
+def main() -> None:
+    """Run the receiver until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument(
+        "--fail", type=int, default=0, help="answer the first N with 503"
+    )
+    parser.add_argument(
+        "--drop", type=int, default=0, help="drop the first N connections"
+    )
+    parser.add_argument(
+        "--delay", type=float, default=0.0, help="seconds before replying"
+    )
+    parser.add_argument("--out", help="append received events to this file")
+    args = parser.parse_args()
+
+    receiver = Receiver(args.fail, args.drop, args.delay, args.out)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(receiver))
+    print(f"listening on http://{args.host}:{args.port}/", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()